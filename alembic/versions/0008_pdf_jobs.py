@@ -0,0 +1,41 @@
+"""pdf generation jobs
+
+Revision ID: 0008_pdf_jobs
+Revises: 0007_scan_module
+Create Date: 2026-10-18 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008_pdf_jobs"
+down_revision = "0007_scan_module"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "pdf_jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("tenant_id", sa.String(), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("work_order_id", sa.String(), sa.ForeignKey("work_orders.id"), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("object_name", sa.String(), nullable=True),
+        sa.Column("error_message", sa.String(), nullable=True),
+        sa.Column("created_by_user_id", sa.String(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_pdf_jobs_tenant_id", "pdf_jobs", ["tenant_id"])
+    op.create_index("ix_pdf_jobs_work_order_id", "pdf_jobs", ["work_order_id"])
+    op.create_index("ix_pdf_jobs_status", "pdf_jobs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_pdf_jobs_status", table_name="pdf_jobs")
+    op.drop_index("ix_pdf_jobs_work_order_id", table_name="pdf_jobs")
+    op.drop_index("ix_pdf_jobs_tenant_id", table_name="pdf_jobs")
+    op.drop_table("pdf_jobs")
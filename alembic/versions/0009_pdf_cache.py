@@ -0,0 +1,29 @@
+"""pdf content digest cache
+
+Revision ID: 0009_pdf_cache
+Revises: 0008_pdf_jobs
+Create Date: 2026-10-18 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009_pdf_cache"
+down_revision = "0008_pdf_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("pdf_jobs", sa.Column("content_digest", sa.String(), nullable=True))
+    op.add_column("pdf_jobs", sa.Column("public_link_id", sa.String(), nullable=True))
+    op.create_index("ix_pdf_jobs_content_digest", "pdf_jobs", ["content_digest"])
+    op.create_foreign_key("fk_pdf_jobs_public_link", "pdf_jobs", "public_links", ["public_link_id"], ["id"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("fk_pdf_jobs_public_link", "pdf_jobs", type_="foreignkey")
+    op.drop_index("ix_pdf_jobs_content_digest", table_name="pdf_jobs")
+    op.drop_column("pdf_jobs", "public_link_id")
+    op.drop_column("pdf_jobs", "content_digest")
@@ -0,0 +1,39 @@
+"""content addressed attachment blobs
+
+Revision ID: 0010_attachment_blobs
+Revises: 0009_pdf_cache
+Create Date: 2026-10-18 11:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010_attachment_blobs"
+down_revision = "0009_pdf_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "attachment_blobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("tenant_id", sa.String(), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("sha256", sa.String(), nullable=False),
+        sa.Column("object_name", sa.String(), nullable=False),
+        sa.Column("thumb_object_name", sa.String(), nullable=True),
+        sa.Column("mime", sa.String(), nullable=True),
+        sa.Column("size", sa.Integer(), nullable=True),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("tenant_id", "sha256", name="uq_attachment_blob"),
+    )
+    op.add_column("work_order_attachments", sa.Column("sha256", sa.String(), nullable=True))
+    op.create_index("ix_work_order_attachments_sha256", "work_order_attachments", ["sha256"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_work_order_attachments_sha256", table_name="work_order_attachments")
+    op.drop_column("work_order_attachments", "sha256")
+    op.drop_table("attachment_blobs")
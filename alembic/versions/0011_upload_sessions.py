@@ -0,0 +1,52 @@
+"""direct upload sessions
+
+Revision ID: 0011_upload_sessions
+Revises: 0010_attachment_blobs
+Create Date: 2026-10-18 12:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011_upload_sessions"
+down_revision = "0010_attachment_blobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "upload_sessions",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("tenant_id", sa.String(), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("work_order_id", sa.String(), sa.ForeignKey("work_orders.id"), nullable=False),
+        sa.Column("target", sa.String(), nullable=False),
+        sa.Column("scope", sa.String(), nullable=True),
+        sa.Column("item_id", sa.String(), nullable=True),
+        sa.Column("question_id", sa.String(), nullable=True),
+        sa.Column("role", sa.String(), nullable=True),
+        sa.Column("file_name", sa.String(), nullable=False),
+        sa.Column("mime", sa.String(), nullable=False),
+        sa.Column("expected_size", sa.Integer(), nullable=False),
+        sa.Column("expected_sha256", sa.String(), nullable=False),
+        sa.Column("staging_object", sa.String(), nullable=True),
+        sa.Column("token_hash", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("error_message", sa.String(), nullable=True),
+        sa.Column("result_id", sa.String(), nullable=True),
+        sa.Column("created_by_user_id", sa.String(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("finalized_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_upload_sessions_tenant_id", "upload_sessions", ["tenant_id"])
+    op.create_index("ix_upload_sessions_work_order_id", "upload_sessions", ["work_order_id"])
+    op.create_index("ix_upload_sessions_status", "upload_sessions", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_upload_sessions_status", table_name="upload_sessions")
+    op.drop_index("ix_upload_sessions_work_order_id", table_name="upload_sessions")
+    op.drop_index("ix_upload_sessions_tenant_id", table_name="upload_sessions")
+    op.drop_table("upload_sessions")
@@ -0,0 +1,43 @@
+"""work order change log for delta sync
+
+Revision ID: 0012_sync_changes
+Revises: 0011_upload_sessions
+Create Date: 2026-10-18 13:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012_sync_changes"
+down_revision = "0011_upload_sessions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tenant_change_seqs",
+        sa.Column("tenant_id", sa.String(), sa.ForeignKey("tenants.id"), primary_key=True),
+        sa.Column("seq", sa.BigInteger(), nullable=False),
+    )
+    op.create_table(
+        "sync_changes",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("tenant_id", sa.String(), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("seq", sa.BigInteger(), nullable=False),
+        sa.Column("entity", sa.String(), nullable=False),
+        sa.Column("entity_id", sa.String(), nullable=False),
+        sa.Column("work_order_id", sa.String(), nullable=True),
+        sa.Column("op", sa.String(), nullable=False),
+        sa.Column("client_id", sa.String(), nullable=True),
+        sa.Column("assigned_user_id", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_sync_changes_tenant_seq", "sync_changes", ["tenant_id", "seq"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sync_changes_tenant_seq", table_name="sync_changes")
+    op.drop_table("sync_changes")
+    op.drop_table("tenant_change_seqs")
@@ -0,0 +1,85 @@
+"""work order full text search
+
+Revision ID: 0013_work_order_search
+Revises: 0012_sync_changes
+Create Date: 2026-10-18 14:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0013_work_order_search"
+down_revision = "0012_sync_changes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "work_order_search",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("work_order_id", sa.String(), nullable=False, unique=True),
+        sa.Column("tenant_id", sa.String(), nullable=False),
+        sa.Column("client_id", sa.String(), nullable=True),
+        sa.Column("document", sa.String(), nullable=False),
+    )
+    op.create_index("ix_work_order_search_tenant_id", "work_order_search", ["tenant_id"])
+
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute(
+            "ALTER TABLE work_order_search ADD COLUMN document_tsv tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('portuguese', coalesce(document, ''))) STORED"
+        )
+        op.execute("CREATE INDEX ix_work_order_search_document_tsv ON work_order_search USING GIN (document_tsv)")
+        op.execute(
+            """
+            INSERT INTO work_order_search (work_order_id, tenant_id, client_id, document)
+            SELECT w.id, w.tenant_id, w.client_id,
+                   concat_ws(' ', w.code_human, w.title, w.description, w.materials, w.conclusion,
+                             (SELECT string_agg(concat_ws(' ', i.answer_value, i.note), ' ' ORDER BY i.order_index)
+                                FROM work_order_items i WHERE i.work_order_id = w.id))
+              FROM work_orders w
+            """
+        )
+    elif dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE work_order_fts USING fts5(document, content='work_order_search', "
+            "content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER work_order_search_ai AFTER INSERT ON work_order_search BEGIN "
+            "INSERT INTO work_order_fts(rowid, document) VALUES (new.id, new.document); END"
+        )
+        op.execute(
+            "CREATE TRIGGER work_order_search_ad AFTER DELETE ON work_order_search BEGIN "
+            "INSERT INTO work_order_fts(work_order_fts, rowid, document) VALUES ('delete', old.id, old.document); END"
+        )
+        op.execute(
+            "CREATE TRIGGER work_order_search_au AFTER UPDATE ON work_order_search BEGIN "
+            "INSERT INTO work_order_fts(work_order_fts, rowid, document) VALUES ('delete', old.id, old.document); "
+            "INSERT INTO work_order_fts(rowid, document) VALUES (new.id, new.document); END"
+        )
+        op.execute(
+            """
+            INSERT INTO work_order_search (work_order_id, tenant_id, client_id, document)
+            SELECT w.id, w.tenant_id, w.client_id,
+                   trim(coalesce(w.code_human, '') || ' ' || coalesce(w.title, '') || ' ' ||
+                        coalesce(w.description, '') || ' ' || coalesce(w.materials, '') || ' ' ||
+                        coalesce(w.conclusion, '') || ' ' ||
+                        coalesce((SELECT group_concat(coalesce(i.answer_value, '') || ' ' || coalesce(i.note, ''), ' ')
+                                    FROM work_order_items i WHERE i.work_order_id = w.id), ''))
+              FROM work_orders w
+            """
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS work_order_search_au")
+        op.execute("DROP TRIGGER IF EXISTS work_order_search_ad")
+        op.execute("DROP TRIGGER IF EXISTS work_order_search_ai")
+        op.execute("DROP TABLE IF EXISTS work_order_fts")
+    op.drop_index("ix_work_order_search_tenant_id", table_name="work_order_search")
+    op.drop_table("work_order_search")
@@ -0,0 +1,26 @@
+"""work order facet index
+
+Revision ID: 0014_work_order_facets_index
+Revises: 0013_work_order_search
+Create Date: 2026-10-18 15:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "0014_work_order_facets_index"
+down_revision = "0013_work_order_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_work_orders_tenant_facets",
+        "work_orders",
+        ["tenant_id", "status", "priority", "type", "client_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_work_orders_tenant_facets", table_name="work_orders")
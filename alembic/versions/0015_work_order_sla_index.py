@@ -0,0 +1,29 @@
+"""work order pending sla index
+
+Revision ID: 0015_work_order_sla_index
+Revises: 0014_work_order_facets_index
+Create Date: 2026-10-18 16:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0015_work_order_sla_index"
+down_revision = "0014_work_order_facets_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_work_orders_sla_pending",
+        "work_orders",
+        ["tenant_id", "sla_due_at"],
+        postgresql_where=sa.text("sla_breached IS NOT TRUE"),
+        sqlite_where=sa.text("sla_breached IS NOT TRUE"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_work_orders_sla_pending", table_name="work_orders")
@@ -0,0 +1,30 @@
+"""collection versions for conditional get
+
+Revision ID: 0016_conditional_get_versions
+Revises: 0015_work_order_sla_index
+Create Date: 2026-10-18 17:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0016_conditional_get_versions"
+down_revision = "0015_work_order_sla_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tenant_collection_versions",
+        sa.Column("tenant_id", sa.String(), primary_key=True),
+        sa.Column("collection", sa.String(), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_sync_changes_work_order_seq", "sync_changes", ["work_order_id", "seq"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sync_changes_work_order_seq", table_name="sync_changes")
+    op.drop_table("tenant_collection_versions")
@@ -0,0 +1,85 @@
+"""numeric coordinates for work order events
+
+Revision ID: 0017_work_order_event_coordinates
+Revises: 0016_conditional_get_versions
+Create Date: 2026-10-18 18:00:00.000000
+"""
+
+import math
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0017_work_order_event_coordinates"
+down_revision = "0016_conditional_get_versions"
+branch_labels = None
+depends_on = None
+
+NUMBER_PATTERN = r"^\s*-?[0-9]+(\.[0-9]+)?\s*$"
+
+
+def _parse_coordinate(value, limit: float):
+    # Copia congelada de gps_track.parse_coordinate: a revisao nao depende do codigo da aplicacao.
+    if value is None or value == "":
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(number) or abs(number) > limit:
+        return None
+    return number
+
+
+def upgrade() -> None:
+    op.add_column("work_order_events", sa.Column("latitude", sa.Float(), nullable=True))
+    op.add_column("work_order_events", sa.Column("longitude", sa.Float(), nullable=True))
+    op.create_index(
+        "ix_work_order_events_work_order_ts",
+        "work_order_events",
+        ["work_order_id", "client_timestamp"],
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "UPDATE work_order_events SET latitude = CAST(lat AS DOUBLE PRECISION), "
+            "longitude = CAST(lng AS DOUBLE PRECISION) "
+            f"WHERE lat ~ '{NUMBER_PATTERN}' AND lng ~ '{NUMBER_PATTERN}'"
+        )
+    else:
+        # CAST no SQLite transforma texto nao numerico em 0.0; o backfill usa a mesma regra de parse da API.
+        bind = op.get_bind()
+        events = sa.table(
+            "work_order_events",
+            sa.column("id", sa.String),
+            sa.column("lat", sa.String),
+            sa.column("lng", sa.String),
+            sa.column("latitude", sa.Float),
+            sa.column("longitude", sa.Float),
+        )
+        rows = bind.execute(
+            sa.select(events.c.id, events.c.lat, events.c.lng).where(events.c.lat.isnot(None), events.c.lng.isnot(None))
+        ).all()
+        values = []
+        for event_id, lat, lng in rows:
+            latitude, longitude = _parse_coordinate(lat, 90.0), _parse_coordinate(lng, 180.0)
+            if latitude is not None and longitude is not None:
+                values.append({"event_id": event_id, "latitude": latitude, "longitude": longitude})
+        if values:
+            bind.execute(
+                events.update()
+                .where(events.c.id == sa.bindparam("event_id"))
+                .values(latitude=sa.bindparam("latitude"), longitude=sa.bindparam("longitude")),
+                values,
+            )
+    op.execute(
+        "UPDATE work_order_events SET latitude = NULL, longitude = NULL "
+        "WHERE latitude > 90 OR latitude < -90 OR longitude > 180 OR longitude < -180"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_work_order_events_work_order_ts", table_name="work_order_events")
+    op.drop_column("work_order_events", "longitude")
+    op.drop_column("work_order_events", "latitude")
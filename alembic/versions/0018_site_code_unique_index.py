@@ -0,0 +1,38 @@
+"""unique site code per tenant for bulk upsert
+
+Revision ID: 0018_site_code_unique_index
+Revises: 0017_work_order_event_coordinates
+Create Date: 2026-10-18 20:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0018_site_code_unique_index"
+down_revision = "0017_work_order_event_coordinates"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # Codigo em branco e "sem codigo": vira NULL, que nao conflita no indice unico.
+    op.execute("UPDATE sites SET code = NULL WHERE TRIM(code) = ''")
+    duplicates = bind.execute(
+        sa.text(
+            "SELECT tenant_id, code, COUNT(*) FROM sites WHERE code IS NOT NULL "
+            "GROUP BY tenant_id, code HAVING COUNT(*) > 1 ORDER BY tenant_id, code"
+        )
+    ).all()
+    if duplicates:
+        listing = "; ".join(f"tenant={tenant_id} codigo={code!r} ({count} sites)" for tenant_id, code, count in duplicates[:20])
+        raise RuntimeError(
+            f"Ha {len(duplicates)} codigos de site duplicados no mesmo tenant: {listing}. "
+            "Renomeie ou remova os sites repetidos e rode a migracao de novo."
+        )
+    op.create_index("ix_sites_tenant_code", "sites", ["tenant_id", "code"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sites_tenant_code", table_name="sites")
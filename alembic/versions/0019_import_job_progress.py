@@ -0,0 +1,23 @@
+"""import job progress
+
+Revision ID: 0019_import_job_progress
+Revises: 0018_site_code_unique_index
+Create Date: 2026-10-18 21:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0019_import_job_progress"
+down_revision = "0018_site_code_unique_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("import_jobs", sa.Column("progress_json", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("import_jobs", "progress_json")
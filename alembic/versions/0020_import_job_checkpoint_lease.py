@@ -0,0 +1,27 @@
+"""import job checkpoint and lease
+
+Revision ID: 0020_import_job_checkpoint_lease
+Revises: 0019_import_job_progress
+Create Date: 2026-10-18 22:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0020_import_job_checkpoint_lease"
+down_revision = "0019_import_job_progress"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("import_jobs", sa.Column("checkpoint_json", sa.JSON(), nullable=True))
+    op.add_column("import_jobs", sa.Column("lease_owner", sa.String(), nullable=True))
+    op.add_column("import_jobs", sa.Column("lease_expires_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("import_jobs", "lease_expires_at")
+    op.drop_column("import_jobs", "lease_owner")
+    op.drop_column("import_jobs", "checkpoint_json")
@@ -0,0 +1,40 @@
+"""db-backed job queue
+
+Revision ID: 0021_queue_jobs
+Revises: 0020_import_job_checkpoint_lease
+Create Date: 2026-10-18 23:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0021_queue_jobs"
+down_revision = "0020_import_job_checkpoint_lease"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "queue_jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("queue", sa.String(), nullable=False),
+        sa.Column("task", sa.String(), nullable=False),
+        sa.Column("payload_json", sa.JSON(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="5"),
+        sa.Column("available_at", sa.DateTime(), nullable=False),
+        sa.Column("locked_by", sa.String(), nullable=True),
+        sa.Column("locked_until", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_queue_jobs_claim", "queue_jobs", ["queue", "status", "available_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_queue_jobs_claim", table_name="queue_jobs")
+    op.drop_table("queue_jobs")
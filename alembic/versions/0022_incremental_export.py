@@ -0,0 +1,41 @@
+"""incremental export: updated_at indexes and tombstones
+
+Revision ID: 0022_incremental_export
+Revises: 0021_queue_jobs
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0022_incremental_export"
+down_revision = "0021_queue_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("clients", sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.text("(CURRENT_TIMESTAMP)")))
+    op.execute("UPDATE clients SET updated_at = created_at")
+    op.create_index("ix_clients_tenant_updated", "clients", ["tenant_id", "updated_at", "id"])
+    op.create_index("ix_sites_tenant_updated", "sites", ["tenant_id", "updated_at", "id"])
+    op.create_index("ix_assets_tenant_updated", "assets", ["tenant_id", "updated_at", "id"])
+    op.create_table(
+        "tombstones",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("tenant_id", sa.String(), nullable=False),
+        sa.Column("entity", sa.String(), nullable=False),
+        sa.Column("record_id", sa.String(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_tombstones_tenant_entity_deleted", "tombstones", ["tenant_id", "entity", "deleted_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tombstones_tenant_entity_deleted", table_name="tombstones")
+    op.drop_table("tombstones")
+    op.drop_index("ix_assets_tenant_updated", table_name="assets")
+    op.drop_index("ix_sites_tenant_updated", table_name="sites")
+    op.drop_index("ix_clients_tenant_updated", table_name="clients")
+    op.drop_column("clients", "updated_at")
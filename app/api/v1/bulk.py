@@ -1,19 +1,27 @@
+import asyncio
+import json
 import os
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Request, UploadFile
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 
 from app.bulk.config import ENTITY_CONFIGS
-from app.bulk.exporter import count_records, run_export_job
+from app.bulk.exporter import run_export_job
 from app.bulk.importer import ImportValidationError, run_job, validate_job
+from app.bulk.incremental import INCREMENTAL_MODELS, CursorError, export_changes
+from app.bulk.lease import ImportLeaseError
 from app.bulk.storage import StorageClient, StorageError
-from app.bulk.tasks import enqueue_http_task
+from app.bulk.tasks import dispatch_bulk_job, enqueue_bulk_job
 from app.core.security import require_permission
 from app.db import models
 from app.db.session import get_db
 
 router = APIRouter(prefix="/bulk", tags=["Bulk"])
 
+IMPORT_FINAL_STATUSES = {"ready_to_confirm", "completed", "failed"}
+PROGRESS_KEEPALIVE_SECONDS = 15
+
 
 def _ensure_entity(entity: str):
     if entity not in ENTITY_CONFIGS:
@@ -145,7 +153,6 @@ def validate_import(
 @router.post("/import/{job_id}/confirm")
 def confirm_import(
     job_id: str,
-    background: BackgroundTasks,
     db=Depends(get_db),
     current_user: models.User = Depends(require_permission("cadastros.importar")),
 ):
@@ -172,7 +179,6 @@ def confirm_import(
         raise HTTPException(status_code=409, detail="Ja existe importacao em andamento para esta entidade.")
 
     job.status = "queued"
-    db.commit()
     _log_audit(
         db,
         current_user.tenant_id,
@@ -180,33 +186,23 @@ def confirm_import(
         "bulk.import.confirm",
         {"job_id": job.id, "entity": job.entity},
     )
+    enqueue_bulk_job(db, "import", job.id)
     db.commit()
-    queued = enqueue_http_task(f"/api/bulk/worker/import/{job.id}", {"job_id": str(job.id)})
-    if not queued:
-        background.add_task(_run_import_inline, job.id)
+    dispatch_bulk_job("import", job.id)
     return {"status": "queued"}
 
 
-def _run_import_inline(job_id: str):
-    from app.db.session import SessionLocal
-
-    db = SessionLocal()
-    try:
-        job = db.query(models.ImportJob).filter(models.ImportJob.id == job_id).first()
-        if not job:
-            return
-        run_job(db, job)
-    finally:
-        db.close()
-
-
 @router.post("/worker/import/{job_id}")
 def run_import_worker(job_id: str, request: Request, db=Depends(get_db)):
     _verify_worker(request)
     job = db.query(models.ImportJob).filter(models.ImportJob.id == job_id).first()
     if not job:
         return {"status": "not_found"}
-    run_job(db, job)
+    try:
+        run_job(db, job)
+    except ImportLeaseError as exc:
+        # 409 faz o Cloud Tasks tentar de novo depois; se o outro worker morreu, o lease expira.
+        raise HTTPException(status_code=409, detail=str(exc))
     return {"status": job.status}
 
 
@@ -231,12 +227,67 @@ def get_import_job(
         "summary": job.summary_json,
         "preview": job.preview_json,
         "error_report_url": storage.generate_signed_url(job.error_report_url) if job.error_report_url else None,
+        "progress": job.progress_json,
         "created_at": job.created_at,
         "started_at": job.started_at,
         "finished_at": job.finished_at,
     }
 
 
+def _import_progress_state(job_id: str, tenant_id: str) -> dict | None:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        job = (
+            db.query(models.ImportJob)
+            .filter(models.ImportJob.id == job_id, models.ImportJob.tenant_id == tenant_id)
+            .first()
+        )
+        if not job:
+            return None
+        return {"status": job.status, "progress": job.progress_json, "summary": job.summary_json}
+    finally:
+        db.close()
+
+
+@router.get("/import/{job_id}/progress/stream")
+async def stream_import_progress(
+    job_id: str,
+    request: Request,
+    current_user: models.User = Depends(require_permission("cadastros.importar")),
+):
+    """Server-sent events com o progresso do job; encerra quando o job chega a um status final."""
+    tenant_id = current_user.tenant_id
+    state = await run_in_threadpool(_import_progress_state, job_id, tenant_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Job nao encontrado")
+    interval = float(os.getenv("BULK_PROGRESS_STREAM_INTERVAL_SECONDS", "1"))
+
+    async def _events():
+        current, last, idle = state, None, 0.0
+        while True:
+            if current != last:
+                yield f"event: progress\ndata: {json.dumps(current, default=str)}\n\n"
+                last, idle = current, 0.0
+            elif idle >= PROGRESS_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            if current is None or current["status"] in IMPORT_FINAL_STATUSES:
+                return
+            await asyncio.sleep(interval)
+            idle += interval
+            if await request.is_disconnected():
+                return
+            current = await run_in_threadpool(_import_progress_state, job_id, tenant_id)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/import")
 def list_import_jobs(
     entity: str | None = None,
@@ -309,26 +360,31 @@ def download_errors(job_id: str, db=Depends(get_db), current_user: models.User =
 @router.get("/export/{entity}")
 def export_entity(
     entity: str,
-    background: BackgroundTasks,
+    since: str | None = None,
+    limit: int = 1000,
     db=Depends(get_db),
     current_user: models.User = Depends(require_permission("cadastros.exportar")),
 ):
+    from app.bulk.templates import XLSX_CONTENT_TYPE, build_export, export_exceeds
+
     _ensure_entity(entity)
+    if since is not None:
+        return _export_changes(db, current_user, entity, since, limit)
     limit = int(os.getenv("BULK_EXPORT_SYNC_LIMIT", "2000"))
-    total = count_records(db, current_user.tenant_id, entity)
-    if total <= limit:
-        from app.bulk.templates import build_export
-
-        content, filename = build_export(db, current_user.tenant_id, entity)
+    if not export_exceeds(db, current_user.tenant_id, entity, limit):
+        handle, filename, exported = build_export(db, current_user.tenant_id, entity)
         storage = StorageClient()
         dest = f"bulk/exports/{current_user.tenant_id}/{entity}/{filename}"
-        url = storage.upload_bytes(content, dest, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        try:
+            url, _, _ = storage.upload_file(handle, dest, XLSX_CONTENT_TYPE)
+        finally:
+            handle.close()
         _log_audit(
             db,
             current_user.tenant_id,
             current_user.id,
             "bulk.export.completed",
-            {"entity": entity, "exported": total},
+            {"entity": entity, "exported": exported},
         )
         db.commit()
         return {"url": storage.generate_signed_url(url)}
@@ -341,20 +397,38 @@ def export_entity(
         created_by_user_id=current_user.id,
     )
     db.add(job)
+    db.flush()
     _log_audit(
         db,
         current_user.tenant_id,
         current_user.id,
         "bulk.export.queued",
-        {"job_id": job.id, "entity": entity, "total": total},
+        {"job_id": job.id, "entity": entity, "sync_limit": limit},
     )
+    enqueue_bulk_job(db, "export", job.id)
     db.commit()
-    queued = enqueue_http_task(f"/api/bulk/worker/export/{job.id}", {"job_id": str(job.id)})
-    if not queued:
-        background.add_task(_run_export_inline, job.id)
+    dispatch_bulk_job("export", job.id)
     return {"job_id": job.id, "status": job.status}
 
 
+def _export_changes(db, current_user: models.User, entity: str, since: str, limit: int) -> dict:
+    if entity not in INCREMENTAL_MODELS:
+        raise HTTPException(status_code=400, detail="Exportacao incremental nao suportada para esta entidade")
+    try:
+        result = export_changes(db, current_user.tenant_id, entity, since, limit)
+    except CursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    _log_audit(
+        db,
+        current_user.tenant_id,
+        current_user.id,
+        "bulk.export.incremental",
+        {"entity": entity, "exported": len(result["rows"]), "deleted": len(result["deleted"])},
+    )
+    db.commit()
+    return result
+
+
 @router.get("/export/jobs")
 def list_export_jobs(
     db=Depends(get_db),
@@ -412,19 +486,6 @@ def run_export_worker(job_id: str, request: Request, db=Depends(get_db)):
     return {"status": job.status}
 
 
-def _run_export_inline(job_id: str):
-    from app.db.session import SessionLocal
-
-    db = SessionLocal()
-    try:
-        job = db.query(models.ExportJob).filter(models.ExportJob.id == job_id).first()
-        if not job:
-            return
-        run_export_job(db, job)
-    finally:
-        db.close()
-
-
 def _verify_worker(request: Request) -> None:
     secret = os.getenv("BULK_TASKS_SECRET")
     if secret:
@@ -1,13 +1,15 @@
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app.core.authorization import apply_scope_to_query, require_scope_or_admin
+from app.core.http_cache import etag_matches, not_modified, set_etag, weak_etag
 from app.core.security import require_permission
 from app.db import models
 from app.db.session import get_db
+from app.services.collection_versions import collection_versions
 
 router = APIRouter(tags=["OS Types"])
 
@@ -53,8 +55,15 @@ def list_os_types(
     client_id: str | None = Query(default=None),
     current_user: models.User = Depends(require_permission("os.view")),
     db: Session = Depends(get_db),
+    request: Request = None,
+    response: Response = None,
 ):
     scope = require_scope_or_admin(db, current_user)
+    (version,) = collection_versions(db, current_user.tenant_id, "os_types")
+    etag = weak_etag("os-types", current_user.tenant_id, version, sorted(scope["clients"] or []), client_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     query = db.query(models.OSType).filter(models.OSType.tenant_id == current_user.tenant_id)
     query = apply_scope_to_query(query, scope, client_field=models.OSType.client_id)
     if client_id:
@@ -1,12 +1,14 @@
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
+from app.core.http_cache import etag_matches, not_modified, set_etag, weak_etag
 from app.core.security import require_permission
 from app.db import models
 from app.db.session import get_db
+from app.services.collection_versions import collection_versions
 
 router = APIRouter(tags=["Questionnaires"])
 
@@ -45,7 +47,14 @@ def _to_response(item: models.Questionnaire) -> QuestionnaireResponse:
 def list_questionnaires(
     current_user: models.User = Depends(require_permission("os.view")),
     db: Session = Depends(get_db),
+    request: Request = None,
+    response: Response = None,
 ):
+    (version,) = collection_versions(db, current_user.tenant_id, "questionnaires")
+    etag = weak_etag("questionnaires", current_user.tenant_id, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     items = (
         db.query(models.Questionnaire)
         .filter(models.Questionnaire.tenant_id == current_user.tenant_id)
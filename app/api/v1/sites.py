@@ -2,6 +2,7 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.core.authorization import apply_scope_to_query, enforce_client_user_scope, require_scope_or_admin
@@ -12,6 +13,29 @@ from app.db.session import get_db
 router = APIRouter(tags=["Sites"])
 
 
+def _commit_site(db: Session) -> None:
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Codigo de site ja cadastrado")
+
+
+def _normalize_code(code: str | None) -> str | None:
+    code = (code or "").strip()
+    return code or None
+
+
+def _ensure_code_available(db: Session, tenant_id: str, code: str | None, site_id: str | None = None) -> None:
+    if not code:
+        return
+    query = db.query(models.Site.id).filter(models.Site.tenant_id == tenant_id, models.Site.code == code)
+    if site_id:
+        query = query.filter(models.Site.id != site_id)
+    if query.first():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Codigo de site ja cadastrado")
+
+
 class SiteCreate(BaseModel):
     nome: str = Field(..., min_length=1)
     code: str | None = None
@@ -116,17 +140,19 @@ def create_site(
 ):
     tenant = _get_tenant(current_user, db)
     customer_account_id = _validate_customer_account(tenant, payload.customer_account_id, db)
+    code = _normalize_code(payload.code)
+    _ensure_code_available(db, current_user.tenant_id, code)
     site = models.Site(
         id=str(uuid.uuid4()),
         tenant_id=current_user.tenant_id,
         customer_account_id=customer_account_id,
-        code=payload.code,
+        code=code,
         name=payload.nome,
         status=payload.status or "ATIVO",
         address=payload.endereco,
     )
     db.add(site)
-    db.commit()
+    _commit_site(db)
     db.refresh(site)
     return _to_response(site)
 
@@ -172,7 +198,9 @@ def update_site(
     if payload.nome is not None:
         site.name = payload.nome
     if payload.code is not None:
-        site.code = payload.code
+        code = _normalize_code(payload.code)
+        _ensure_code_available(db, current_user.tenant_id, code, site.id)
+        site.code = code
     if payload.status is not None:
         site.status = payload.status
     if payload.endereco is not None:
@@ -180,7 +208,7 @@ def update_site(
     if "customer_account_id" in payload.__fields_set__:
         customer_account_id = _validate_customer_account(tenant, payload.customer_account_id, db)
         site.customer_account_id = customer_account_id
-    db.commit()
+    _commit_site(db)
     db.refresh(site)
     return _to_response(site)
 
@@ -0,0 +1,26 @@
+import hmac
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.services.sla import evaluate_sla
+
+router = APIRouter(tags=["SLA"])
+
+
+def _verify_scheduler(request: Request) -> None:
+    # Sem segredo configurado o endpoint fica fechado: a avaliacao altera todos os tenants.
+    secret = os.getenv("SLA_SCHEDULER_SECRET")
+    if not secret:
+        raise HTTPException(status_code=503, detail="Agendador de SLA nao configurado")
+    header = request.headers.get("X-Scheduler-Secret") or ""
+    if not hmac.compare_digest(header, secret):
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+
+@router.post("/sla/evaluate")
+def evaluate_sla_endpoint(request: Request, db: Session = Depends(get_db)):
+    _verify_scheduler(request)
+    return evaluate_sla(db)
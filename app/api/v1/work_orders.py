@@ -2,14 +2,16 @@ from datetime import datetime, timedelta
 from io import BytesIO
 import os
 import hashlib
+import hmac
 import uuid
 import base64
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Form, HTTPException, Request, UploadFile, status
+from fastapi import APIRouter, Depends, Form, HTTPException, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
-from PIL import Image
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload, selectinload
 import qrcode
 
 from app.core.authorization import (
@@ -17,6 +19,8 @@ from app.core.authorization import (
     enforce_client_user_scope,
     require_scope_or_admin,
 )
+from app.core.config import settings
+from app.core.http_cache import etag_matches, not_modified, set_etag, weak_etag
 from app.core.security import (
     get_current_user,
     get_user_permissions,
@@ -25,9 +29,41 @@ from app.core.security import (
 )
 from app.db import models
 from app.db.session import get_db
+from app.services.attachment_blobs import (
+    add_blob_ref,
+    blob_object_names,
+    existing_hashes,
+    find_blob,
+    hash_file,
+    register_blob,
+    release_blob,
+)
+from app.services.collection_versions import collection_version_expr
 from app.services.geocode import reverse_geocode
-from app.services.os_pdf import render_os_pdf
-from app.services.storage import delete_object, generate_signed_url, upload_bytes
+from app.services.gps_track import encode_track, parse_coordinate, simplify_track
+from app.services.pdf_jobs import compute_pdf_digest, get_pdf_job_runner
+from app.services.sync_log import current_seq, fetch_changes
+from app.services.work_order_bulk import checklist_template, create_work_orders_bulk, validate_rows
+from app.services.work_order_search import search_work_orders
+from app.services.storage import (
+    StorageError,
+    delete_object,
+    generate_signed_url,
+    generate_signed_urls,
+    signed_url_epoch,
+    upload_bytes,
+    upload_stream,
+)
+from app.services.thumbnails import render_thumbnail
+from app.services.upload_sessions import (
+    MIME_SIGNATURES,
+    UploadMissingError,
+    UploadVerificationError,
+    get_upload_backend,
+    schedule_thumbnail,
+    session_ttl_minutes,
+    verify_upload,
+)
 
 router = APIRouter(tags=["Work Orders"])
 
@@ -131,6 +167,32 @@ class WorkOrderCreate(BaseModel):
     items: Optional[List[WorkOrderItemCreate]] = None
 
 
+class WorkOrderBulkRow(BaseModel):
+    client_id: str
+    contract_id: Optional[str] = None
+    site_id: Optional[str] = None
+    asset_id: Optional[str] = None
+    responsible_user_id: Optional[str] = None
+    assigned_user_id: Optional[str] = None
+    code_human: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    type: Optional[str] = None
+    priority: Optional[str] = None
+    scheduled_start: Optional[datetime] = None
+    scheduled_end: Optional[datetime] = None
+    sla_due_at: Optional[datetime] = None
+
+
+class WorkOrderBulkCreate(BaseModel):
+    questionnaire_id: str
+    title: Optional[str] = None
+    description: Optional[str] = None
+    type: Optional[str] = None
+    priority: Optional[str] = None
+    rows: List[WorkOrderBulkRow] = Field(..., min_length=1, max_length=5000)
+
+
 class WorkOrderUpdate(BaseModel):
     client_id: Optional[str] = None
     contract_id: Optional[str] = None
@@ -185,26 +247,70 @@ class PublicLinkResponse(BaseModel):
     allowed_view: str
 
 
-def _safe_signed_url(object_name: Optional[str]) -> Optional[str]:
-    if not object_name:
-        return None
-    try:
-        return generate_signed_url(object_name)
-    except Exception:
-        return None
+class AttachmentHashCheck(BaseModel):
+    hashes: List[str] = Field(default_factory=list, max_length=500)
+
+
+class UploadSessionCreate(BaseModel):
+    target: str = "attachment"
+    file_name: str = Field(..., min_length=1)
+    mime: str
+    size: int = Field(..., gt=0)
+    sha256: str = Field(..., pattern="^[0-9a-fA-F]{64}$")
+    scope: Optional[str] = None
+    item_id: Optional[str] = None
+    question_id: Optional[str] = None
+    role: Optional[str] = None
 
 
-def _attachment_to_dict(att: models.WorkOrderAttachment) -> dict:
+class AttachmentFromHash(BaseModel):
+    sha256: str
+    scope: str
+    file_name: Optional[str] = None
+    item_id: Optional[str] = None
+    question_id: Optional[str] = None
+
+
+def _safe_signed_urls(object_names: list[Optional[str]]) -> dict[str, str]:
+    if not any(object_names):
+        return {}
+    try:
+        return generate_signed_urls(object_names)
+    except Exception:
+        return {}
+
+
+def _sign_attachments(
+    attachments: list[models.WorkOrderAttachment],
+    thumbnails_only: bool = False,
+    extra_objects: tuple[Optional[str], ...] = (),
+) -> dict[str, str]:
+    object_names: list[Optional[str]] = list(extra_objects)
+    for att in attachments:
+        if not thumbnails_only:
+            object_names.append(att.url)
+        object_names.append(att.thumb_url)
+    return _safe_signed_urls(object_names)
+
+
+def _attachment_to_dict(
+    att: models.WorkOrderAttachment,
+    signed_urls: Optional[dict[str, str]] = None,
+    thumbnails_only: bool = False,
+) -> dict:
+    if signed_urls is None:
+        signed_urls = _sign_attachments([att], thumbnails_only)
     return {
         "id": att.id,
         "file_name": att.file_name,
-        "url": _safe_signed_url(att.url),
-        "thumb_url": _safe_signed_url(att.thumb_url),
+        "url": None if thumbnails_only else signed_urls.get(att.url or ""),
+        "thumb_url": signed_urls.get(att.thumb_url or ""),
         "item_id": att.item_id,
         "question_id": att.question_id,
         "scope": att.scope,
         "mime": att.mime,
         "size": att.size,
+        "sha256": att.sha256,
         "created_at": att.created_at,
     }
 
@@ -214,13 +320,45 @@ def _build_object_name(work_order_id: str, scope: str, filename: str) -> str:
     return f"work_orders/{work_order_id}/{scope}/{uuid.uuid4().hex}_{safe_name}"
 
 
-def _make_thumbnail(data: bytes) -> bytes:
-    image = Image.open(BytesIO(data))
-    image = image.convert("RGB")
-    image.thumbnail((600, 600))
-    out = BytesIO()
-    image.save(out, format="JPEG", quality=82)
-    return out.getvalue()
+def _attachment_max_bytes() -> int:
+    return int(os.getenv("ATTACHMENT_MAX_FILE_MB", "25")) * 1024 * 1024
+
+
+def _stream_to_storage(file: UploadFile, object_name: str) -> tuple[int, str]:
+    try:
+        _, size, sha256 = upload_stream(
+            file.file,
+            object_name,
+            content_type=file.content_type,
+            max_bytes=_attachment_max_bytes(),
+        )
+    except StorageError as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc)) from exc
+    return size, sha256
+
+
+def _store_upload(db: Session, tenant_id: str, file: UploadFile) -> dict:
+    try:
+        sha256, size = hash_file(file.file, _attachment_max_bytes())
+    except StorageError as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc)) from exc
+    blob = find_blob(db, tenant_id, sha256)
+    if blob and add_blob_ref(db, blob):
+        return {
+            "object_name": blob.object_name,
+            "thumb_name": blob.thumb_object_name,
+            "size": size,
+            "sha256": sha256,
+        }
+
+    object_name, thumb_name = blob_object_names(tenant_id, sha256)
+    _stream_to_storage(file, object_name)
+    if file.content_type and file.content_type.startswith("image/"):
+        upload_bytes(render_thumbnail(file.file), thumb_name, content_type="image/jpeg")
+    else:
+        thumb_name = None
+    register_blob(db, tenant_id, sha256, object_name, thumb_name, file.content_type, size)
+    return {"object_name": object_name, "thumb_name": thumb_name, "size": size, "sha256": sha256}
 
 
 def _to_response(os: models.WorkOrder) -> WorkOrderResponse:
@@ -257,7 +395,21 @@ def _to_response(os: models.WorkOrder) -> WorkOrderResponse:
     )
 
 
-def _to_detail(os: models.WorkOrder) -> WorkOrderDetailResponse:
+def _to_detail(
+    os: models.WorkOrder,
+    attachment_payloads: Optional[list[dict]] = None,
+    thumbnails_only: bool = False,
+) -> WorkOrderDetailResponse:
+    if attachment_payloads is None:
+        item_attachments = [att for item in os.items for att in item.attachments]
+        signed_urls = _sign_attachments(item_attachments, thumbnails_only)
+        attachment_payloads = [
+            _attachment_to_dict(att, signed_urls, thumbnails_only) for att in item_attachments
+        ]
+    attachments_by_item: dict[str, list[dict]] = {}
+    for att in attachment_payloads:
+        if att["item_id"]:
+            attachments_by_item.setdefault(att["item_id"], []).append(att)
     items = [
         WorkOrderItemResponse(
             id=item.id,
@@ -268,7 +420,7 @@ def _to_detail(os: models.WorkOrder) -> WorkOrderDetailResponse:
             answer_value=item.answer_value,
             answer_numeric=item.answer_numeric,
             note=item.note,
-            attachments=[_attachment_to_dict(att) for att in item.attachments],
+            attachments=attachments_by_item.get(item.id, []),
         )
         for item in sorted(os.items, key=lambda i: i.order_index)
     ]
@@ -280,10 +432,53 @@ def _to_detail(os: models.WorkOrder) -> WorkOrderDetailResponse:
     )
 
 
+def _load_print_graph(db: Session, tenant_id: str, work_order_id: str) -> Optional[models.WorkOrder]:
+    return (
+        db.query(models.WorkOrder)
+        .options(
+            joinedload(models.WorkOrder.client),
+            joinedload(models.WorkOrder.site),
+            selectinload(models.WorkOrder.items),
+            selectinload(models.WorkOrder.activities),
+        )
+        .filter(models.WorkOrder.id == work_order_id, models.WorkOrder.tenant_id == tenant_id)
+        .first()
+    )
+
+
+def _work_order_version_expr():
+    return (
+        select(func.max(models.SyncChange.seq))
+        .where(models.SyncChange.work_order_id == models.WorkOrder.id)
+        .correlate(models.WorkOrder)
+        .scalar_subquery()
+    )
+
+
+def _print_data_validator(db: Session, tenant_id: str, work_order_id: str):
+    row = (
+        db.query(
+            models.WorkOrder.client_id,
+            models.WorkOrder.updated_at,
+            _work_order_version_expr(),
+            *(collection_version_expr(tenant_id, name) for name in ("clients", "sites", "assets")),
+        )
+        .filter(models.WorkOrder.id == work_order_id, models.WorkOrder.tenant_id == tenant_id)
+        .first()
+    )
+    if not row:
+        return None, None
+    return row.client_id, weak_etag("print-data", work_order_id, *row[1:], signed_url_epoch())
+
+
 def _assert_os_scope(db: Session, user: models.User, os: models.WorkOrder) -> None:
+    _assert_client_scope(db, user, os.client_id)
+
+
+def _assert_client_scope(db: Session, user: models.User, client_id: Optional[str]) -> None:
     scope = require_scope_or_admin(db, user)
-    enforce_client_user_scope(user, os.client_id)
-    if scope["clients"] and os.client_id not in scope["clients"]:
+    enforce_client_user_scope(user, client_id)
+    if scope["clients"] and client_id not in scope["clients"]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="OS fora do escopo")
 
 
@@ -368,6 +563,27 @@ def _can_close_os(db: Session, user: models.User, os: models.WorkOrder) -> None:
         )
 
 
+TRACK_ONLY_EVENT_TYPES = ("LOCATION",)
+FACET_FIELDS = ("status", "priority", "type", "client_id")
+
+
+def _facet_counts(query, fields: list[str]) -> tuple[dict[str, list[dict]], int]:
+    columns = [getattr(models.WorkOrder, field) for field in fields]
+    rows = query.with_entities(*columns, func.count()).group_by(*columns).order_by(None).all()
+    counts: dict[str, dict] = {field: {} for field in fields}
+    for row in rows:
+        for idx, field in enumerate(fields):
+            counts[field][row[idx]] = counts[field].get(row[idx], 0) + row[-1]
+    facets = {
+        field: [
+            {"value": value, "count": count}
+            for value, count in sorted(values.items(), key=lambda entry: (-entry[1], str(entry[0])))
+        ]
+        for field, values in counts.items()
+    }
+    return facets, sum(row[-1] for row in rows)
+
+
 @router.get("/work-orders")
 def list_work_orders(
     status_filter: Optional[str] = None,
@@ -376,6 +592,7 @@ def list_work_orders(
     client_id: Optional[str] = None,
     page: int = 1,
     page_size: int = 20,
+    facets: Optional[str] = None,
     current_user: models.User = Depends(require_permission("os.view")),
     db: Session = Depends(get_db),
 ):
@@ -391,14 +608,28 @@ def list_work_orders(
     if client_id:
         query = query.filter(models.WorkOrder.client_id == client_id)
 
-    total = query.count()
+    facet_fields = [field.strip() for field in (facets or "").split(",") if field.strip()]
+    invalid = [field for field in facet_fields if field not in FACET_FIELDS]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Facet invalido: {', '.join(invalid)}",
+        )
+    facet_counts = None
+    if facet_fields:
+        facet_counts, total = _facet_counts(query, facet_fields)
+    else:
+        total = query.count()
     items = (
         query.order_by(models.WorkOrder.created_at.desc())
         .offset((page - 1) * page_size)
         .limit(page_size)
         .all()
     )
-    return {"items": [_to_response(os) for os in items], "total": total}
+    response = {"items": [_to_response(os) for os in items], "total": total}
+    if facet_counts is not None:
+        response["facets"] = facet_counts
+    return response
 
 
 @router.post("/work-orders", status_code=status.HTTP_201_CREATED)
@@ -452,21 +683,107 @@ def create_work_order(
     return _to_detail(new_os)
 
 
+@router.post("/work-orders/bulk")
+def create_work_orders_bulk_endpoint(
+    payload: WorkOrderBulkCreate,
+    current_user: models.User = Depends(require_permission("os.edit")),
+    db: Session = Depends(get_db),
+):
+    scope = require_scope_or_admin(db, current_user)
+    questionnaire = (
+        db.query(models.Questionnaire)
+        .options(selectinload(models.Questionnaire.items))
+        .filter(
+            models.Questionnaire.id == payload.questionnaire_id,
+            models.Questionnaire.tenant_id == current_user.tenant_id,
+        )
+        .first()
+    )
+    if not questionnaire:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Questionario nao encontrado")
+    checklist = checklist_template(questionnaire)
+    defaults = {
+        "title": payload.title or questionnaire.title,
+        "description": payload.description,
+        "type": payload.type,
+        "priority": payload.priority,
+    }
+    rows = []
+    for row in payload.rows:
+        values = row.model_dump()
+        for field, value in defaults.items():
+            if values.get(field) is None:
+                values[field] = value
+        rows.append(values)
+    allowed_clients = [current_user.client_id] if current_user.role == "CLIENTE" else scope["clients"]
+    errors = validate_rows(db, current_user.tenant_id, rows, allowed_clients)
+    created = create_work_orders_bulk(db, current_user.tenant_id, rows, checklist, errors)
+    return {
+        "created": created,
+        "errors": [{"row": idx, "error": message} for idx, message in sorted(errors.items())],
+    }
+
+
+@router.get("/work-orders/search")
+def search_work_orders_endpoint(
+    q: str,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    current_user: models.User = Depends(require_permission("os.view")),
+    db: Session = Depends(get_db),
+):
+    scope = require_scope_or_admin(db, current_user)
+    client_ids = [current_user.client_id] if current_user.role == "CLIENTE" else scope["clients"]
+    try:
+        ids, next_cursor = search_work_orders(
+            db,
+            current_user.tenant_id,
+            q,
+            limit=max(1, min(limit, 100)),
+            cursor=cursor,
+            client_ids=client_ids,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    rows = (
+        db.query(models.WorkOrder)
+        .options(joinedload(models.WorkOrder.client))
+        .filter(models.WorkOrder.id.in_(ids))
+        .all()
+        if ids
+        else []
+    )
+    by_id = {os.id: os for os in rows}
+    return {
+        "items": [_to_response(by_id[os_id]) for os_id in ids if os_id in by_id],
+        "next_cursor": next_cursor,
+    }
+
+
 @router.get("/work-orders/{work_order_id}")
 def get_work_order(
     work_order_id: str,
+    thumbnails_only: bool = False,
     current_user: models.User = Depends(require_permission("os.view")),
     db: Session = Depends(get_db),
+    request: Request = None,
+    response: Response = None,
 ):
-    os = (
-        db.query(models.WorkOrder)
+    row = (
+        db.query(models.WorkOrder, _work_order_version_expr(), collection_version_expr(current_user.tenant_id, "clients"))
         .filter(models.WorkOrder.id == work_order_id, models.WorkOrder.tenant_id == current_user.tenant_id)
         .first()
     )
-    if not os:
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="OS nao encontrada")
+    os, version, clients_version = row
     _assert_os_scope(db, current_user, os)
-    return {"os": _to_detail(os)}
+    # `clienteNome` vem do cliente: renomea-lo precisa invalidar o ETag.
+    etag = weak_etag("os", os.id, os.updated_at, version, clients_version, thumbnails_only, signed_url_epoch())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return {"os": _to_detail(os, thumbnails_only=thumbnails_only)}
 
 
 @router.post("/work-orders/{work_order_id}/public-link", response_model=PublicLinkResponse)
@@ -516,6 +833,7 @@ def create_public_link(
 @router.get("/public/work-orders/{token}")
 def get_public_work_order(
     token: str,
+    thumbnails_only: bool = False,
     db: Session = Depends(get_db),
 ):
     token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
@@ -537,7 +855,7 @@ def get_public_work_order(
     )
     if not os:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="OS nao encontrada")
-    return {"os": _to_detail(os), "allowed_view": link.allowed_view}
+    return {"os": _to_detail(os, thumbnails_only=thumbnails_only), "allowed_view": link.allowed_view}
 
 
 @router.get("/work-orders/{work_order_id}/activities")
@@ -566,6 +884,73 @@ def list_work_order_activities(
     return {"items": [WorkOrderActivityResponse.model_validate(item).model_dump() for item in activities]}
 
 
+@router.get("/work-orders/{work_order_id}/timeline")
+def get_work_order_timeline(
+    work_order_id: str,
+    max_points: int = 500,
+    user_id: Optional[str] = None,
+    current_user: models.User = Depends(require_permission("os.view")),
+    db: Session = Depends(get_db),
+):
+    max_points = max(2, min(max_points, 5000))
+    os = (
+        db.query(models.WorkOrder)
+        .filter(models.WorkOrder.id == work_order_id, models.WorkOrder.tenant_id == current_user.tenant_id)
+        .first()
+    )
+    if not os:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="OS nao encontrada")
+    _assert_os_scope(db, current_user, os)
+
+    event_filters = [models.WorkOrderEvent.work_order_id == work_order_id]
+    if user_id:
+        event_filters.append(models.WorkOrderEvent.user_id == user_id)
+    points = [
+        tuple(row)
+        for row in db.query(
+            models.WorkOrderEvent.client_timestamp,
+            models.WorkOrderEvent.latitude,
+            models.WorkOrderEvent.longitude,
+        )
+        .filter(
+            *event_filters,
+            models.WorkOrderEvent.client_timestamp.isnot(None),
+            models.WorkOrderEvent.latitude.isnot(None),
+            models.WorkOrderEvent.longitude.isnot(None),
+        )
+        .order_by(models.WorkOrderEvent.client_timestamp.asc())
+    ]
+    events = (
+        db.query(
+            models.WorkOrderEvent.id,
+            models.WorkOrderEvent.type,
+            models.WorkOrderEvent.user_id,
+            models.WorkOrderEvent.client_timestamp,
+            models.WorkOrderEvent.server_received_at,
+            models.WorkOrderEvent.latitude,
+            models.WorkOrderEvent.longitude,
+        )
+        .filter(*event_filters, models.WorkOrderEvent.type.notin_(TRACK_ONLY_EVENT_TYPES))
+        .all()
+    )
+    events.sort(key=lambda event: event.client_timestamp or event.server_received_at)
+    return {
+        "work_order_id": work_order_id,
+        "events": [
+            {
+                "id": event.id,
+                "type": event.type,
+                "user_id": event.user_id,
+                "at": event.client_timestamp or event.server_received_at,
+                "lat": event.latitude,
+                "lng": event.longitude,
+            }
+            for event in events
+        ],
+        "track": encode_track(simplify_track(points, max_points), total=len(points)),
+    }
+
+
 @router.put("/work-orders/{work_order_id}")
 @router.patch("/work-orders/{work_order_id}")
 def update_work_order(
@@ -629,6 +1014,8 @@ def _create_event(
         client_timestamp=payload.client_timestamp,
         lat=payload.lat,
         lng=payload.lng,
+        latitude=parse_coordinate(payload.lat, 90.0),
+        longitude=parse_coordinate(payload.lng),
         accuracy_m=payload.accuracy_m,
         altitude=payload.altitude,
         heading=payload.heading,
@@ -974,8 +1361,17 @@ def delete_work_order(
     if not os:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="OS não encontrada")
     _assert_os_scope(db, current_user, os)
+    orphaned = []
+    attachments = db.query(models.WorkOrderAttachment).filter(models.WorkOrderAttachment.work_order_id == os.id).all()
+    for attachment in attachments:
+        if attachment.sha256:
+            orphaned.extend(release_blob(db, current_user.tenant_id, attachment.sha256))
+        else:
+            orphaned.extend(name for name in (attachment.url, attachment.thumb_url) if name)
     db.delete(os)
     db.commit()
+    for object_name in orphaned:
+        delete_object(object_name)
     return None
 
 
@@ -1035,14 +1431,7 @@ def upload_attachment(
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item não encontrado")
 
-    data = file.file.read()
-    object_name = _build_object_name(work_order_id, "QUESTION", file.filename or "anexo")
-    upload_bytes(data, object_name, content_type=file.content_type)
-    thumb_name = None
-    if file.content_type and file.content_type.startswith("image/"):
-        thumb_data = _make_thumbnail(data)
-        thumb_name = _build_object_name(work_order_id, "QUESTION_THUMB", file.filename or "thumb.jpg")
-        upload_bytes(thumb_data, thumb_name, content_type="image/jpeg")
+    stored = _store_upload(db, current_user.tenant_id, file)
 
     attachment = models.WorkOrderAttachment(
         id=str(uuid.uuid4()),
@@ -1052,9 +1441,10 @@ def upload_attachment(
         scope="QUESTION",
         file_name=file.filename or "anexo",
         mime=file.content_type,
-        size=len(data),
-        url=object_name,
-        thumb_url=thumb_name,
+        size=stored["size"],
+        url=stored["object_name"],
+        thumb_url=stored["thumb_name"],
+        sha256=stored["sha256"],
         created_by=current_user.id,
     )
     db.add(attachment)
@@ -1063,6 +1453,20 @@ def upload_attachment(
     return _attachment_to_dict(attachment)
 
 
+def _normalize_attachment_target(
+    scope: str,
+    item_id: Optional[str],
+    question_id: Optional[str],
+) -> tuple[str, Optional[str]]:
+    normalized_scope = scope.upper()
+    if normalized_scope not in {"QUESTION", "CHECKIN", "CHECKOUT", "SIGNATURE"}:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Scope invalido")
+    attachment_item_id = item_id or question_id
+    if normalized_scope == "QUESTION" and not attachment_item_id:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="item_id e obrigatorio")
+    return normalized_scope, attachment_item_id
+
+
 @router.post("/work-orders/{work_order_id}/attachments", status_code=status.HTTP_201_CREATED)
 def upload_work_order_attachment(
     work_order_id: str,
@@ -1081,21 +1485,9 @@ def upload_work_order_attachment(
     if not os:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="OS nao encontrada")
     _assert_os_scope(db, current_user, os)
-    normalized_scope = scope.upper()
-    if normalized_scope not in {"QUESTION", "CHECKIN", "CHECKOUT", "SIGNATURE"}:
-        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Scope invalido")
-    attachment_item_id = item_id or question_id
-    if normalized_scope == "QUESTION" and not attachment_item_id:
-        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="item_id e obrigatorio")
+    normalized_scope, attachment_item_id = _normalize_attachment_target(scope, item_id, question_id)
 
-    data = file.file.read()
-    object_name = _build_object_name(work_order_id, normalized_scope, file.filename or "anexo")
-    upload_bytes(data, object_name, content_type=file.content_type)
-    thumb_name = None
-    if file.content_type and file.content_type.startswith("image/"):
-        thumb_data = _make_thumbnail(data)
-        thumb_name = _build_object_name(work_order_id, f"{normalized_scope}_THUMB", file.filename or "thumb.jpg")
-        upload_bytes(thumb_data, thumb_name, content_type="image/jpeg")
+    stored = _store_upload(db, current_user.tenant_id, file)
 
     attachment = models.WorkOrderAttachment(
         id=str(uuid.uuid4()),
@@ -1105,9 +1497,10 @@ def upload_work_order_attachment(
         scope=normalized_scope,
         file_name=file.filename or "anexo",
         mime=file.content_type,
-        size=len(data),
-        url=object_name,
-        thumb_url=thumb_name,
+        size=stored["size"],
+        url=stored["object_name"],
+        thumb_url=stored["thumb_name"],
+        sha256=stored["sha256"],
         created_by=current_user.id,
     )
     db.add(attachment)
@@ -1133,15 +1526,69 @@ def delete_attachment(
     )
     if not attachment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Anexo não encontrado")
-    if attachment.url:
-        delete_object(attachment.url)
-    if attachment.thumb_url:
-        delete_object(attachment.thumb_url)
+    if attachment.sha256:
+        orphaned = release_blob(db, current_user.tenant_id, attachment.sha256)
+    else:
+        orphaned = [name for name in (attachment.url, attachment.thumb_url) if name]
     db.delete(attachment)
     db.commit()
+    for object_name in orphaned:
+        delete_object(object_name)
     return None
 
 
+@router.post("/attachments/hash-check")
+def check_attachment_hashes(
+    payload: AttachmentHashCheck,
+    current_user: models.User = Depends(require_permission("os.edit")),
+    db: Session = Depends(get_db),
+):
+    return {"existing": sorted(existing_hashes(db, current_user.tenant_id, payload.hashes))}
+
+
+@router.post("/work-orders/{work_order_id}/attachments/from-hash", status_code=status.HTTP_201_CREATED)
+def create_attachment_from_hash(
+    work_order_id: str,
+    payload: AttachmentFromHash,
+    current_user: models.User = Depends(require_permission("os.edit")),
+    db: Session = Depends(get_db),
+):
+    os = (
+        db.query(models.WorkOrder)
+        .filter(models.WorkOrder.id == work_order_id, models.WorkOrder.tenant_id == current_user.tenant_id)
+        .first()
+    )
+    if not os:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="OS nao encontrada")
+    _assert_os_scope(db, current_user, os)
+    normalized_scope, attachment_item_id = _normalize_attachment_target(
+        payload.scope, payload.item_id, payload.question_id
+    )
+    sha256 = payload.sha256.lower()
+    blob = find_blob(db, current_user.tenant_id, sha256)
+    if not blob or not add_blob_ref(db, blob):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Arquivo nao encontrado")
+
+    attachment = models.WorkOrderAttachment(
+        id=str(uuid.uuid4()),
+        work_order_id=work_order_id,
+        item_id=attachment_item_id,
+        question_id=payload.question_id,
+        scope=normalized_scope,
+        file_name=payload.file_name or "anexo",
+        mime=blob.mime,
+        size=blob.size,
+        url=blob.object_name,
+        thumb_url=blob.thumb_object_name,
+        sha256=sha256,
+        created_by=current_user.id,
+    )
+    db.add(attachment)
+    db.commit()
+    db.refresh(attachment)
+    return _attachment_to_dict(attachment)
+
+
 @router.post("/work-orders/{work_order_id}/signatures")
 def upload_signature(
     work_order_id: str,
@@ -1168,9 +1615,8 @@ def upload_signature(
         signatures[role_key]["name"] = name
 
     if file:
-        data = file.file.read()
         object_name = _build_object_name(work_order_id, "SIGNATURE", file.filename or "assinatura.png")
-        upload_bytes(data, object_name, content_type=file.content_type)
+        _stream_to_storage(file, object_name)
         signatures[role_key]["image_object"] = object_name
 
     os.signatures = signatures
@@ -1178,10 +1624,33 @@ def upload_signature(
     return {"status": "ok", "signatures": signatures}
 
 
-@router.get("/work-orders/{work_order_id}/print-data")
-def get_print_data(
+def _get_upload_session(db: Session, user: models.User, session_id: str) -> models.UploadSession:
+    session = (
+        db.query(models.UploadSession)
+        .filter(models.UploadSession.id == session_id, models.UploadSession.tenant_id == user.tenant_id)
+        .first()
+    )
+    if not session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sessao de upload nao encontrada")
+    return session
+
+
+def _upload_session_result(db: Session, session: models.UploadSession) -> dict:
+    if session.target == "signature":
+        os = db.query(models.WorkOrder).filter(models.WorkOrder.id == session.work_order_id).first()
+        return {"status": "ok", "signatures": os.signatures if os else None}
+    attachment = (
+        db.query(models.WorkOrderAttachment).filter(models.WorkOrderAttachment.id == session.result_id).first()
+    )
+    return _attachment_to_dict(attachment)
+
+
+@router.post("/work-orders/{work_order_id}/upload-sessions", status_code=status.HTTP_201_CREATED)
+def create_upload_session(
     work_order_id: str,
-    current_user: models.User = Depends(require_permission("os.view")),
+    payload: UploadSessionCreate,
+    request: Request,
+    current_user: models.User = Depends(require_permission("os.edit")),
     db: Session = Depends(get_db),
 ):
     os = (
@@ -1190,8 +1659,205 @@ def get_print_data(
         .first()
     )
     if not os:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="OS não encontrada")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="OS nao encontrada")
+    _assert_os_scope(db, current_user, os)
+    target = payload.target.lower()
+    scope = None
+    item_id = None
+    role = None
+    if target == "attachment":
+        scope, item_id = _normalize_attachment_target(payload.scope or "", payload.item_id, payload.question_id)
+    elif target == "signature":
+        role = (payload.role or "").lower()
+        if role not in {"tecnico", "cliente"}:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Role invalida")
+    else:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Target invalido")
+    if payload.mime not in MIME_SIGNATURES:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Tipo de arquivo invalido")
+    if payload.size > _attachment_max_bytes():
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Arquivo excede o tamanho maximo permitido.",
+        )
+
+    sha256 = payload.sha256.lower()
+    skip_upload = target == "attachment" and find_blob(db, current_user.tenant_id, sha256) is not None
+    backend = get_upload_backend()
+    token = uuid.uuid4().hex
+    session = models.UploadSession(
+        id=str(uuid.uuid4()),
+        tenant_id=current_user.tenant_id,
+        work_order_id=work_order_id,
+        target=target,
+        scope=scope,
+        item_id=item_id,
+        question_id=payload.question_id,
+        role=role,
+        file_name=payload.file_name,
+        mime=payload.mime,
+        expected_size=payload.size,
+        expected_sha256=sha256,
+        token_hash=hashlib.sha256(token.encode("utf-8")).hexdigest() if backend.is_local else None,
+        status="pending",
+        created_by_user_id=current_user.id,
+        expires_at=datetime.utcnow() + timedelta(minutes=session_ttl_minutes()),
+    )
+    session.staging_object = backend.staging_name(session)
+    upload_url = None if skip_upload else backend.upload_url(session, token, str(request.base_url))
+    db.add(session)
+    db.commit()
+    return {
+        "session_id": session.id,
+        "upload_url": upload_url,
+        "method": "PUT",
+        "headers": {"Content-Type": session.mime},
+        "expires_at": session.expires_at,
+        "skip_upload": skip_upload,
+    }
+
+
+def _writable_upload_session(db: Session, backend, session_id: str, token: str) -> models.UploadSession:
+    token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    session = (
+        db.query(models.UploadSession)
+        .filter(models.UploadSession.id == session_id, models.UploadSession.token_hash == token_hash)
+        .first()
+    )
+    if not backend.is_local or not session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sessao de upload nao encontrada")
+    if session.status != "pending" or session.expires_at < datetime.utcnow():
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Sessao de upload expirada")
+    return session
+
+
+@router.put("/upload-sessions/{session_id}/content")
+async def put_upload_session_content(
+    session_id: str,
+    token: str,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    # O corpo e lido no event loop; consulta e gravacao em disco vao para o threadpool.
+    backend = await run_in_threadpool(get_upload_backend)
+    session = await run_in_threadpool(_writable_upload_session, db, backend, session_id, token)
+    try:
+        size = await backend.write(session, request.stream())
+    except UploadVerificationError as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc)) from exc
+    return {"status": "ok", "size": size}
+
+
+@router.post("/upload-sessions/{session_id}/finalize")
+def finalize_upload_session(
+    session_id: str,
+    current_user: models.User = Depends(require_permission("os.edit")),
+    db: Session = Depends(get_db),
+):
+    session = _get_upload_session(db, current_user, session_id)
+    os = db.query(models.WorkOrder).filter(models.WorkOrder.id == session.work_order_id).first()
+    if not os:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="OS nao encontrada")
     _assert_os_scope(db, current_user, os)
+    if session.status == "finalized":
+        return _upload_session_result(db, session)
+    if session.status != "pending":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Sessao de upload nao esta pendente")
+    backend = get_upload_backend()
+    if session.expires_at < datetime.utcnow():
+        backend.discard(session)
+        session.status = "expired"
+        db.commit()
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Sessao de upload expirada")
+
+    blob = None
+    if session.target == "attachment":
+        blob = find_blob(db, session.tenant_id, session.expected_sha256)
+        if blob and not add_blob_ref(db, blob):
+            blob = None
+    thumbnail_blob_id = None
+    if blob:
+        backend.discard(session)
+    else:
+        try:
+            with backend.open(session) as handle:
+                verify_upload(handle, session.expected_size, session.expected_sha256, session.mime)
+        except UploadMissingError as exc:
+            # `skip_upload` foi concedido por um blob que sumiu (ou nao aceitou nova referencia) antes do finalize.
+            session.status = "failed"
+            session.error_message = str(exc)
+            db.commit()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Arquivo nao enviado; crie uma nova sessao e envie o conteudo.",
+            ) from exc
+        except UploadVerificationError as exc:
+            backend.discard(session)
+            session.status = "failed"
+            session.error_message = str(exc)
+            db.commit()
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+        if session.target == "attachment":
+            object_name, _ = blob_object_names(session.tenant_id, session.expected_sha256)
+            backend.publish(session, object_name)
+            blob = register_blob(
+                db,
+                session.tenant_id,
+                session.expected_sha256,
+                object_name,
+                None,
+                session.mime,
+                session.expected_size,
+            )
+            if session.mime.startswith("image/") and not blob.thumb_object_name:
+                thumbnail_blob_id = blob.id
+
+    if session.target == "signature":
+        object_name = _build_object_name(session.work_order_id, "SIGNATURE", session.file_name)
+        backend.publish(session, object_name)
+        signatures = dict(os.signatures or {"tecnico": {}, "cliente": {}})
+        signatures[session.role] = {**(signatures.get(session.role) or {}), "image_object": object_name}
+        os.signatures = signatures
+    else:
+        attachment = models.WorkOrderAttachment(
+            id=str(uuid.uuid4()),
+            work_order_id=session.work_order_id,
+            item_id=session.item_id,
+            question_id=session.question_id,
+            scope=session.scope,
+            file_name=session.file_name,
+            mime=session.mime,
+            size=session.expected_size,
+            url=blob.object_name,
+            thumb_url=blob.thumb_object_name,
+            sha256=session.expected_sha256,
+            created_by=current_user.id,
+        )
+        db.add(attachment)
+        session.result_id = attachment.id
+    session.status = "finalized"
+    session.finalized_at = datetime.utcnow()
+    db.commit()
+    if thumbnail_blob_id:
+        schedule_thumbnail(thumbnail_blob_id)
+    return _upload_session_result(db, session)
+
+
+@router.get("/work-orders/{work_order_id}/print-data")
+def get_print_data(
+    work_order_id: str,
+    current_user: models.User = Depends(require_permission("os.view")),
+    db: Session = Depends(get_db),
+    request: Request = None,
+    response: Response = None,
+):
+    client_id, etag = _print_data_validator(db, current_user.tenant_id, work_order_id)
+    if not etag:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="OS não encontrada")
+    _assert_client_scope(db, current_user, client_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    os = _load_print_graph(db, current_user.tenant_id, work_order_id)
 
     def _backfill_check_address(field_name: str) -> dict:
         payload = getattr(os, field_name) or {}
@@ -1230,14 +1896,20 @@ def get_print_data(
         updated = updated or before != (os.checkout_data or {})
     if updated:
         db.commit()
-
+        os = _load_print_graph(db, current_user.tenant_id, work_order_id)
+        _, etag = _print_data_validator(db, current_user.tenant_id, work_order_id)
+    set_etag(response, etag)
 
     attachments = (
         db.query(models.WorkOrderAttachment)
         .filter(models.WorkOrderAttachment.work_order_id == work_order_id)
+        .order_by(models.WorkOrderAttachment.created_at.asc())
         .all()
     )
-    attachment_payloads = [_attachment_to_dict(att) for att in attachments]
+    signatures = os.signatures or {"tecnico": {}, "cliente": {}}
+    signature_objects = tuple(signatures.get(key, {}).get("image_object") for key in ("tecnico", "cliente"))
+    signed_urls = _sign_attachments(attachments, extra_objects=signature_objects)
+    attachment_payloads = [_attachment_to_dict(att, signed_urls) for att in attachments]
     activities = []
     for activity in sorted(os.activities, key=lambda a: a.name or ""):
         duration = activity.duration_ms_server or activity.duration_ms_client
@@ -1312,13 +1984,12 @@ def get_print_data(
                 "status": asset.status,
             }
 
-    signatures = os.signatures or {"tecnico": {}, "cliente": {}}
     for key in ("tecnico", "cliente"):
         img_obj = signatures.get(key, {}).get("image_object")
         if img_obj:
-            signatures[key]["image_url"] = generate_signed_url(img_obj)
+            signatures[key]["image_url"] = signed_urls.get(img_obj)
 
-    detail_payload = _to_detail(os).model_dump()
+    detail_payload = _to_detail(os, attachment_payloads).model_dump()
     detail_payload["signatures"] = signatures
 
     return {
@@ -1336,18 +2007,58 @@ def get_print_data(
     }
 
 
-@router.post("/work-orders/{work_order_id}/generate-pdf")
-def generate_pdf(
-    work_order_id: str,
-    current_user: models.User = Depends(require_permission("os.view")),
-    db: Session = Depends(get_db),
-):
-    data = get_print_data(work_order_id, current_user=current_user, db=db)
+def _pdf_link_token(link_id: str) -> str:
+    # Derivado do id para que o QR de um novo render possa reaproveitar o link; so o hash fica no banco.
+    return hmac.new(settings.SECRET_KEY.encode("utf-8"), f"pdf-link:{link_id}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _pdf_public_link(db: Session, user: models.User, work_order_id: str) -> tuple[models.PublicLink, str]:
+    """Reaproveita o link valido do ultimo PDF da OS; o novo link so e gravado no commit do job."""
+    min_link_hours = int(os.getenv("PDF_CACHE_MIN_LINK_HOURS", "24"))
+    links = (
+        db.query(models.PublicLink)
+        .join(models.PdfJob, models.PdfJob.public_link_id == models.PublicLink.id)
+        .filter(
+            models.PdfJob.tenant_id == user.tenant_id,
+            models.PdfJob.work_order_id == work_order_id,
+            models.PublicLink.revoked_at.is_(None),
+            models.PublicLink.expires_at > datetime.utcnow() + timedelta(hours=min_link_hours),
+        )
+        .order_by(models.PublicLink.expires_at.desc())
+        .all()
+    )
+    for link in links:
+        token = _pdf_link_token(link.id)
+        if hashlib.sha256(token.encode("utf-8")).hexdigest() == link.token_hash:
+            return link, token
+
+    link_id = str(uuid.uuid4())
+    token = _pdf_link_token(link_id)
+    link = models.PublicLink(
+        id=link_id,
+        tenant_id=user.tenant_id,
+        resource_type="WORK_ORDER",
+        resource_id=work_order_id,
+        token_hash=hashlib.sha256(token.encode("utf-8")).hexdigest(),
+        expires_at=datetime.utcnow() + timedelta(hours=168),
+        allowed_view="read_only",
+        created_by=user.id,
+    )
+    db.add(link)
+    return link, token
+
+
+def _build_pdf_payload(work_order_id: str, user: models.User, db: Session) -> tuple[dict, str]:
+    data = get_print_data(work_order_id, current_user=user, db=db)
     checkin = data.get("checkin") or {}
     checkout = data.get("checkout") or {}
     answers = data.get("answers") or []
-    attachments = data.get("attachments") or []
     activities = data.get("activities") or []
+    thumbs = {att["url"]: att["thumb_url"] for att in data.get("attachments") or [] if att["url"] and att["thumb_url"]}
+    for item in answers:
+        item["photos"] = [thumbs.get(url, url) for url in item.get("photos") or []]
+    checkin_photos = [thumbs.get(url, url) for url in data.get("checkin_photos") or []]
+    checkout_photos = [thumbs.get(url, url) for url in data.get("checkout_photos") or []]
     for activity in activities:
         duration_ms = activity.get("duration_ms") or 0
         total_seconds = int(duration_ms / 1000) if duration_ms else 0
@@ -1362,20 +2073,7 @@ def generate_pdf(
             evidence_sections.append({"title": item.get("question_text"), "photos": photos[3:]})
             item["photos"] = photos[:3]
 
-    token = uuid.uuid4().hex
-    token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
-    link = models.PublicLink(
-        id=str(uuid.uuid4()),
-        tenant_id=current_user.tenant_id,
-        resource_type="WORK_ORDER",
-        resource_id=work_order_id,
-        token_hash=token_hash,
-        expires_at=datetime.utcnow() + timedelta(hours=168),
-        allowed_view="read_only",
-        created_by=current_user.id,
-    )
-    db.add(link)
-    db.commit()
+    link, token = _pdf_public_link(db, user, work_order_id)
     public_url = f"/public/os/{token}"
 
     base_url = os.getenv("PUBLIC_APP_BASE_URL")
@@ -1394,8 +2092,8 @@ def generate_pdf(
         "client": data.get("client") or {},
         "site": data.get("site") or {},
         "asset": data.get("asset") or {},
-        "checkin": {**checkin, "photos": data.get("checkin_photos") or []},
-        "checkout": {**checkout, "photos": data.get("checkout_photos") or []},
+        "checkin": {**checkin, "photos": checkin_photos},
+        "checkout": {**checkout, "photos": checkout_photos},
         "answers": answers,
         "activities": activities,
         "materials": (data.get("os") or {}).get("materials"),
@@ -1404,10 +2102,158 @@ def generate_pdf(
         "evidence": evidence_sections,
         "qr_data_url": qr_data_url,
     }
-    pdf_bytes = render_os_pdf(pdf_payload)
-    object_name = _build_object_name(work_order_id, "PDF", f"os-{work_order_id}.pdf")
-    upload_bytes(pdf_bytes, object_name, content_type="application/pdf")
-    return {"url": generate_signed_url(object_name), "object": object_name}
+    return pdf_payload, link.id
+
+
+def _pdf_content_digest(db: Session, work_order: models.WorkOrder) -> str:
+    attachment_ids = [
+        att_id
+        for (att_id,) in db.query(models.WorkOrderAttachment.id)
+        .filter(models.WorkOrderAttachment.work_order_id == work_order.id)
+        .all()
+    ]
+    return compute_pdf_digest(work_order, attachment_ids)
+
+
+def _find_cached_pdf_job(db: Session, work_order: models.WorkOrder, digest: str) -> Optional[models.PdfJob]:
+    min_link_hours = int(os.getenv("PDF_CACHE_MIN_LINK_HOURS", "24"))
+    valid_until = datetime.utcnow() + timedelta(hours=min_link_hours)
+    return (
+        db.query(models.PdfJob)
+        .join(models.PublicLink, models.PublicLink.id == models.PdfJob.public_link_id)
+        .filter(
+            models.PdfJob.tenant_id == work_order.tenant_id,
+            models.PdfJob.work_order_id == work_order.id,
+            models.PdfJob.content_digest == digest,
+            models.PdfJob.status == "completed",
+            models.PdfJob.object_name.isnot(None),
+            models.PublicLink.revoked_at.is_(None),
+            (models.PublicLink.expires_at.is_(None)) | (models.PublicLink.expires_at > valid_until),
+        )
+        .order_by(models.PdfJob.finished_at.desc())
+        .first()
+    )
+
+
+def _run_pdf_job(job_id: str) -> None:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        job = db.query(models.PdfJob).filter(models.PdfJob.id == job_id).first()
+        if not job or job.status not in {"queued", "running"}:
+            return
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        db.commit()
+        try:
+            user = db.query(models.User).filter(models.User.id == job.created_by_user_id).first()
+            if not user:
+                raise RuntimeError("Usuario do job nao encontrado")
+            pdf_payload, link_id = _build_pdf_payload(job.work_order_id, user, db)
+            work_order = _load_print_graph(db, job.tenant_id, job.work_order_id)
+            digest = _pdf_content_digest(db, work_order)
+            pdf_bytes = get_pdf_job_runner().render(pdf_payload)
+            object_name = f"work_orders/{job.work_order_id}/PDF/{digest}.pdf"
+            upload_bytes(pdf_bytes, object_name, content_type="application/pdf")
+            job.content_digest = digest
+            job.public_link_id = link_id
+            job.object_name = object_name
+            job.status = "completed"
+        except Exception as exc:
+            db.rollback()
+            job.status = "failed"
+            job.error_message = str(getattr(exc, "detail", None) or exc)[:500]
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+
+def _pdf_job_to_dict(job: models.PdfJob) -> dict:
+    return {
+        "job_id": job.id,
+        "work_order_id": job.work_order_id,
+        "status": job.status,
+        "content_digest": job.content_digest,
+        "error": job.error_message,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def _get_pdf_job(db: Session, user: models.User, work_order_id: str, job_id: str) -> models.PdfJob:
+    job = (
+        db.query(models.PdfJob)
+        .filter(
+            models.PdfJob.id == job_id,
+            models.PdfJob.work_order_id == work_order_id,
+            models.PdfJob.tenant_id == user.tenant_id,
+        )
+        .first()
+    )
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job de PDF nao encontrado")
+    return job
+
+
+@router.post("/work-orders/{work_order_id}/generate-pdf", status_code=status.HTTP_202_ACCEPTED)
+def generate_pdf(
+    work_order_id: str,
+    force: bool = False,
+    current_user: models.User = Depends(require_permission("os.view")),
+    db: Session = Depends(get_db),
+):
+    os = _load_print_graph(db, current_user.tenant_id, work_order_id)
+    if not os:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="OS não encontrada")
+    _assert_os_scope(db, current_user, os)
+
+    digest = _pdf_content_digest(db, os)
+    if not force:
+        cached = _find_cached_pdf_job(db, os, digest)
+        if cached:
+            return {**_pdf_job_to_dict(cached), "cached": True}
+
+    job = models.PdfJob(
+        id=str(uuid.uuid4()),
+        tenant_id=current_user.tenant_id,
+        work_order_id=work_order_id,
+        status="queued",
+        content_digest=digest,
+        created_by_user_id=current_user.id,
+    )
+    db.add(job)
+    db.commit()
+    get_pdf_job_runner().submit(current_user.tenant_id, _run_pdf_job, job.id)
+    db.refresh(job)
+    return {**_pdf_job_to_dict(job), "cached": False}
+
+
+@router.get("/work-orders/{work_order_id}/pdf-jobs/{job_id}")
+def get_pdf_job_status(
+    work_order_id: str,
+    job_id: str,
+    current_user: models.User = Depends(require_permission("os.view")),
+    db: Session = Depends(get_db),
+):
+    return _pdf_job_to_dict(_get_pdf_job(db, current_user, work_order_id, job_id))
+
+
+@router.get("/work-orders/{work_order_id}/pdf-jobs/{job_id}/result")
+def get_pdf_job_result(
+    work_order_id: str,
+    job_id: str,
+    current_user: models.User = Depends(require_permission("os.view")),
+    db: Session = Depends(get_db),
+):
+    job = _get_pdf_job(db, current_user, work_order_id, job_id)
+    if job.status == "failed":
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=job.error_message or "Falha ao gerar PDF")
+    if job.status != "completed" or not job.object_name:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="PDF ainda em processamento")
+    return {"url": generate_signed_url(job.object_name), "object": job.object_name}
 
 
 @router.post("/sync/events")
@@ -1497,6 +2343,8 @@ def sync_events(
                 type=event.type,
                 client_timestamp=event.client_timestamp,
                 server_received_at=datetime.utcnow(),
+                latitude=parse_coordinate(event.payload.get("lat"), 90.0),
+                longitude=parse_coordinate(event.payload.get("lng")),
                 offline_event_id=event.id,
                 sync_batch_id=payload.batch_id,
                 payload_resumo=event.payload,
@@ -1506,3 +2354,89 @@ def sync_events(
     _audit_log(db, request, current_user, "SYNC_EVENTS", current_user.id, {"created": created})
     db.commit()
     return {"status": "ok", "created": created}
+
+
+def _sync_payloads(db: Session, keys: list[tuple[str, str]]) -> dict[tuple[str, str], dict]:
+    ids: dict[str, list[str]] = {}
+    for entity, entity_id in keys:
+        ids.setdefault(entity, []).append(entity_id)
+    payloads: dict[tuple[str, str], dict] = {}
+    if ids.get("work_order"):
+        rows = (
+            db.query(models.WorkOrder)
+            .options(joinedload(models.WorkOrder.client))
+            .filter(models.WorkOrder.id.in_(ids["work_order"]))
+            .all()
+        )
+        for os in rows:
+            payloads[("work_order", os.id)] = {**_to_response(os).model_dump(), "description": os.description}
+    if ids.get("item"):
+        for item in db.query(models.WorkOrderItem).filter(models.WorkOrderItem.id.in_(ids["item"])).all():
+            payloads[("item", item.id)] = {
+                **WorkOrderItemResponse.model_validate(item).model_dump(exclude={"attachments"}),
+                "work_order_id": item.work_order_id,
+            }
+    if ids.get("activity"):
+        activities = db.query(models.WorkOrderActivity).filter(models.WorkOrderActivity.id.in_(ids["activity"])).all()
+        for activity in activities:
+            payloads[("activity", activity.id)] = {
+                **WorkOrderActivityResponse.model_validate(activity).model_dump(),
+                "work_order_id": activity.work_order_id,
+            }
+    if ids.get("attachment"):
+        attachments = (
+            db.query(models.WorkOrderAttachment)
+            .filter(models.WorkOrderAttachment.id.in_(ids["attachment"]))
+            .all()
+        )
+        signed_urls = _sign_attachments(attachments)
+        for att in attachments:
+            payloads[("attachment", att.id)] = {
+                **_attachment_to_dict(att, signed_urls),
+                "work_order_id": att.work_order_id,
+            }
+    return payloads
+
+
+@router.get("/sync/changes")
+def sync_changes(
+    cursor: int = 0,
+    limit: int = 200,
+    current_user: models.User = Depends(require_permission("os.view")),
+    db: Session = Depends(get_db),
+):
+    head = current_seq(db, current_user.tenant_id)
+    if cursor > head:
+        return {"changes": [], "cursor": head, "has_more": False, "reset": True}
+    if cursor == head:
+        return {"changes": [], "cursor": head, "has_more": False, "reset": False}
+
+    limit = max(1, min(limit, 1000))
+    scope = require_scope_or_admin(db, current_user)
+    client_ids = [current_user.client_id] if current_user.role == "CLIENTE" else scope["clients"]
+    roles = {role.nome for role in get_user_roles(db, current_user)}
+    assigned_user_id = current_user.id if "TECNICO" in roles else None
+    rows = fetch_changes(db, current_user.tenant_id, cursor, head, limit, client_ids, assigned_user_id)
+    has_more = len(rows) == limit
+    next_cursor = rows[-1].seq if has_more else head
+
+    latest: dict[tuple[str, str], models.SyncChange] = {}
+    for row in rows:
+        key = (row.entity, row.entity_id)
+        latest.pop(key, None)
+        latest[key] = row
+    payloads = _sync_payloads(db, [key for key, row in latest.items() if row.op == "upsert"])
+    changes = []
+    for key, row in latest.items():
+        data = payloads.get(key) if row.op == "upsert" else None
+        changes.append(
+            {
+                "entity": row.entity,
+                "id": row.entity_id,
+                "work_order_id": row.work_order_id,
+                "op": "upsert" if data else "delete",
+                "seq": row.seq,
+                "data": data,
+            }
+        )
+    return {"changes": changes, "cursor": next_cursor, "has_more": has_more, "reset": False}
@@ -1,8 +1,10 @@
-from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
 
 
 Transformer = Callable[[str], object]
+Validator = Tuple[Callable[[object], bool], str]
 
 
 @dataclass
@@ -13,6 +15,29 @@ class TemplateColumn:
     required: bool = False
 
 
+@dataclass(frozen=True)
+class RequireAny:
+    fields: Tuple[str, ...]
+    error_field: str
+    message: str
+
+
+@dataclass(frozen=True)
+class RequireWhen:
+    field: str
+    when_field: str
+    when_values: Tuple[str, ...]
+    message: str
+
+
+@dataclass(frozen=True)
+class MustResolve:
+    lookup: str
+    when_any: Tuple[str, ...]
+    error_field: str
+    message: str
+
+
 @dataclass
 class EntityImportConfig:
     entity: str
@@ -20,6 +45,10 @@ class EntityImportConfig:
     template_columns: List[TemplateColumn]
     unique_key_groups: List[List[str]]
     transformers: Dict[str, Transformer]
+    validators: Dict[str, List[Validator]] = field(default_factory=dict)
+    rules: List[object] = field(default_factory=list)
+    defaults: Dict[str, object] = field(default_factory=dict)
+    unique_in_file: bool = True
 
 
 def normalize_header(value: str) -> str:
@@ -89,6 +118,18 @@ def normalize_date(value: str):
     return parser.parse(value.strip()).date()
 
 
+def is_valid_email(value) -> bool:
+    return bool(re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", str(value)))
+
+
+def is_valid_cnpj(value) -> bool:
+    return len("".join(ch for ch in str(value) if ch.isdigit())) == 14
+
+
+EMAIL = (is_valid_email, "E-mail invalido")
+CNPJ = (is_valid_cnpj, "CNPJ invalido")
+
+
 def build_entity_configs() -> Dict[str, EntityImportConfig]:
     return {
         "employees": EntityImportConfig(
@@ -121,6 +162,7 @@ def build_entity_configs() -> Dict[str, EntityImportConfig]:
                 "especialidades": normalize_list,
                 "observacoes": normalize_text,
             },
+            validators={"email": [EMAIL]},
         ),
         "clients": EntityImportConfig(
             entity="clients",
@@ -142,6 +184,8 @@ def build_entity_configs() -> Dict[str, EntityImportConfig]:
                 "contract": normalize_text,
                 "address": normalize_text,
             },
+            validators={"document": [CNPJ]},
+            rules=[RequireAny(("document", "client_code"), "document", "Informe CNPJ ou Codigo do cliente")],
         ),
         "sites": EntityImportConfig(
             entity="sites",
@@ -163,6 +207,8 @@ def build_entity_configs() -> Dict[str, EntityImportConfig]:
                 "status": normalize_text,
                 "address": normalize_text,
             },
+            validators={"customer_account_cnpj": [CNPJ]},
+            rules=[MustResolve("customer_account_id", (), "customer_account_cnpj", "Cliente nao encontrado pelo CNPJ")],
         ),
         "assets": EntityImportConfig(
             entity="assets",
@@ -186,6 +232,13 @@ def build_entity_configs() -> Dict[str, EntityImportConfig]:
                 "client_code": normalize_text,
                 "site_code": normalize_text,
             },
+            validators={"client_cnpj": [CNPJ]},
+            rules=[
+                MustResolve(
+                    "client_id", ("client_cnpj", "client_code"), "client_cnpj", "Cliente nao encontrado pelo CNPJ/Codigo"
+                ),
+                MustResolve("site_id", ("site_code",), "site_code", "Site nao encontrado pelo codigo"),
+            ],
         ),
         "os_types": EntityImportConfig(
             entity="os_types",
@@ -205,6 +258,12 @@ def build_entity_configs() -> Dict[str, EntityImportConfig]:
                 "client_code": normalize_text,
                 "is_active": normalize_bool,
             },
+            validators={"client_cnpj": [CNPJ]},
+            rules=[
+                MustResolve(
+                    "client_id", ("client_cnpj", "client_code"), "client_cnpj", "Cliente nao encontrado pelo CNPJ/Codigo"
+                ),
+            ],
         ),
         "questionnaires": EntityImportConfig(
             entity="questionnaires",
@@ -226,6 +285,9 @@ def build_entity_configs() -> Dict[str, EntityImportConfig]:
                 "answer_type": normalize_text,
                 "items": normalize_list,
             },
+            rules=[RequireWhen("items", "answer_type", ("ITENS",), "Itens obrigatorios quando Tipo=ITENS")],
+            defaults={"version": 1},
+            unique_in_file=False,
         ),
     }
 
@@ -1,46 +1,60 @@
 import hashlib
 import os
-import re
 import tempfile
+import uuid
 from collections import defaultdict
 from datetime import datetime
-from typing import Dict, List, Tuple
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from openpyxl import Workbook
 
-from app.bulk.config import ENTITY_CONFIGS, label_for_key, make_header_map, normalize_header
-from app.bulk.parser import iter_rows
+from app.bulk.config import ENTITY_CONFIGS, label_for_key
+from app.bulk.lease import RUNNABLE_STATUSES, ImportLeaseError, acquire_lease, new_lease_owner, release_lease, renew_lease
+from app.bulk.lookups import ImportLookups, load_lookups
+from app.bulk.pipeline import RowPipeline
+from app.bulk.progress import ProgressTracker
+from app.bulk.spool import open_parsed_rows
 from app.bulk.storage import StorageClient
+from app.bulk.upsert import supports_native_upsert, upsert_chunk
 from app.db import models
 
 
 MAX_PREVIEW_ROWS = 20
 CHUNK_SIZE = 500
+# Lookups sao carregados por lote de linhas; o custo de memoria nao cresce com o arquivo.
+VALIDATE_CHUNK_SIZE = 5000
+# O upsert nativo nao carrega objetos na sessao; lotes maiores reduzem commits.
+UPSERT_CHUNK_SIZE = 5000
+ENTITY_MODELS = {
+    "employees": models.Colaborador,
+    "clients": models.Client,
+    "sites": models.Site,
+    "assets": models.Asset,
+    "os_types": models.OSType,
+    "questionnaires": models.Questionnaire,
+}
 
 
 class ImportValidationError(Exception):
     pass
 
 
-def _resolve_unique_key(row: Dict[str, object], unique_key_groups: List[List[str]]) -> Tuple[str, ...] | None:
-    for group in unique_key_groups:
-        if all(row.get(key) not in (None, "") for key in group):
-            return tuple(str(row.get(key)).strip() for key in group)
-    return None
+def _chunked(rows: Iterable, size: int) -> Iterator[list]:
+    """Lotes consumidos do iterador sob demanda: nunca ha mais que `size` linhas em memoria."""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
 
-def _append_error(errors: List[dict], row_number: int, field: str, message: str, severity: str = "error"):
-    errors.append(
-        {"row_number": row_number, "field": field, "message": message, "severity": severity}
-    )
-
-def _is_valid_email(value: str) -> bool:
-    return bool(re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", value))
-
-
-def _is_valid_cnpj(value: str) -> bool:
-    digits = "".join(ch for ch in value if ch.isdigit())
-    return len(digits) == 14
+def _validated_rows(job: models.ImportJob) -> Optional[int]:
+    summary = job.summary_json or {}
+    if not summary:
+        return None
+    return sum(summary.get(key, 0) for key in ("created", "updated", "skipped", "errors_count"))
 
 
 def _should_skip(mode: str, exists: bool) -> bool:
@@ -60,99 +74,27 @@ def validate_job(db, job: models.ImportJob) -> dict:
     db.commit()
 
     storage = StorageClient()
-    local_path = storage.download_to_temp(job.file_url)
-    header, rows = iter_rows(local_path)
-    header_map = make_header_map(config.template_columns)
-    canonical_headers = [header_map.get(normalize_header(h), "") for h in header]
-
-    required = [c.key for c in config.template_columns if c.required]
-    missing_required = [col for col in required if col not in canonical_headers]
-    if missing_required:
+    pipeline, parsed_rows = open_parsed_rows(storage, job, config)
+    if pipeline.missing_required:
         raise ImportValidationError(
-            "Faltou a coluna " + ", ".join(label_for_key(config, col).upper() for col in missing_required)
+            "Faltou a coluna " + ", ".join(label_for_key(config, col).upper() for col in pipeline.missing_required)
         )
 
     errors: List[dict] = []
     preview = {"created": 0, "updated": 0, "skipped": 0, "errors": 0, "samples": []}
     seen_keys = set()
-
-    db.query(models.ImportRowError).filter(models.ImportRowError.import_job_id == job.id).delete()
-
-    for idx, row in enumerate(rows, start=3):
-        row_data: Dict[str, object] = {}
-        for key, value in zip(canonical_headers, row):
-            if not key:
-                continue
-            raw = value.strip() if isinstance(value, str) else value
-            if raw in (None, ""):
+    progress = ProgressTracker(db, job)
+
+    progress.start("validating")
+    for chunk in _chunked(parsed_rows, VALIDATE_CHUNK_SIZE):
+        lookups = load_lookups(db, job.entity, job.tenant_id, [row_data for _, _, row_data, _ in chunk])
+        for idx, _, row_data, row_errors in chunk:
+            progress.advance()
+            pipeline.validate(row_data, idx, row_errors, lookups, seen_keys)
+            if row_errors:
+                errors.extend(row_errors)
                 continue
-            transformer = config.transformers.get(key)
-            try:
-                row_data[key] = transformer(str(raw)) if transformer else raw
-            except Exception:
-                _append_error(errors, idx, key, f"Valor invalido para {label_for_key(config, key)}")
-
-        if not any(str(cell).strip() for cell in row):
-            continue
-
-        for col in required:
-            if col not in row_data or row_data.get(col) in (None, ""):
-                _append_error(errors, idx, col, "Campo obrigatorio")
-
-        if "email" in row_data and not _is_valid_email(str(row_data.get("email"))):
-            _append_error(errors, idx, "email", "E-mail invalido")
-
-        if row_data.get("document") and not _is_valid_cnpj(str(row_data.get("document"))):
-            _append_error(errors, idx, "document", "CNPJ invalido")
-        if row_data.get("customer_account_cnpj") and not _is_valid_cnpj(str(row_data.get("customer_account_cnpj"))):
-            _append_error(errors, idx, "customer_account_cnpj", "CNPJ invalido")
-        if row_data.get("client_cnpj") and not _is_valid_cnpj(str(row_data.get("client_cnpj"))):
-            _append_error(errors, idx, "client_cnpj", "CNPJ invalido")
-
-        unique_key = _resolve_unique_key(row_data, config.unique_key_groups)
-        if not unique_key:
-            _append_error(errors, idx, "__unique__", "Chave unica nao encontrada")
-        elif job.entity != "questionnaires":
-            if unique_key in seen_keys:
-                _append_error(errors, idx, "__unique__", "Chave unica duplicada no arquivo")
-            else:
-                seen_keys.add(unique_key)
-
-        if job.entity == "questionnaires":
-            if "version" not in row_data:
-                row_data["version"] = 1
-            if row_data.get("answer_type", "").upper() == "ITENS" and not row_data.get("items"):
-                _append_error(errors, idx, "items", "Itens obrigatorios quando Tipo=ITENS")
-
-        if job.entity == "clients":
-            if not row_data.get("document") and not row_data.get("client_code"):
-                _append_error(errors, idx, "document", "Informe CNPJ ou Codigo do cliente")
-
-        if job.entity == "sites":
-            account_id = _resolve_customer_account_id(db, job.tenant_id, row_data)
-            if not account_id:
-                _append_error(errors, idx, "customer_account_cnpj", "Cliente nao encontrado pelo CNPJ")
-
-        if job.entity == "assets":
-            if row_data.get("client_cnpj") or row_data.get("client_code"):
-                if not _resolve_client_id(db, job.tenant_id, row_data):
-                    _append_error(errors, idx, "client_cnpj", "Cliente nao encontrado pelo CNPJ/Codigo")
-            if row_data.get("site_code"):
-                site = (
-                    db.query(models.Site)
-                    .filter(models.Site.tenant_id == job.tenant_id, models.Site.code == row_data.get("site_code"))
-                    .first()
-                )
-                if not site:
-                    _append_error(errors, idx, "site_code", "Site nao encontrado pelo codigo")
-
-        if job.entity == "os_types":
-            if row_data.get("client_cnpj") or row_data.get("client_code"):
-                if not _resolve_client_id(db, job.tenant_id, row_data):
-                    _append_error(errors, idx, "client_cnpj", "Cliente nao encontrado pelo CNPJ/Codigo")
-
-        if not any(e["row_number"] == idx for e in errors):
-            exists = _detect_existing(db, job.entity, job.tenant_id, row_data)
+            exists = lookups.existing_id(row_data)
             if _should_skip(job.mode, bool(exists)):
                 preview["skipped"] += 1
             elif exists:
@@ -163,7 +105,9 @@ def validate_job(db, job: models.ImportJob) -> dict:
                 preview["samples"].append(row_data)
 
     preview["errors"] = len(errors)
+    progress.flush()
 
+    db.query(models.ImportRowError).filter(models.ImportRowError.import_job_id == job.id).delete()
     if errors:
         db.bulk_insert_mappings(models.ImportRowError, [
             {**e, "import_job_id": job.id} for e in errors
@@ -181,156 +125,79 @@ def validate_job(db, job: models.ImportJob) -> dict:
     db.commit()
 
     if errors:
-        report_url = generate_error_report(storage, job, header, canonical_headers, errors)
+        report_url = generate_error_report(storage, job, pipeline, errors)
         job.error_report_url = report_url
         db.commit()
 
     return preview
 
 
-def _detect_existing(db, entity: str, tenant_id: str, row_data: Dict[str, object]):
-    if entity == "employees":
-        email = row_data.get("email")
-        if not email:
-            return None
-        return (
-            db.query(models.Colaborador)
-            .filter(models.Colaborador.tenant_id == tenant_id, models.Colaborador.email == email)
-            .first()
-        )
-    if entity == "clients":
-        doc = row_data.get("document")
-        code = row_data.get("client_code")
-        query = db.query(models.Client).filter(models.Client.tenant_id == tenant_id)
-        if doc:
-            query = query.filter(models.Client.document == doc)
-        elif code:
-            query = query.filter(models.Client.client_code == code)
-        else:
-            return None
-        return query.first()
-    if entity == "sites":
-        code = row_data.get("site_code")
-        if not code:
-            return None
-        return (
-            db.query(models.Site)
-            .filter(models.Site.tenant_id == tenant_id, models.Site.code == code)
-            .first()
-        )
-    if entity == "assets":
-        tag = row_data.get("tag")
-        if not tag:
-            return None
-        return (
-            db.query(models.Asset)
-            .filter(models.Asset.tenant_id == tenant_id, models.Asset.tag == tag)
-            .first()
-        )
-    if entity == "os_types":
-        name = row_data.get("name")
-        client_id = _resolve_client_id(db, tenant_id, row_data)
-        query = db.query(models.OSType).filter(models.OSType.tenant_id == tenant_id, models.OSType.name == name)
-        if client_id:
-            query = query.filter(models.OSType.client_id == client_id)
-        return query.first()
-    if entity == "questionnaires":
-        title = row_data.get("title")
-        version = row_data.get("version") or 1
-        return (
-            db.query(models.Questionnaire)
-            .filter(
-                models.Questionnaire.tenant_id == tenant_id,
-                models.Questionnaire.title == title,
-                models.Questionnaire.version == version,
-            )
-            .first()
-        )
-    return None
-
-
-def _resolve_client_id(db, tenant_id: str, row_data: Dict[str, object]):
-    cnpj = row_data.get("client_cnpj")
-    code = row_data.get("client_code")
-    if not cnpj and not code:
-        return None
-    query = db.query(models.Client).filter(models.Client.tenant_id == tenant_id)
-    if cnpj:
-        query = query.filter(models.Client.document == cnpj)
-    if code:
-        query = query.filter(models.Client.client_code == code)
-    client = query.first()
-    if client:
-        return client.id
-    return None
-
-
-def _resolve_customer_account_id(db, tenant_id: str, row_data: Dict[str, object]):
-    cnpj = row_data.get("customer_account_cnpj")
-    name = row_data.get("customer_account_name")
-    query = db.query(models.CustomerAccount).filter(models.CustomerAccount.tenant_id == tenant_id)
-    if cnpj:
-        query = query.filter(models.CustomerAccount.cnpj == cnpj)
-    if name:
-        query = query.filter(models.CustomerAccount.name == name)
-    account = query.first()
-    return account.id if account else None
-
-
-def run_job(db, job: models.ImportJob) -> dict:
+def run_job(db, job: models.ImportJob, owner: str | None = None) -> dict:
+    """Executa o job sob lease; um retry retoma do ultimo lote gravado (`checkpoint_json`)."""
     config = ENTITY_CONFIGS.get(job.entity)
     if not config:
         raise ImportValidationError("Entidade nao suportada.")
 
-    if job.entity == "questionnaires":
-        return _run_questionnaire_job(db, job)
-
-    if job.status not in {"queued", "running"}:
+    if job.status not in RUNNABLE_STATUSES:
         return job.summary_json or {}
 
+    owner = owner or new_lease_owner()
+    if not acquire_lease(db, job, owner):
+        raise ImportLeaseError("Job em execucao por outro worker")
+    try:
+        if job.entity == "questionnaires":
+            return _run_questionnaire_job(db, job, owner)
+        return _run_leased_job(db, job, config, owner)
+    except ImportLeaseError:
+        db.rollback()
+        raise
+    except Exception:
+        db.rollback()
+        release_lease(db, job, owner)
+        db.commit()
+        raise
+
+
+def _run_leased_job(db, job: models.ImportJob, config, owner: str) -> dict:
     storage = StorageClient()
-    local_path = storage.download_to_temp(job.file_url)
-    header, rows = iter_rows(local_path)
-    header_map = make_header_map(config.template_columns)
-    canonical_headers = [header_map.get(normalize_header(h), "") for h in header]
+    _, parsed_rows = open_parsed_rows(storage, job, config)
 
-    created = updated = skipped = 0
+    checkpoint = job.checkpoint_json or {}
+    resume_after = checkpoint.get("row_number", 0)
+    created = checkpoint.get("created", 0)
+    updated = checkpoint.get("updated", 0)
+    skipped = checkpoint.get("skipped", 0)
     errors = []
-    buffer: List[Dict[str, object]] = []
 
     job.status = "running"
     if not job.started_at:
         job.started_at = datetime.utcnow()
+    progress = ProgressTracker(db, job)
+    progress.start("applying", total=_validated_rows(job))
+    renew_lease(db, job, owner)
     db.commit()
 
-    for idx, row in enumerate(rows, start=3):
-        row_data: Dict[str, object] = {}
-        for key, value in zip(canonical_headers, row):
-            if not key:
+    def _pending():
+        for idx, _, row_data, row_errors in parsed_rows:
+            errors.extend(row_errors)
+            if idx <= resume_after:
+                progress.advance()
                 continue
-            raw = value.strip() if isinstance(value, str) else value
-            if raw in (None, ""):
-                continue
-            transformer = config.transformers.get(key)
-            try:
-                row_data[key] = transformer(str(raw)) if transformer else raw
-            except Exception:
-                _append_error(errors, idx, key, f"Valor invalido para {key}")
-        if not any(str(cell).strip() for cell in row):
-            continue
-        buffer.append(row_data)
-        if len(buffer) >= CHUNK_SIZE:
-            c, u, s = _apply_chunk(db, job, buffer)
-            created += c
-            updated += u
-            skipped += s
-            buffer = []
-
-    if buffer:
-        c, u, s = _apply_chunk(db, job, buffer)
+            yield idx, row_data
+
+    chunk_size = UPSERT_CHUNK_SIZE if supports_native_upsert(db, job.entity) else CHUNK_SIZE
+    for chunk in _chunked(_pending(), chunk_size):
+        rows = [row_data for _, row_data in chunk]
+        lookups = load_lookups(db, job.entity, job.tenant_id, rows)
+        c, u, s = _apply_chunk(db, job, rows, lookups)
         created += c
         updated += u
         skipped += s
+        job.checkpoint_json = {"row_number": chunk[-1][0], "created": created, "updated": updated, "skipped": skipped}
+        renew_lease(db, job, owner)
+        db.commit()
+        progress.advance(len(chunk))
+    progress.flush()
 
     job.status = "completed"
     job.finished_at = datetime.utcnow()
@@ -347,30 +214,17 @@ def run_job(db, job: models.ImportJob) -> dict:
         "bulk.import.completed",
         {"created": created, "updated": updated, "skipped": skipped, "errors": len(errors)},
     )
+    release_lease(db, job, owner)
     db.commit()
     return job.summary_json
 
 
-def _run_questionnaire_job(db, job: models.ImportJob) -> dict:
+def _run_questionnaire_job(db, job: models.ImportJob, owner: str) -> dict:
     storage = StorageClient()
-    local_path = storage.download_to_temp(job.file_url)
-    header, rows = iter_rows(local_path)
-    header_map = make_header_map(ENTITY_CONFIGS[job.entity].template_columns)
-    canonical_headers = [header_map.get(normalize_header(h), "") for h in header]
+    _, parsed_rows = open_parsed_rows(storage, job, ENTITY_CONFIGS[job.entity])
 
     grouped: Dict[Tuple[str, int], List[Dict[str, object]]] = defaultdict(list)
-    for row in rows:
-        if not any(str(cell).strip() for cell in row):
-            continue
-        row_data: Dict[str, object] = {}
-        for key, value in zip(canonical_headers, row):
-            if not key:
-                continue
-            raw = value.strip() if isinstance(value, str) else value
-            if raw in (None, ""):
-                continue
-            transformer = ENTITY_CONFIGS[job.entity].transformers.get(key)
-            row_data[key] = transformer(str(raw)) if transformer else raw
+    for _, _, row_data, _ in parsed_rows:
         title = row_data.get("title")
         version = row_data.get("version") or 1
         if not title:
@@ -380,19 +234,15 @@ def _run_questionnaire_job(db, job: models.ImportJob) -> dict:
     job.status = "running"
     if not job.started_at:
         job.started_at = datetime.utcnow()
-    db.commit()
+    progress = ProgressTracker(db, job)
+    progress.start("applying", total=len(grouped))
 
     created = updated = skipped = 0
+    lookups = load_lookups(db, job.entity, job.tenant_id, [items[0] for items in grouped.values()])
     for (title, version), items in grouped.items():
-        questionnaire = (
-            db.query(models.Questionnaire)
-            .filter(
-                models.Questionnaire.tenant_id == job.tenant_id,
-                models.Questionnaire.title == title,
-                models.Questionnaire.version == version,
-            )
-            .first()
-        )
+        progress.advance()
+        existing_id = lookups.existing_id(items[0])
+        questionnaire = db.get(models.Questionnaire, existing_id) if existing_id else None
         if questionnaire and job.mode == "create_only":
             skipped += 1
             continue
@@ -428,7 +278,9 @@ def _run_questionnaire_job(db, job: models.ImportJob) -> dict:
                     order_index=index,
                 )
             )
+        renew_lease(db, job, owner)
         db.commit()
+    progress.flush()
 
     job.status = "completed"
     job.finished_at = datetime.utcnow()
@@ -445,17 +297,30 @@ def _run_questionnaire_job(db, job: models.ImportJob) -> dict:
         "bulk.import.completed",
         {"created": created, "updated": updated, "skipped": skipped, "errors": 0},
     )
+    release_lease(db, job, owner)
     db.commit()
     return job.summary_json
 
 
-def _apply_chunk(db, job: models.ImportJob, rows: List[Dict[str, object]]):
+def _load_existing(db, entity: str, rows: List[Dict[str, object]], lookups: ImportLookups) -> dict:
+    model = ENTITY_MODELS.get(entity)
+    ids = {lookups.existing_id(row) for row in rows} - {None}
+    if not model or not ids:
+        return {}
+    return {obj.id: obj for obj in db.query(model).filter(model.id.in_(ids)).all()}
+
+
+def _apply_chunk(db, job: models.ImportJob, rows: List[Dict[str, object]], lookups: ImportLookups):
+    if supports_native_upsert(db, job.entity):
+        return upsert_chunk(db, job, rows, lookups)
     created = updated = skipped = 0
+    loaded = _load_existing(db, job.entity, rows, lookups)
     for row in rows:
-        existing = _detect_existing(db, job.entity, job.tenant_id, row)
+        existing = loaded.get(lookups.existing_id(row))
         if _should_skip(job.mode, bool(existing)):
             skipped += 1
             continue
+        new_id = str(uuid.uuid4())
         if job.entity == "employees":
             if existing:
                 existing.name = row.get("nome", existing.name)
@@ -472,6 +337,7 @@ def _apply_chunk(db, job: models.ImportJob, rows: List[Dict[str, object]]):
             else:
                 db.add(
                     models.Colaborador(
+                        id=new_id,
                         tenant_id=job.tenant_id,
                         nome=row.get("nome"),
                         funcao=row.get("funcao"),
@@ -486,6 +352,7 @@ def _apply_chunk(db, job: models.ImportJob, rows: List[Dict[str, object]]):
                         observacoes=row.get("observacoes"),
                     )
                 )
+                lookups.remember(row, new_id)
                 created += 1
         elif job.entity == "clients":
             if existing:
@@ -499,6 +366,7 @@ def _apply_chunk(db, job: models.ImportJob, rows: List[Dict[str, object]]):
             else:
                 db.add(
                     models.Client(
+                        id=new_id,
                         tenant_id=job.tenant_id,
                         name=row.get("name"),
                         client_code=row.get("client_code"),
@@ -508,9 +376,10 @@ def _apply_chunk(db, job: models.ImportJob, rows: List[Dict[str, object]]):
                         status=row.get("status") or "active",
                     )
                 )
+                lookups.remember(row, new_id)
                 created += 1
         elif job.entity == "sites":
-            account_id = _resolve_customer_account_id(db, job.tenant_id, row)
+            account_id = lookups.customer_account_id(row)
             if existing:
                 existing.name = row.get("name", existing.name)
                 existing.status = row.get("status", existing.status)
@@ -520,6 +389,7 @@ def _apply_chunk(db, job: models.ImportJob, rows: List[Dict[str, object]]):
             else:
                 db.add(
                     models.Site(
+                        id=new_id,
                         tenant_id=job.tenant_id,
                         code=row.get("site_code"),
                         name=row.get("name"),
@@ -528,38 +398,35 @@ def _apply_chunk(db, job: models.ImportJob, rows: List[Dict[str, object]]):
                         customer_account_id=account_id,
                     )
                 )
+                lookups.remember(row, new_id)
                 created += 1
         elif job.entity == "assets":
-            client_id = _resolve_client_id(db, job.tenant_id, row)
-            site = None
-            if row.get("site_code"):
-                site = (
-                    db.query(models.Site)
-                    .filter(models.Site.tenant_id == job.tenant_id, models.Site.code == row.get("site_code"))
-                    .first()
-                )
+            client_id = lookups.client_id(row)
+            site_id = lookups.site_id(row)
             if existing:
                 existing.name = row.get("name", existing.name)
                 existing.asset_type = row.get("asset_type", existing.asset_type)
                 existing.status = row.get("status", existing.status)
                 existing.client_id = client_id or existing.client_id
-                existing.site_id = site.id if site else existing.site_id
+                existing.site_id = site_id or existing.site_id
                 updated += 1
             else:
                 db.add(
                     models.Asset(
+                        id=new_id,
                         tenant_id=job.tenant_id,
                         tag=row.get("tag"),
                         name=row.get("name"),
                         asset_type=row.get("asset_type"),
                         status=row.get("status"),
                         client_id=client_id,
-                        site_id=site.id if site else None,
+                        site_id=site_id,
                     )
                 )
+                lookups.remember(row, new_id)
                 created += 1
         elif job.entity == "os_types":
-            client_id = _resolve_client_id(db, job.tenant_id, row)
+            client_id = lookups.client_id(row)
             if existing:
                 existing.description = row.get("description", existing.description)
                 if row.get("is_active") is not None:
@@ -569,6 +436,7 @@ def _apply_chunk(db, job: models.ImportJob, rows: List[Dict[str, object]]):
             else:
                 db.add(
                     models.OSType(
+                        id=new_id,
                         tenant_id=job.tenant_id,
                         name=row.get("name"),
                         description=row.get("description"),
@@ -576,17 +444,19 @@ def _apply_chunk(db, job: models.ImportJob, rows: List[Dict[str, object]]):
                         client_id=client_id,
                     )
                 )
+                lookups.remember(row, new_id)
                 created += 1
         elif job.entity == "questionnaires":
             title = row.get("title")
             version = row.get("version") or 1
-            questionnaire = _detect_existing(db, job.entity, job.tenant_id, row)
+            questionnaire = existing
             if questionnaire:
                 questionnaire.title = title
                 questionnaire.version = version
                 questionnaire.updated_at = datetime.utcnow()
             else:
                 questionnaire = models.Questionnaire(
+                    id=new_id,
                     tenant_id=job.tenant_id,
                     title=title,
                     version=version,
@@ -594,6 +464,7 @@ def _apply_chunk(db, job: models.ImportJob, rows: List[Dict[str, object]]):
                 )
                 db.add(questionnaire)
                 db.flush()
+                lookups.remember(row, new_id)
                 created += 1
             db.query(models.QuestionnaireItem).filter(
                 models.QuestionnaireItem.questionnaire_id == questionnaire.id
@@ -613,11 +484,11 @@ def _apply_chunk(db, job: models.ImportJob, rows: List[Dict[str, object]]):
         else:
             skipped += 1
 
-    db.commit()
+    db.flush()
     return created, updated, skipped
 
 
-def generate_error_report(storage: StorageClient, job: models.ImportJob, headers: List[str], canonical_headers: List[str], errors: List[dict]) -> str:
+def generate_error_report(storage: StorageClient, job: models.ImportJob, pipeline: RowPipeline, errors: List[dict]) -> str:
     error_map = defaultdict(list)
     for error in errors:
         error_map[error["row_number"]].append(error)
@@ -625,12 +496,10 @@ def generate_error_report(storage: StorageClient, job: models.ImportJob, headers
     wb = Workbook()
     ws = wb.active
     ws.title = "ERROS"
-    ws.append(headers + ["__status", "__error_fields", "__messages"])
-
-    local_path = storage.download_to_temp(job.file_url)
-    _, rows = iter_rows(local_path)
+    ws.append(pipeline.header + ["__status", "__error_fields", "__messages"])
 
-    for idx, row in enumerate(rows, start=3):
+    _, parsed_rows = open_parsed_rows(storage, job, pipeline.config)
+    for idx, row, _, _ in parsed_rows:
         row_errors = error_map.get(idx, [])
         if not row_errors:
             continue
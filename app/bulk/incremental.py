@@ -0,0 +1,117 @@
+import base64
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, or_, select
+
+from app.bulk.config import ENTITY_CONFIGS
+from app.bulk.lease import lease_seconds
+from app.bulk.templates import export_statement
+from app.db import models
+
+INCREMENTAL_MODELS = {
+    "clients": models.Client,
+    "sites": models.Site,
+    "assets": models.Asset,
+}
+INCREMENTAL_PAGE_MAX = 5000
+
+Position = Optional[Tuple[datetime, str]]
+
+
+class CursorError(ValueError):
+    pass
+
+
+def _lag_seconds() -> int:
+    # A importacao grava `updated_at` no inicio do lote e so commita no fim; o lease limita essa janela.
+    return max(0, int(os.getenv("BULK_EXPORT_CURSOR_LAG_SECONDS", str(lease_seconds()))))
+
+
+def _encode_position(position: Position):
+    return [position[0].isoformat(), position[1]] if position else None
+
+
+def _decode_position(value) -> Position:
+    if value is None:
+        return None
+    stamp, row_id = value
+    return datetime.fromisoformat(stamp), str(row_id)
+
+
+def encode_cursor(entity: str, rows: Position, deleted: Position) -> str:
+    state = {"entity": entity, "rows": _encode_position(rows), "deleted": _encode_position(deleted)}
+    return base64.urlsafe_b64encode(json.dumps(state).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(entity: str, cursor: str) -> Tuple[Position, Position]:
+    """Cursor vazio (ou "0") comeca do inicio: a primeira carga e paginada do mesmo jeito."""
+    if cursor in ("", "0"):
+        return None, None
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        rows, deleted = _decode_position(state["rows"]), _decode_position(state["deleted"])
+    except Exception as exc:
+        raise CursorError("Cursor invalido") from exc
+    if state.get("entity") != entity:
+        raise CursorError("Cursor de outra entidade")
+    return rows, deleted
+
+
+def _after(stamp_column, id_column, position: Position):
+    if position is None:
+        return None
+    stamp, row_id = position
+    return or_(stamp_column > stamp, and_(stamp_column == stamp, id_column > row_id))
+
+
+def export_changes(db, tenant_id: str, entity: str, cursor: str, limit: int) -> dict:
+    """Linhas criadas/alteradas e exclusoes depois do cursor, em ordem de (updated_at, id).
+
+    Nada mais recente que `BULK_EXPORT_CURSOR_LAG_SECONDS` e devolvido: uma transacao ainda aberta
+    grava `updated_at` antes do commit e ficaria para tras de um cursor que ja a ultrapassou. O atraso
+    precisa cobrir a transacao mais longa que grava essas tabelas; por padrao e o lease da importacao.
+    """
+    model = INCREMENTAL_MODELS[entity]
+    rows_position, deleted_position = decode_cursor(entity, cursor)
+    limit = max(1, min(limit, INCREMENTAL_PAGE_MAX))
+    horizon = datetime.utcnow() - timedelta(seconds=_lag_seconds())
+
+    stmt, to_cells = export_statement(tenant_id, entity)
+    stmt = stmt.add_columns(model.id, model.updated_at).where(model.updated_at <= horizon)
+    after = _after(model.updated_at, model.id, rows_position)
+    if after is not None:
+        stmt = stmt.where(after)
+    stmt = stmt.order_by(None).order_by(model.updated_at, model.id).limit(limit + 1)
+    keys = [column.key for column in ENTITY_CONFIGS[entity].template_columns]
+    fetched = db.execute(stmt).all()
+    has_more = len(fetched) > limit
+    rows = []
+    for row in fetched[:limit]:
+        *cells, row_id, updated_at = row
+        rows.append({"id": row_id, "updated_at": updated_at, **dict(zip(keys, to_cells(cells)))})
+        rows_position = (updated_at, row_id)
+
+    table = models.Tombstone
+    tombstones = select(table.id, table.record_id, table.deleted_at).where(
+        table.tenant_id == tenant_id, table.entity == entity, table.deleted_at <= horizon
+    )
+    after = _after(table.deleted_at, table.id, deleted_position)
+    if after is not None:
+        tombstones = tombstones.where(after)
+    fetched = db.execute(tombstones.order_by(table.deleted_at, table.id).limit(limit + 1)).all()
+    has_more = has_more or len(fetched) > limit
+    deleted = []
+    for tombstone_id, record_id, deleted_at in fetched[:limit]:
+        deleted.append({"id": record_id, "deleted_at": deleted_at})
+        deleted_position = (deleted_at, tombstone_id)
+
+    return {
+        "entity": entity,
+        "rows": rows,
+        "deleted": deleted,
+        "cursor": encode_cursor(entity, rows_position, deleted_position),
+        "has_more": has_more,
+    }
@@ -0,0 +1,70 @@
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, update
+
+from app.db import models
+
+RUNNABLE_STATUSES = ("queued", "running")
+
+
+class ImportLeaseError(Exception):
+    pass
+
+
+def lease_seconds() -> int:
+    return max(1, int(os.getenv("BULK_IMPORT_LEASE_SECONDS", "300")))
+
+
+def new_lease_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _jobs():
+    return models.ImportJob.__table__
+
+
+def acquire_lease(db, job: models.ImportJob, owner: str) -> bool:
+    """Toma o job se ninguem o detem ou se o lease anterior expirou (worker morto)."""
+    now = datetime.utcnow()
+    table = _jobs()
+    result = db.execute(
+        update(table)
+        .where(
+            table.c.id == job.id,
+            table.c.status.in_(RUNNABLE_STATUSES),
+            or_(table.c.lease_owner.is_(None), table.c.lease_owner == owner, table.c.lease_expires_at < now),
+        )
+        .values(lease_owner=owner, lease_expires_at=now + timedelta(seconds=lease_seconds()))
+    )
+    db.commit()
+    db.refresh(job)
+    return result.rowcount == 1
+
+
+def renew_lease(db, job: models.ImportJob, owner: str) -> None:
+    """Heartbeat; roda na mesma transacao do lote para que checkpoint e lease andem juntos.
+
+    Lease vencido nao se renova: o lote e desfeito e o retry retoma do checkpoint. Assim nenhum lote
+    gravado ficou aberto mais que `lease_seconds()`, o atraso que o export incremental espera.
+    """
+    now = datetime.utcnow()
+    table = _jobs()
+    result = db.execute(
+        update(table)
+        .where(table.c.id == job.id, table.c.lease_owner == owner, table.c.lease_expires_at >= now)
+        .values(lease_expires_at=now + timedelta(seconds=lease_seconds()))
+    )
+    if result.rowcount != 1:
+        raise ImportLeaseError("Lease do job perdido ou expirado")
+
+
+def release_lease(db, job: models.ImportJob, owner: str) -> None:
+    table = _jobs()
+    db.execute(
+        update(table)
+        .where(table.c.id == job.id, table.c.lease_owner == owner)
+        .values(lease_owner=None, lease_expires_at=None)
+    )
@@ -0,0 +1,225 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.db import models
+
+
+LOOKUP_CHUNK_SIZE = 500
+
+
+def _chunks(values: Iterable, size: int = LOOKUP_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def _distinct(rows: List[Dict[str, object]], key: str) -> set:
+    return {row[key] for row in rows if row.get(key) not in (None, "")}
+
+
+def _load_by(db, columns, tenant_column, tenant_id: str, key_column, values: set) -> list:
+    found = []
+    for chunk in _chunks(values):
+        found.extend(db.query(*columns).filter(tenant_column == tenant_id, key_column.in_(chunk)).all())
+    return found
+
+
+@dataclass
+class ImportLookups:
+    entity: str
+    tenant_id: str
+    existing: Dict[Tuple, str] = field(default_factory=dict)
+    clients_by_document: Dict[str, str] = field(default_factory=dict)
+    clients_by_code: Dict[str, str] = field(default_factory=dict)
+    clients_by_document_code: Dict[Tuple[str, str], str] = field(default_factory=dict)
+    accounts_by_cnpj: Dict[str, str] = field(default_factory=dict)
+    accounts_by_name: Dict[str, str] = field(default_factory=dict)
+    accounts_by_cnpj_name: Dict[Tuple[str, str], str] = field(default_factory=dict)
+    any_account_id: Optional[str] = None
+    sites_by_code: Dict[str, str] = field(default_factory=dict)
+
+    def client_id(self, row: Dict[str, object]) -> Optional[str]:
+        cnpj = row.get("client_cnpj")
+        code = row.get("client_code")
+        if cnpj and code:
+            return self.clients_by_document_code.get((cnpj, code))
+        if cnpj:
+            return self.clients_by_document.get(cnpj)
+        if code:
+            return self.clients_by_code.get(code)
+        return None
+
+    def customer_account_id(self, row: Dict[str, object]) -> Optional[str]:
+        cnpj = row.get("customer_account_cnpj")
+        name = row.get("customer_account_name")
+        if cnpj and name:
+            return self.accounts_by_cnpj_name.get((cnpj, name))
+        if cnpj:
+            return self.accounts_by_cnpj.get(cnpj)
+        if name:
+            return self.accounts_by_name.get(name)
+        return self.any_account_id
+
+    def site_id(self, row: Dict[str, object]) -> Optional[str]:
+        code = row.get("site_code")
+        return self.sites_by_code.get(code) if code else None
+
+    def existing_keys(self, row: Dict[str, object]) -> List[Tuple]:
+        entity = self.entity
+        if entity == "employees":
+            return [("email", row["email"])] if row.get("email") else []
+        if entity == "clients":
+            if row.get("document"):
+                return [("document", row["document"])]
+            if row.get("client_code"):
+                return [("client_code", row["client_code"])]
+            return []
+        if entity == "sites":
+            return [("code", row["site_code"])] if row.get("site_code") else []
+        if entity == "assets":
+            return [("tag", row["tag"])] if row.get("tag") else []
+        if entity == "os_types":
+            client_id = self.client_id(row)
+            if client_id:
+                return [("name_client", row.get("name"), client_id)]
+            return [("name", row.get("name"))]
+        if entity == "questionnaires":
+            return [("title_version", row.get("title"), int(row.get("version") or 1))]
+        return []
+
+    def existing_id(self, row: Dict[str, object]) -> Optional[str]:
+        for key in self.existing_keys(row):
+            if key in self.existing:
+                return self.existing[key]
+        return None
+
+    def remember(self, row: Dict[str, object], record_id: str) -> None:
+        for key in self.existing_keys(row):
+            self.existing.setdefault(key, record_id)
+        if self.entity == "os_types" and row.get("name"):
+            self.existing.setdefault(("name", row.get("name")), record_id)
+
+
+def _load_clients(db, lookups: ImportLookups, documents: set, codes: set) -> list:
+    columns = (models.Client.id, models.Client.document, models.Client.client_code)
+    rows = _load_by(db, columns, models.Client.tenant_id, lookups.tenant_id, models.Client.document, documents)
+    rows += _load_by(db, columns, models.Client.tenant_id, lookups.tenant_id, models.Client.client_code, codes)
+    for client_id, document, code in rows:
+        if document:
+            lookups.clients_by_document.setdefault(document, client_id)
+        if code:
+            lookups.clients_by_code.setdefault(code, client_id)
+        if document and code:
+            lookups.clients_by_document_code.setdefault((document, code), client_id)
+    return rows
+
+
+def load_lookups(db, entity: str, tenant_id: str, rows: List[Dict[str, object]]) -> ImportLookups:
+    """Carrega, em consultas IN por lotes, todas as chaves que as linhas do arquivo referenciam."""
+    lookups = ImportLookups(entity=entity, tenant_id=tenant_id)
+    existing = lookups.existing
+
+    if entity in {"assets", "os_types"}:
+        _load_clients(db, lookups, _distinct(rows, "client_cnpj"), _distinct(rows, "client_code"))
+
+    if entity == "employees":
+        for record_id, email in _load_by(
+            db,
+            (models.Colaborador.id, models.Colaborador.email),
+            models.Colaborador.tenant_id,
+            tenant_id,
+            models.Colaborador.email,
+            _distinct(rows, "email"),
+        ):
+            existing.setdefault(("email", email), record_id)
+    elif entity == "clients":
+        for record_id, document, code in _load_clients(
+            db, lookups, _distinct(rows, "document"), _distinct(rows, "client_code")
+        ):
+            if document:
+                existing.setdefault(("document", document), record_id)
+            if code:
+                existing.setdefault(("client_code", code), record_id)
+    elif entity == "sites":
+        account_columns = (models.CustomerAccount.id, models.CustomerAccount.cnpj, models.CustomerAccount.name)
+        accounts = _load_by(
+            db,
+            account_columns,
+            models.CustomerAccount.tenant_id,
+            tenant_id,
+            models.CustomerAccount.cnpj,
+            _distinct(rows, "customer_account_cnpj"),
+        )
+        accounts += _load_by(
+            db,
+            account_columns,
+            models.CustomerAccount.tenant_id,
+            tenant_id,
+            models.CustomerAccount.name,
+            _distinct(rows, "customer_account_name"),
+        )
+        for account_id, cnpj, name in accounts:
+            if cnpj:
+                lookups.accounts_by_cnpj.setdefault(cnpj, account_id)
+            if name:
+                lookups.accounts_by_name.setdefault(name, account_id)
+            if cnpj and name:
+                lookups.accounts_by_cnpj_name.setdefault((cnpj, name), account_id)
+        if any(not row.get("customer_account_cnpj") and not row.get("customer_account_name") for row in rows):
+            first = (
+                db.query(models.CustomerAccount.id)
+                .filter(models.CustomerAccount.tenant_id == tenant_id)
+                .first()
+            )
+            lookups.any_account_id = first[0] if first else None
+        for record_id, code in _load_by(
+            db,
+            (models.Site.id, models.Site.code),
+            models.Site.tenant_id,
+            tenant_id,
+            models.Site.code,
+            _distinct(rows, "site_code"),
+        ):
+            existing.setdefault(("code", code), record_id)
+    elif entity == "assets":
+        for record_id, code in _load_by(
+            db,
+            (models.Site.id, models.Site.code),
+            models.Site.tenant_id,
+            tenant_id,
+            models.Site.code,
+            _distinct(rows, "site_code"),
+        ):
+            lookups.sites_by_code.setdefault(code, record_id)
+        for record_id, tag in _load_by(
+            db,
+            (models.Asset.id, models.Asset.tag),
+            models.Asset.tenant_id,
+            tenant_id,
+            models.Asset.tag,
+            _distinct(rows, "tag"),
+        ):
+            existing.setdefault(("tag", tag), record_id)
+    elif entity == "os_types":
+        for record_id, name, client_id in _load_by(
+            db,
+            (models.OSType.id, models.OSType.name, models.OSType.client_id),
+            models.OSType.tenant_id,
+            tenant_id,
+            models.OSType.name,
+            _distinct(rows, "name"),
+        ):
+            existing.setdefault(("name", name), record_id)
+            if client_id:
+                existing.setdefault(("name_client", name, client_id), record_id)
+    elif entity == "questionnaires":
+        for record_id, title, version in _load_by(
+            db,
+            (models.Questionnaire.id, models.Questionnaire.title, models.Questionnaire.version),
+            models.Questionnaire.tenant_id,
+            tenant_id,
+            models.Questionnaire.title,
+            _distinct(rows, "title"),
+        ):
+            existing.setdefault(("title_version", title, int(version or 1)), record_id)
+    return lookups
@@ -0,0 +1,208 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.bulk.config import (
+    ENTITY_CONFIGS,
+    EntityImportConfig,
+    MustResolve,
+    RequireAny,
+    RequireWhen,
+    Transformer,
+    Validator,
+    make_header_map,
+    normalize_header,
+)
+from app.bulk.lookups import ImportLookups
+
+# (numero da linha, celulas originais, dados transformados, erros da linha)
+ParsedRow = Tuple[int, List[str], Dict[str, object], List[dict]]
+
+
+def row_error(row_number: int, field: str, message: str, severity: str = "error") -> dict:
+    return {"row_number": row_number, "field": field, "message": message, "severity": severity}
+
+
+@dataclass(frozen=True)
+class CompiledColumn:
+    index: int
+    key: str
+    label: str
+    transformer: Optional[Transformer]
+    validators: Tuple[Validator, ...]
+
+
+class RowPipeline:
+    """Transformadores e validadores resolvidos uma vez por arquivo; o custo por linha nao depende dos erros."""
+
+    def __init__(self, config: EntityImportConfig, header: List[str]):
+        self.config = config
+        self.header = header
+        header_map = make_header_map(config.template_columns)
+        self.canonical_headers = [header_map.get(normalize_header(h), "") for h in header]
+        labels = {col.key: col.label for col in config.template_columns}
+        self.columns = tuple(
+            CompiledColumn(
+                index=index,
+                key=key,
+                label=labels.get(key, key),
+                transformer=config.transformers.get(key),
+                validators=tuple(config.validators.get(key, ())),
+            )
+            for index, key in enumerate(self.canonical_headers)
+            if key
+        )
+        self.required = tuple(col.key for col in config.template_columns if col.required)
+        self.missing_required = tuple(key for key in self.required if key not in self.canonical_headers)
+        self.unique_key_groups = tuple(tuple(group) for group in config.unique_key_groups)
+        self.rules = tuple(config.rules)
+        self.defaults = tuple(config.defaults.items())
+
+    def parse(self, row: List[str], row_number: int) -> Tuple[Optional[Dict[str, object]], List[dict]]:
+        """Retorna (None, []) para linhas vazias."""
+        if not any(str(cell).strip() for cell in row):
+            return None, []
+        row_data: Dict[str, object] = {}
+        errors: List[dict] = []
+        width = len(row)
+        for column in self.columns:
+            if column.index >= width:
+                continue
+            value = row[column.index]
+            raw = value.strip() if isinstance(value, str) else value
+            if raw in (None, ""):
+                continue
+            if column.transformer is None:
+                row_data[column.key] = raw
+                continue
+            try:
+                row_data[column.key] = column.transformer(str(raw))
+            except Exception:
+                errors.append(row_error(row_number, column.key, f"Valor invalido para {column.label}"))
+        for key, value in self.defaults:
+            row_data.setdefault(key, value)
+        self._check_row(row_data, row_number, errors)
+        return row_data, errors
+
+    def parse_chunk(self, chunk: List[Tuple[int, List[str]]]) -> List[Tuple[int, List[str], Optional[Dict[str, object]], List[dict]]]:
+        return [(row_number, row, *self.parse(row, row_number)) for row_number, row in chunk]
+
+    def _check_row(self, row_data: Dict[str, object], row_number: int, errors: List[dict]) -> None:
+        for key in self.required:
+            if row_data.get(key) in (None, ""):
+                errors.append(row_error(row_number, key, "Campo obrigatorio"))
+        for column in self.columns:
+            if not column.validators:
+                continue
+            value = row_data.get(column.key)
+            if value in (None, ""):
+                continue
+            for check, message in column.validators:
+                if not check(value):
+                    errors.append(row_error(row_number, column.key, message))
+        for rule in self.rules:
+            if isinstance(rule, RequireAny):
+                if not any(row_data.get(key) for key in rule.fields):
+                    errors.append(row_error(row_number, rule.error_field, rule.message))
+            elif isinstance(rule, RequireWhen):
+                if str(row_data.get(rule.when_field) or "").upper() in rule.when_values and not row_data.get(rule.field):
+                    errors.append(row_error(row_number, rule.field, rule.message))
+
+    def unique_key(self, row_data: Dict[str, object]) -> Optional[Tuple[str, ...]]:
+        for group in self.unique_key_groups:
+            if all(row_data.get(key) not in (None, "") for key in group):
+                return tuple(str(row_data.get(key)).strip() for key in group)
+        return None
+
+    def validate(
+        self,
+        row_data: Dict[str, object],
+        row_number: int,
+        errors: List[dict],
+        lookups: ImportLookups,
+        seen_keys: set,
+    ) -> None:
+        """Checagens entre linhas e contra o banco; as de linha isolada ja rodaram em `parse`."""
+        unique_key = self.unique_key(row_data)
+        if not unique_key:
+            errors.append(row_error(row_number, "__unique__", "Chave unica nao encontrada"))
+        elif self.config.unique_in_file:
+            if unique_key in seen_keys:
+                errors.append(row_error(row_number, "__unique__", "Chave unica duplicada no arquivo"))
+            else:
+                seen_keys.add(unique_key)
+
+        for rule in self.rules:
+            if not isinstance(rule, MustResolve):
+                continue
+            if rule.when_any and not any(row_data.get(key) for key in rule.when_any):
+                continue
+            if not getattr(lookups, rule.lookup)(row_data):
+                errors.append(row_error(row_number, rule.error_field, rule.message))
+
+
+def validation_workers() -> int:
+    return max(1, int(os.getenv("BULK_VALIDATION_WORKERS", str(min(4, os.cpu_count() or 1)))))
+
+
+def validation_chunk_size() -> int:
+    return max(1, int(os.getenv("BULK_VALIDATION_CHUNK_SIZE", "5000")))
+
+
+_worker_pipeline: Optional[RowPipeline] = None
+
+
+def _init_worker(entity: str, header: List[str]) -> None:
+    global _worker_pipeline
+    _worker_pipeline = RowPipeline(ENTITY_CONFIGS[entity], header)
+
+
+def _parse_chunk(chunk: List[Tuple[int, List[str]]]):
+    return _worker_pipeline.parse_chunk(chunk)
+
+
+def _parallel_chunks(pipeline: RowPipeline, chunks: Iterable[list], workers: int) -> Iterator[list]:
+    # spawn: o pool nasce dentro da API e do worker, com threads, pools do SQLAlchemy e clientes gRPC vivos.
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(pipeline.config.entity, pipeline.header),
+    ) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_parse_chunk, chunk))
+            # Janela limitada: a leitura do arquivo nao se adianta demais aos workers.
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def parse_rows(
+    pipeline: RowPipeline,
+    rows: Iterable[List[str]],
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Iterator[ParsedRow]:
+    """Converte e checa as linhas em lotes; com mais de um lote, os lotes vao para um pool de processos.
+
+    Os resultados saem na ordem do arquivo, com ou sem pool.
+    """
+    workers = validation_workers() if workers is None else workers
+    chunk_size = chunk_size or validation_chunk_size()
+    numbered = enumerate(rows, start=3)
+    chunks = iter(lambda: list(islice(numbered, chunk_size)), [])
+    head = list(islice(chunks, 2))
+    if workers > 1 and len(head) > 1:
+        results = _parallel_chunks(pipeline, chain(head, chunks), workers)
+    else:
+        results = (pipeline.parse_chunk(chunk) for chunk in chain(head, chunks))
+    for chunk in results:
+        for row_number, row, row_data, errors in chunk:
+            if row_data is not None:
+                yield row_number, row, row_data, errors
@@ -0,0 +1,69 @@
+import os
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from app.db import models
+
+
+def _interval_seconds() -> float:
+    return float(os.getenv("BULK_PROGRESS_INTERVAL_SECONDS", "2"))
+
+
+def _interval_rows() -> int:
+    return max(1, int(os.getenv("BULK_PROGRESS_ROWS", "5000")))
+
+
+class ProgressTracker:
+    """Grava `progress_json` do job a cada N segundos ou M linhas, o que vier primeiro.
+
+    Cada gravacao e um commit da sessao do job; fora desses pontos `advance` so soma contadores.
+    """
+
+    def __init__(self, db, job: models.ImportJob, clock: Callable[[], float] = time.monotonic):
+        self.db = db
+        self.job = job
+        self.clock = clock
+        self.interval_seconds = _interval_seconds()
+        self.interval_rows = _interval_rows()
+        self.phase: Optional[str] = None
+        self.total: Optional[int] = None
+        self.processed = 0
+        self._started = 0.0
+        self._flushed_at = 0.0
+        self._flushed_rows = 0
+
+    def start(self, phase: str, total: Optional[int] = None, processed: int = 0) -> None:
+        self.phase = phase
+        self.total = total
+        self.processed = processed
+        self._started = self._flushed_at = self.clock()
+        self._flushed_rows = processed
+        self.flush()
+
+    def advance(self, rows: int = 1) -> None:
+        self.processed += rows
+        if self.processed - self._flushed_rows >= self.interval_rows or self.clock() - self._flushed_at >= self.interval_seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        now = self.clock()
+        self.job.progress_json = self.snapshot(now)
+        self._flushed_at = now
+        self._flushed_rows = self.processed
+        self.db.commit()
+
+    def snapshot(self, now: float) -> dict:
+        elapsed = now - self._started
+        rate = self.processed / elapsed if elapsed > 0 and self.processed else None
+        eta = None
+        if rate and self.total is not None:
+            eta = max(0, round((self.total - self.processed) / rate))
+        return {
+            "phase": self.phase,
+            "rows_processed": self.processed,
+            "rows_total": self.total,
+            "rows_per_second": round(rate, 1) if rate else None,
+            "eta_seconds": eta,
+            "updated_at": datetime.utcnow().isoformat(),
+        }
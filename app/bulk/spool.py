@@ -0,0 +1,129 @@
+import gzip
+import json
+import logging
+import os
+import posixpath
+import tempfile
+from datetime import date
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from app.bulk.config import EntityImportConfig
+from app.bulk.parser import iter_rows
+from app.bulk.pipeline import ParsedRow, RowPipeline, parse_rows
+from app.bulk.storage import StorageClient, StorageError
+from app.db import models
+
+logger = logging.getLogger("eagl.bulk_spool")
+
+SPOOL_VERSION = 2
+SPOOL_SUFFIX = ".rows.jsonl.gz"
+
+
+def _encode(value):
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    raise TypeError(f"Tipo nao serializavel: {type(value).__name__}")
+
+
+def _decode(obj: dict):
+    if len(obj) == 1 and "__date__" in obj:
+        return date.fromisoformat(obj["__date__"])
+    return obj
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_encode)
+
+
+def _meta(job: models.ImportJob, config: EntityImportConfig, header: List[str]) -> dict:
+    return {
+        "version": SPOOL_VERSION,
+        "entity": job.entity,
+        "template_version": config.template_version,
+        "file_hash": job.file_hash,
+        "header": header,
+    }
+
+
+def spool_dest_path(storage: StorageClient, job: models.ImportJob) -> Optional[str]:
+    """O spool fica ao lado do arquivo original, nomeado pelo hash do conteudo."""
+    if not job.file_hash:
+        return None
+    try:
+        directory = posixpath.dirname(storage.object_path(job.file_url))
+    except StorageError:
+        return None
+    return posixpath.join(directory, f"{job.file_hash}{SPOOL_SUFFIX}")
+
+
+def _read_spool(
+    storage: StorageClient, job: models.ImportJob, config: EntityImportConfig, dest: str
+) -> Optional[Tuple[RowPipeline, Iterator[ParsedRow]]]:
+    url = storage.url_for(dest)
+    try:
+        if not storage.exists(url):
+            return None
+        local_path = storage.download_to_temp(url)
+        with gzip.open(local_path, "rt", encoding="utf-8") as handle:
+            meta = json.loads(handle.readline())
+    except (StorageError, OSError, ValueError):
+        logger.warning("Spool ilegivel job=%s path=%s", job.id, dest)
+        return None
+    header = meta.get("header")
+    if meta != _meta(job, config, header):
+        return None
+
+    def _gen():
+        with gzip.open(local_path, "rt", encoding="utf-8") as handle:
+            handle.readline()
+            for line in handle:
+                row_number, cells, row_data, errors = json.loads(line, object_hook=_decode)
+                yield row_number, cells, row_data, errors
+
+    return RowPipeline(config, header), _gen()
+
+
+def _parse_and_spool(
+    storage: StorageClient,
+    job: models.ImportJob,
+    pipeline: RowPipeline,
+    rows: Iterable[List[str]],
+    dest: Optional[str],
+) -> Iterator[ParsedRow]:
+    if not dest:
+        yield from parse_rows(pipeline, rows)
+        return
+
+    fd, tmp_path = tempfile.mkstemp(suffix=SPOOL_SUFFIX)
+    os.close(fd)
+    try:
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=1) as out:
+            out.write(_dumps(_meta(job, pipeline.config, pipeline.header)) + "\n")
+            for parsed in parse_rows(pipeline, rows):
+                out.write(_dumps(parsed) + "\n")
+                yield parsed
+        try:
+            with open(tmp_path, "rb") as handle:
+                storage.upload_file(handle, dest, "application/gzip")
+        except StorageError:
+            logger.warning("Falha ao gravar spool job=%s path=%s", job.id, dest)
+    finally:
+        os.remove(tmp_path)
+
+
+def open_parsed_rows(
+    storage: StorageClient, job: models.ImportJob, config: EntityImportConfig
+) -> Tuple[RowPipeline, Iterator[ParsedRow]]:
+    """Linhas nao vazias ja transformadas.
+
+    A primeira leitura faz o parse da planilha e grava o spool ao consumir todas as linhas;
+    as etapas seguintes (relatorio de erros, execucao) leem so o spool.
+    """
+    dest = spool_dest_path(storage, job)
+    if dest:
+        spooled = _read_spool(storage, job, config, dest)
+        if spooled:
+            return spooled
+    header, rows = iter_rows(storage.download_to_temp(job.file_url))
+    pipeline = RowPipeline(config, header)
+    return pipeline, _parse_and_spool(storage, job, pipeline, rows, dest)
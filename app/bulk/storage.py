@@ -3,6 +3,8 @@ import os
 import pathlib
 import tempfile
 from typing import BinaryIO, Tuple
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 
 from google.cloud import storage
 
@@ -76,9 +78,35 @@ class StorageClient:
         blob.patch()
         return f"gs://{self.bucket_name}/{dest_path}", total, hasher.hexdigest()
 
+    def url_for(self, dest_path: str) -> str:
+        if self.use_local:
+            return (self.base_dir / dest_path).as_uri()
+        return f"gs://{self.bucket_name}/{dest_path}"
+
+    def object_path(self, file_url: str) -> str:
+        """Caminho relativo (como em `upload_*`) de uma URL gravada por este cliente."""
+        if file_url.startswith("file://") and self.use_local:
+            try:
+                return pathlib.Path(url2pathname(urlparse(file_url).path)).relative_to(self.base_dir).as_posix()
+            except ValueError:
+                raise StorageError("Arquivo fora do diretorio de armazenamento.")
+        if file_url.startswith(f"gs://{self.bucket_name}/") and not self.use_local:
+            return file_url.split(f"gs://{self.bucket_name}/", 1)[1]
+        raise StorageError("URL de arquivo nao suportada.")
+
+    def exists(self, file_url: str) -> bool:
+        if file_url.startswith("file://"):
+            return os.path.exists(url2pathname(urlparse(file_url).path))
+        if file_url.startswith("gs://"):
+            _, path = file_url.split("gs://", 1)
+            bucket_name, blob_path = path.split("/", 1)
+            client = self._client or storage.Client()
+            return client.bucket(bucket_name).blob(blob_path).exists()
+        raise StorageError("URL de arquivo nao suportada.")
+
     def download_to_temp(self, file_url: str) -> str:
         if file_url.startswith("file://"):
-            return file_url.replace("file:///", "")
+            return url2pathname(urlparse(file_url).path)
         if file_url.startswith("gs://"):
             _, path = file_url.split("gs://", 1)
             bucket_name, blob_path = path.split("/", 1)
@@ -3,6 +3,13 @@ import os
 
 from google.cloud import tasks_v2
 
+from app.bulk.exporter import run_export_job
+from app.bulk.importer import run_job
+from app.db import models
+from app.services.job_queue import enqueue, register_task
+
+BULK_QUEUE = "bulk"
+
 
 class TaskConfigError(Exception):
     pass
@@ -42,3 +49,38 @@ def enqueue_http_task(path: str, payload: dict) -> bool:
     }
     client.create_task(request={"parent": parent, "task": task})
     return True
+
+
+def cloud_tasks_configured() -> bool:
+    try:
+        _get_tasks_config()
+    except TaskConfigError:
+        return False
+    return True
+
+
+def enqueue_bulk_job(db, kind: str, job_id: str) -> None:
+    """Sem Cloud Tasks, o job entra na fila do banco antes do commit do chamador, na mesma transacao do registro."""
+    if not cloud_tasks_configured():
+        enqueue(db, BULK_QUEUE, f"bulk.{kind}", {"job_id": str(job_id)})
+
+
+def dispatch_bulk_job(kind: str, job_id: str) -> None:
+    """Depois do commit: a task HTTP so pode apontar para um job ja gravado."""
+    if cloud_tasks_configured():
+        enqueue_http_task(f"/api/bulk/worker/{kind}/{job_id}", {"job_id": str(job_id)})
+
+
+@register_task("bulk.import")
+def run_import_task(db, payload: dict) -> None:
+    # ImportLeaseError sobe de proposito: outro worker detem o job e a fila tenta de novo com backoff.
+    job = db.get(models.ImportJob, payload["job_id"])
+    if job:
+        run_job(db, job)
+
+
+@register_task("bulk.export")
+def run_export_task(db, payload: dict) -> None:
+    job = db.get(models.ExportJob, payload["job_id"])
+    if job:
+        run_export_job(db, job)
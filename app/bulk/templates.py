@@ -1,13 +1,19 @@
+import tempfile
 from datetime import datetime
 from io import BytesIO
-from typing import Tuple
+from typing import BinaryIO, Tuple
 
 from openpyxl import Workbook
 from openpyxl.utils import get_column_letter
+from sqlalchemy import func, select
 
 from app.bulk.config import ENTITY_CONFIGS
 from app.db import models
 
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_BATCH_SIZE = 1000
+EXPORT_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
 
 def build_template(entity: str) -> Tuple[bytes, str]:
     config = ENTITY_CONFIGS[entity]
@@ -38,137 +44,141 @@ def build_template(entity: str) -> Tuple[bytes, str]:
     return out.getvalue(), filename
 
 
-def build_export(db, tenant_id: str, entity: str) -> Tuple[bytes, str]:
-    config = ENTITY_CONFIGS[entity]
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "EXPORT"
-    headers = [col.label for col in config.template_columns]
-    ws.append(headers)
+def _yes_no(value) -> str:
+    return "SIM" if value else "NAO"
 
+
+def _joined(values) -> str:
+    return ";".join(values or [])
+
+
+def export_statement(tenant_id: str, entity: str):
+    """Select so de colunas, na ordem do modelo, e o ajuste de cada linha antes de gravar."""
     if entity == "employees":
-        items = (
-            db.query(models.Colaborador)
-            .filter(models.Colaborador.tenant_id == tenant_id)
+        stmt = (
+            select(
+                models.Colaborador.nome,
+                models.Colaborador.funcao,
+                models.Colaborador.email,
+                models.Colaborador.telefone,
+                models.Colaborador.status,
+                models.Colaborador.contrato,
+                models.Colaborador.unidade,
+                models.Colaborador.coordenador_nome,
+                models.Colaborador.supervisor_nome,
+                models.Colaborador.especialidades,
+                models.Colaborador.observacoes,
+            )
+            .where(models.Colaborador.tenant_id == tenant_id)
             .order_by(models.Colaborador.created_at.desc())
-            .all()
         )
-        for item in items:
-            ws.append(
-                [
-                    item.nome,
-                    item.funcao,
-                    item.email,
-                    item.telefone,
-                    item.status,
-                    item.contrato,
-                    item.unidade,
-                    item.coordenador_nome,
-                    item.supervisor_nome,
-                    ";".join(item.especialidades or []),
-                    item.observacoes,
-                ]
+        return stmt, lambda row: [*row[:9], _joined(row[9]), row[10]]
+    if entity == "clients":
+        stmt = (
+            select(
+                models.Client.name,
+                models.Client.client_code,
+                models.Client.document,
+                models.Client.status,
+                models.Client.contract,
+                models.Client.address,
             )
-    elif entity == "clients":
-        items = (
-            db.query(models.Client)
-            .filter(models.Client.tenant_id == tenant_id)
+            .where(models.Client.tenant_id == tenant_id)
             .order_by(models.Client.created_at.desc())
-            .all()
         )
-        for item in items:
-            ws.append(
-                [
-                    item.name,
-                    item.client_code,
-                    item.document,
-                    item.status,
-                    item.contract,
-                    item.address,
-                ]
+        return stmt, list
+    if entity == "sites":
+        stmt = (
+            select(
+                models.Site.code,
+                models.Site.name,
+                models.CustomerAccount.cnpj,
+                models.CustomerAccount.name,
+                models.Site.status,
+                models.Site.address,
             )
-    elif entity == "sites":
-        items = (
-            db.query(models.Site, models.CustomerAccount)
             .outerjoin(models.CustomerAccount, models.CustomerAccount.id == models.Site.customer_account_id)
-            .filter(models.Site.tenant_id == tenant_id)
+            .where(models.Site.tenant_id == tenant_id)
             .order_by(models.Site.created_at.desc())
-            .all()
         )
-        for site, account in items:
-            ws.append(
-                [
-                    site.code,
-                    site.name,
-                    account.cnpj if account else None,
-                    account.name if account else None,
-                    site.status,
-                    site.address,
-                ]
+        return stmt, list
+    if entity == "assets":
+        stmt = (
+            select(
+                models.Asset.tag,
+                models.Asset.name,
+                models.Asset.asset_type,
+                models.Asset.status,
+                models.Client.document,
+                models.Client.client_code,
+                models.Site.code,
             )
-    elif entity == "assets":
-        items = (
-            db.query(models.Asset, models.Client, models.Site)
             .outerjoin(models.Client, models.Client.id == models.Asset.client_id)
             .outerjoin(models.Site, models.Site.id == models.Asset.site_id)
-            .filter(models.Asset.tenant_id == tenant_id)
+            .where(models.Asset.tenant_id == tenant_id)
             .order_by(models.Asset.created_at.desc())
-            .all()
         )
-        for asset, client, site in items:
-            ws.append(
-                [
-                    asset.tag,
-                    asset.name,
-                    asset.asset_type,
-                    asset.status,
-                    client.document if client else None,
-                    client.client_code if client else None,
-                    site.code if site else None,
-                ]
+        return stmt, list
+    if entity == "os_types":
+        stmt = (
+            select(
+                models.OSType.name,
+                models.OSType.description,
+                models.Client.document,
+                models.Client.client_code,
+                models.OSType.is_active,
             )
-    elif entity == "os_types":
-        items = (
-            db.query(models.OSType, models.Client)
             .outerjoin(models.Client, models.Client.id == models.OSType.client_id)
-            .filter(models.OSType.tenant_id == tenant_id)
+            .where(models.OSType.tenant_id == tenant_id)
             .order_by(models.OSType.created_at.desc())
-            .all()
         )
-        for item, client in items:
-            ws.append(
-                [
-                    item.name,
-                    item.description,
-                    client.document if client else None,
-                    client.client_code if client else None,
-                    "SIM" if item.is_active else "NAO",
-                ]
+        return stmt, lambda row: [*row[:4], _yes_no(row[4])]
+    if entity == "questionnaires":
+        stmt = (
+            select(
+                models.Questionnaire.title,
+                models.Questionnaire.version,
+                models.QuestionnaireItem.question_text,
+                models.QuestionnaireItem.required,
+                models.QuestionnaireItem.answer_type,
+                models.QuestionnaireItem.items,
             )
-    elif entity == "questionnaires":
-        items = (
-            db.query(models.Questionnaire, models.QuestionnaireItem)
             .join(models.QuestionnaireItem, models.QuestionnaireItem.questionnaire_id == models.Questionnaire.id)
-            .filter(models.Questionnaire.tenant_id == tenant_id)
+            .where(models.Questionnaire.tenant_id == tenant_id)
             .order_by(models.Questionnaire.created_at.desc())
-            .all()
         )
-        for questionnaire, q_item in items:
-            ws.append(
-                [
-                    questionnaire.title,
-                    questionnaire.version,
-                    q_item.question_text,
-                    "SIM" if q_item.required else "NAO",
-                    q_item.answer_type,
-                    ";".join(q_item.items or []),
-                ]
-            )
+        return stmt, lambda row: [row[0], row[1], row[2], _yes_no(row[3]), row[4], _joined(row[5])]
+    raise ValueError(f"Entidade nao suportada: {entity}")
 
+
+def export_exceeds(db, tenant_id: str, entity: str, limit: int) -> bool:
+    """Conta no maximo `limit + 1` linhas do export, sem varrer a entidade inteira."""
+    stmt, _ = export_statement(tenant_id, entity)
+    capped = stmt.order_by(None).limit(limit + 1).subquery()
+    return db.execute(select(func.count()).select_from(capped)).scalar_one() > limit
+
+
+def build_export(db, tenant_id: str, entity: str) -> Tuple[BinaryIO, str, int]:
+    """Grava o XLSX em modo write_only num arquivo temporario; memoria constante no numero de linhas.
+
+    Retorna o arquivo (posicionado no inicio), o nome e a quantidade de linhas exportadas.
+    """
+    config = ENTITY_CONFIGS[entity]
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("EXPORT")
+    headers = [col.label for col in config.template_columns]
     for idx, _ in enumerate(headers, start=1):
         ws.column_dimensions[get_column_letter(idx)].width = 26
+    ws.append(headers)
 
-    out = BytesIO()
+    stmt, to_cells = export_statement(tenant_id, entity)
+    exported = 0
+    for row in db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)):
+        ws.append(to_cells(row))
+        exported += 1
+
+    out = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES)
     wb.save(out)
+    out.seek(0)
     filename = f"export_{entity}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.xlsx"
-    return out.getvalue(), filename
+    return out, filename, exported
@@ -0,0 +1,117 @@
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.bulk.lookups import ImportLookups
+from app.db import models
+from app.services.collection_versions import bump_collection_versions
+
+UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+@dataclass(frozen=True)
+class UpsertSpec:
+    model: type
+    collection: str
+    conflict_columns: Tuple[str, ...]
+    values: Callable[[Dict[str, object], ImportLookups], Dict[str, object]]
+    insert_defaults: Dict[str, object] = field(default_factory=dict)
+
+
+UPSERT_SPECS: Dict[str, UpsertSpec] = {
+    "sites": UpsertSpec(
+        model=models.Site,
+        collection="sites",
+        conflict_columns=("tenant_id", "code"),
+        values=lambda row, lookups: {
+            "code": row.get("site_code"),
+            "name": row.get("name"),
+            "status": row.get("status"),
+            "address": row.get("address"),
+            "customer_account_id": lookups.customer_account_id(row),
+        },
+        insert_defaults={"status": "ATIVO"},
+    ),
+    "assets": UpsertSpec(
+        model=models.Asset,
+        collection="assets",
+        conflict_columns=("tenant_id", "tag"),
+        values=lambda row, lookups: {
+            "tag": row.get("tag"),
+            "name": row.get("name"),
+            "asset_type": row.get("asset_type"),
+            "status": row.get("status"),
+            "client_id": lookups.client_id(row),
+            "site_id": lookups.site_id(row),
+        },
+    ),
+}
+
+
+def supports_native_upsert(db, entity: str) -> bool:
+    return entity in UPSERT_SPECS and db.get_bind().dialect.name in UPSERT_DIALECTS
+
+
+def upsert_chunk(db, job: models.ImportJob, rows: List[Dict[str, object]], lookups: ImportLookups) -> Tuple[int, int, int]:
+    """INSERT ... ON CONFLICT pela chave natural; criados e atualizados saem do RETURNING.
+
+    Nao faz commit: o chamador grava o lote junto com o checkpoint do job.
+
+    Valores vazios na planilha mantem o valor atual, como no caminho ORM: linhas sao agrupadas
+    pelas colunas efetivamente informadas e cada grupo atualiza so essas colunas.
+    """
+    spec = UPSERT_SPECS[job.entity]
+    table = spec.model.__table__
+    dialect_insert = UPSERT_DIALECTS[db.get_bind().dialect.name]
+    connection = db.connection()
+    now = datetime.utcnow()
+    created = updated = skipped = 0
+    batches: Dict[Tuple[str, ...], List[Tuple[Dict[str, object], Dict[str, object]]]] = {}
+    seen_keys = set()
+
+    def _flush() -> None:
+        nonlocal created, updated, skipped
+        for provided, batch in batches.items():
+            stmt = dialect_insert(table)
+            if job.mode == "create_only":
+                stmt = stmt.on_conflict_do_nothing(index_elements=list(spec.conflict_columns))
+            else:
+                set_ = {column: stmt.excluded[column] for column in provided}
+                set_["updated_at"] = stmt.excluded.updated_at
+                stmt = stmt.on_conflict_do_update(index_elements=list(spec.conflict_columns), set_=set_)
+            new_rows = {record["id"]: row for record, row in batch}
+            returned = connection.execute(stmt.returning(table.c.id), [record for record, _ in batch]).scalars().all()
+            for record_id in returned:
+                if record_id in new_rows:
+                    lookups.remember(new_rows[record_id], record_id)
+                    created += 1
+                else:
+                    updated += 1
+            skipped += len(batch) - len(returned)
+        batches.clear()
+        seen_keys.clear()
+
+    for row in rows:
+        if job.mode == "update_only" and not lookups.existing_id(row):
+            skipped += 1
+            continue
+        values = spec.values(row, lookups)
+        key = tuple(values.get(column) for column in spec.conflict_columns if column != "tenant_id")
+        if key in seen_keys:
+            # A mesma chave duas vezes no comando falha no Postgres; grava o que ja foi acumulado.
+            _flush()
+        seen_keys.add(key)
+        provided = tuple(
+            column for column, value in values.items() if value is not None and column not in spec.conflict_columns
+        )
+        record = {column: spec.insert_defaults.get(column) if value is None else value for column, value in values.items()}
+        record.update(id=str(uuid.uuid4()), tenant_id=job.tenant_id, created_at=now, updated_at=now)
+        batches.setdefault(provided, []).append((record, row))
+    _flush()
+
+    if created or updated:
+        bump_collection_versions(connection, {(job.tenant_id, spec.collection)})
+    return created, updated, skipped
@@ -1,25 +1,38 @@
 import logging
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from app.catalog import service
+from app.core.http_cache import etag_matches, not_modified, set_etag, weak_etag
 from app.core.security import get_current_user
 from app.db import models
 from app.db.session import get_db
+from app.services.collection_versions import collection_versions
 
 logger = logging.getLogger("eagl.catalog")
 
 router = APIRouter(tags=["Catalog"])
 
 
+def _catalog_etag(db: Session, tenant_id: str, *parts) -> str:
+    (version,) = collection_versions(db, tenant_id, "catalog")
+    return weak_etag("catalog", tenant_id, version, *parts)
+
+
 @router.get("/catalog/areas")
 def get_areas(
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    request: Request = None,
+    response: Response = None,
 ):
     try:
+        etag = _catalog_etag(db, current_user.tenant_id, "areas")
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
         items = service.list_areas(db, current_user.tenant_id)
         return {
             "items": [
@@ -37,8 +50,14 @@ def get_equipment_types(
     area_id: str = Query(...),
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    request: Request = None,
+    response: Response = None,
 ):
     try:
+        etag = _catalog_etag(db, current_user.tenant_id, "equipment-types", area_id)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
         items = service.list_equipment_types(db, current_user.tenant_id, area_id)
         return {
             "items": [
@@ -56,8 +75,14 @@ def get_brands(
     equipment_type_id: str = Query(...),
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    request: Request = None,
+    response: Response = None,
 ):
     try:
+        etag = _catalog_etag(db, current_user.tenant_id, "brands", equipment_type_id)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
         items = service.list_brands(db, current_user.tenant_id, equipment_type_id)
         return {
             "items": [
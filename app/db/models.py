@@ -1,7 +1,21 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, Date, DateTime, Float, ForeignKey, Integer, JSON, String, UniqueConstraint
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    String,
+    UniqueConstraint,
+    text,
+)
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -184,6 +198,7 @@ class AuditLog(Base):
 
 class Client(Base):
     __tablename__ = "clients"
+    __table_args__ = (Index("ix_clients_tenant_updated", "tenant_id", "updated_at", "id"),)
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
@@ -198,6 +213,7 @@ class Client(Base):
     geocoded_at = Column(DateTime, nullable=True)
     geocode_status = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
 
 class CustomerAccount(Base):
@@ -217,6 +233,10 @@ class CustomerAccount(Base):
 
 class Site(Base):
     __tablename__ = "sites"
+    __table_args__ = (
+        Index("ix_sites_tenant_code", "tenant_id", "code", unique=True),
+        Index("ix_sites_tenant_updated", "tenant_id", "updated_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
@@ -351,6 +371,16 @@ class SuprimentoItem(Base):
 
 class WorkOrder(Base):
     __tablename__ = "work_orders"
+    __table_args__ = (
+        Index("ix_work_orders_tenant_facets", "tenant_id", "status", "priority", "type", "client_id"),
+        Index(
+            "ix_work_orders_sla_pending",
+            "tenant_id",
+            "sla_due_at",
+            postgresql_where=text("sla_breached IS NOT TRUE"),
+            sqlite_where=text("sla_breached IS NOT TRUE"),
+        ),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
@@ -391,6 +421,16 @@ class WorkOrder(Base):
     events = relationship("WorkOrderEvent", back_populates="work_order", cascade="all, delete-orphan")
 
 
+class WorkOrderSearch(Base):
+    __tablename__ = "work_order_search"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    work_order_id = Column(String, nullable=False, unique=True)
+    tenant_id = Column(String, nullable=False, index=True)
+    client_id = Column(String, nullable=True)
+    document = Column(String, nullable=False, default="")
+
+
 class WorkOrderItem(Base):
     __tablename__ = "work_order_items"
 
@@ -424,14 +464,91 @@ class WorkOrderAttachment(Base):
     size = Column(Integer, nullable=True)
     url = Column(String, nullable=True)
     thumb_url = Column(String, nullable=True)
+    sha256 = Column(String, nullable=True, index=True)
     created_by = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     item = relationship("WorkOrderItem", back_populates="attachments")
 
 
+class AttachmentBlob(Base):
+    __tablename__ = "attachment_blobs"
+    __table_args__ = (UniqueConstraint("tenant_id", "sha256", name="uq_attachment_blob"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
+    sha256 = Column(String, nullable=False)
+    object_name = Column(String, nullable=False)
+    thumb_object_name = Column(String, nullable=True)
+    mime = Column(String, nullable=True)
+    size = Column(Integer, nullable=True)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False, index=True)
+    work_order_id = Column(String, ForeignKey("work_orders.id"), nullable=False, index=True)
+    target = Column(String, nullable=False, default="attachment")
+    scope = Column(String, nullable=True)
+    item_id = Column(String, nullable=True)
+    question_id = Column(String, nullable=True)
+    role = Column(String, nullable=True)
+    file_name = Column(String, nullable=False)
+    mime = Column(String, nullable=False)
+    expected_size = Column(Integer, nullable=False)
+    expected_sha256 = Column(String, nullable=False)
+    staging_object = Column(String, nullable=True)
+    token_hash = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="pending", index=True)
+    error_message = Column(String, nullable=True)
+    result_id = Column(String, nullable=True)
+    created_by_user_id = Column(String, ForeignKey("users.id"), nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finalized_at = Column(DateTime, nullable=True)
+
+
+class TenantChangeSeq(Base):
+    __tablename__ = "tenant_change_seqs"
+
+    tenant_id = Column(String, ForeignKey("tenants.id"), primary_key=True)
+    seq = Column(BigInteger, nullable=False, default=0)
+
+
+class TenantCollectionVersion(Base):
+    __tablename__ = "tenant_collection_versions"
+
+    tenant_id = Column(String, primary_key=True)
+    collection = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+class SyncChange(Base):
+    __tablename__ = "sync_changes"
+    __table_args__ = (
+        Index("ix_sync_changes_tenant_seq", "tenant_id", "seq", unique=True),
+        Index("ix_sync_changes_work_order_seq", "work_order_id", "seq"),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
+    seq = Column(BigInteger, nullable=False)
+    entity = Column(String, nullable=False)
+    entity_id = Column(String, nullable=False)
+    work_order_id = Column(String, nullable=True)
+    op = Column(String, nullable=False)
+    client_id = Column(String, nullable=True)
+    assigned_user_id = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 class WorkOrderEvent(Base):
     __tablename__ = "work_order_events"
+    __table_args__ = (Index("ix_work_order_events_work_order_ts", "work_order_id", "client_timestamp"),)
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
@@ -442,6 +559,8 @@ class WorkOrderEvent(Base):
     server_received_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     lat = Column(String, nullable=True)
     lng = Column(String, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     accuracy_m = Column(Integer, nullable=True)
     altitude = Column(Integer, nullable=True)
     heading = Column(Integer, nullable=True)
@@ -480,7 +599,10 @@ class WorkOrderActivity(Base):
 
 class Asset(Base):
     __tablename__ = "assets"
-    __table_args__ = (UniqueConstraint("tenant_id", "tag", name="uq_asset_tag"),)
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "tag", name="uq_asset_tag"),
+        Index("ix_assets_tenant_updated", "tenant_id", "updated_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
@@ -801,6 +923,10 @@ class ImportJob(Base):
     error_report_url = Column(String, nullable=True)
     preview_json = Column(JSON, nullable=True)
     logs_json = Column(JSON, nullable=True)
+    progress_json = Column(JSON, nullable=True)
+    checkpoint_json = Column(JSON, nullable=True)
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
 
 
 class ImportRowError(Base):
@@ -834,6 +960,53 @@ class ExportJob(Base):
     summary_json = Column(JSON, nullable=True)
 
 
+class Tombstone(Base):
+    __tablename__ = "tombstones"
+    __table_args__ = (Index("ix_tombstones_tenant_entity_deleted", "tenant_id", "entity", "deleted_at", "id"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    tenant_id = Column(String, nullable=False)
+    entity = Column(String, nullable=False)
+    record_id = Column(String, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class QueueJob(Base):
+    __tablename__ = "queue_jobs"
+    __table_args__ = (Index("ix_queue_jobs_claim", "queue", "status", "available_at"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    queue = Column(String, nullable=False)
+    task = Column(String, nullable=False)
+    payload_json = Column(JSON, nullable=True)
+    status = Column(String, nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = Column(String, nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class PdfJob(Base):
+    __tablename__ = "pdf_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False, index=True)
+    work_order_id = Column(String, ForeignKey("work_orders.id"), nullable=False, index=True)
+    status = Column(String, nullable=False, default="queued", index=True)
+    content_digest = Column(String, nullable=True, index=True)
+    object_name = Column(String, nullable=True)
+    public_link_id = Column(String, ForeignKey("public_links.id"), nullable=True)
+    error_message = Column(String, nullable=True)
+    created_by_user_id = Column(String, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
 class CatalogArea(Base):
     __tablename__ = "catalog_area"
 
@@ -25,6 +25,7 @@ from app.api.v1.ssma import router as ssma_router
 from app.api.v1.orcamentos import router as orcamentos_router
 from app.api.v1.suprimentos import router as suprimentos_router
 from app.api.v1.map_contracts import router as map_contracts_router
+from app.api.v1.sla import router as sla_router
 from app.catalog.router import router as catalog_router
 from app.solver.router import public_router as solver_public_router
 from app.solver.router import router as solver_router
@@ -33,6 +34,8 @@ from app.core.config import settings
 from app.db import models
 from app.db.init_db import ensure_platform_schema, ensure_rbac_defaults, seed_initial_data
 from app.db.session import SessionLocal, engine
+from app.services.sla import start_sla_scheduler, stop_sla_scheduler
+from app.services.work_order_search import ensure_search_schema
 
 if not logging.getLogger().handlers:
     logging.basicConfig(level=logging.INFO)
@@ -58,9 +61,11 @@ app.add_middleware(
 def on_startup() -> None:
     models.Base.metadata.create_all(bind=engine)
     ensure_platform_schema(engine)
+    ensure_search_schema(engine)
     seed_initial_data()
     with SessionLocal() as db:
         ensure_rbac_defaults(db)
+    start_sla_scheduler(SessionLocal)
     if settings.ENV.lower() == "production":
         if settings.SECRET_KEY == "dev-secret-change-me":
             logger.warning("SECRET_KEY esta usando valor padrao em producao.")
@@ -68,6 +73,11 @@ def on_startup() -> None:
             logger.warning("SQLALCHEMY_DATABASE_URI aponta para SQLite em producao.")
 
 
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    stop_sla_scheduler()
+
+
 app.include_router(auth_router, prefix="/api")
 app.include_router(me_router, prefix="/api")
 app.include_router(dashboard_router, prefix="/api")
@@ -89,6 +99,7 @@ app.include_router(ssma_router, prefix="/api")
 app.include_router(orcamentos_router, prefix="/api")
 app.include_router(suprimentos_router, prefix="/api")
 app.include_router(map_contracts_router, prefix="/api")
+app.include_router(sla_router, prefix="/api")
 app.include_router(catalog_router, prefix="/api")
 app.include_router(solver_router, prefix="/api")
 app.include_router(scan_router, prefix="/api")
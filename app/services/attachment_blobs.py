@@ -0,0 +1,107 @@
+import hashlib
+from typing import BinaryIO, Iterable, Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.services.storage import UPLOAD_CHUNK_SIZE, StorageError
+
+
+def blob_object_names(tenant_id: str, sha256: str) -> tuple[str, str]:
+    base = f"attachments/{tenant_id}/{sha256[:2]}/{sha256}"
+    return base, f"{base}_thumb.jpg"
+
+
+def hash_file(file_obj: BinaryIO, max_bytes: Optional[int] = None) -> tuple[str, int]:
+    hasher = hashlib.sha256()
+    total = 0
+    file_obj.seek(0)
+    while True:
+        chunk = file_obj.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        total += len(chunk)
+        if max_bytes and total > max_bytes:
+            raise StorageError("Arquivo excede o tamanho maximo permitido.")
+        hasher.update(chunk)
+    file_obj.seek(0)
+    return hasher.hexdigest(), total
+
+
+def find_blob(db: Session, tenant_id: str, sha256: str) -> Optional[models.AttachmentBlob]:
+    return (
+        db.query(models.AttachmentBlob)
+        .filter(models.AttachmentBlob.tenant_id == tenant_id, models.AttachmentBlob.sha256 == sha256)
+        .first()
+    )
+
+
+def existing_hashes(db: Session, tenant_id: str, hashes: Iterable[str]) -> set[str]:
+    wanted = {value.lower() for value in hashes if value}
+    if not wanted:
+        return set()
+    rows = (
+        db.query(models.AttachmentBlob.sha256)
+        .filter(models.AttachmentBlob.tenant_id == tenant_id, models.AttachmentBlob.sha256.in_(wanted))
+        .all()
+    )
+    return {row[0] for row in rows}
+
+
+def add_blob_ref(db: Session, blob: models.AttachmentBlob) -> bool:
+    updated = (
+        db.query(models.AttachmentBlob)
+        .filter(models.AttachmentBlob.id == blob.id)
+        .update(
+            {models.AttachmentBlob.ref_count: models.AttachmentBlob.ref_count + 1},
+            synchronize_session=False,
+        )
+    )
+    return updated == 1
+
+
+def register_blob(
+    db: Session,
+    tenant_id: str,
+    sha256: str,
+    object_name: str,
+    thumb_object_name: Optional[str],
+    mime: Optional[str],
+    size: int,
+) -> models.AttachmentBlob:
+    blob = models.AttachmentBlob(
+        tenant_id=tenant_id,
+        sha256=sha256,
+        object_name=object_name,
+        thumb_object_name=thumb_object_name,
+        mime=mime,
+        size=size,
+        ref_count=1,
+    )
+    try:
+        # Savepoint: uma corrida pelo mesmo hash nao pode desfazer a transacao do chamador.
+        with db.begin_nested():
+            db.add(blob)
+    except IntegrityError:
+        blob = find_blob(db, tenant_id, sha256)
+        add_blob_ref(db, blob)
+    return blob
+
+
+def release_blob(db: Session, tenant_id: str, sha256: str) -> list[str]:
+    """Decremento e exclusao em comandos atomicos; um `add_blob_ref` concorrente impede a exclusao."""
+    table = models.AttachmentBlob.__table__
+    row = db.execute(
+        update(table)
+        .where(table.c.tenant_id == tenant_id, table.c.sha256 == sha256)
+        .values(ref_count=table.c.ref_count - 1)
+        .returning(table.c.id, table.c.ref_count, table.c.object_name, table.c.thumb_object_name)
+    ).first()
+    if not row or row.ref_count != 0:
+        return []
+    deleted = db.execute(delete(table).where(table.c.id == row.id, table.c.ref_count == 0))
+    if deleted.rowcount != 1:
+        return []
+    return [name for name in (row.object_name, row.thumb_object_name) if name]
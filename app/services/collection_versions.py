@@ -0,0 +1,64 @@
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+# Linhas globais do catalogo (tenant_id nulo) versionam sob o tenant "".
+GLOBAL_TENANT = ""
+VERSION_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+COLLECTIONS = {
+    models.OSType: "os_types",
+    models.Questionnaire: "questionnaires",
+    models.CatalogArea: "catalog",
+    models.CatalogEquipmentType: "catalog",
+    models.CatalogBrand: "catalog",
+    models.Client: "clients",
+    models.Site: "sites",
+    models.Asset: "assets",
+}
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_collection_versions(session: Session, flush_context) -> None:
+    keys: set[tuple[str, str]] = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        collection = COLLECTIONS.get(type(obj))
+        if not collection:
+            continue
+        if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+            continue
+        keys.add((obj.tenant_id or GLOBAL_TENANT, collection))
+    if keys:
+        bump_collection_versions(session.connection(), keys)
+
+
+def bump_collection_versions(connection, keys: set[tuple[str, str]]) -> None:
+    """Para escritas em Core, que nao passam pelo after_flush.
+
+    Um unico upsert: duas transacoes que criam a mesma chave ao mesmo tempo nao colidem na PK.
+    """
+    table = models.TenantCollectionVersion.__table__
+    dialect_insert = VERSION_DIALECTS[connection.dialect.name]
+    for tenant_id, collection in sorted(keys):
+        stmt = dialect_insert(table).values(tenant_id=tenant_id, collection=collection, version=1)
+        connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.tenant_id, table.c.collection],
+                set_={"version": table.c.version + 1},
+            )
+        )
+
+
+def collection_version_expr(tenant_id: str, collection: str):
+    table = models.TenantCollectionVersion.__table__
+    return (
+        select(func.coalesce(func.sum(table.c.version), 0))
+        .where(table.c.collection == collection, table.c.tenant_id.in_([tenant_id, GLOBAL_TENANT]))
+        .scalar_subquery()
+    )
+
+
+def collection_versions(db: Session, tenant_id: str, *collections: str) -> tuple[int, ...]:
+    row = db.execute(select(*(collection_version_expr(tenant_id, name) for name in collections))).one()
+    return tuple(row)
@@ -0,0 +1,84 @@
+import heapq
+import math
+from datetime import datetime
+from typing import Optional, Sequence
+
+EARTH_RADIUS_M = 6371000.0
+TRACK_PRECISION = 5
+
+
+def parse_coordinate(value, limit: float = 180.0) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(number) or abs(number) > limit:
+        return None
+    return number
+
+
+def _project(points: Sequence[tuple[datetime, float, float]]) -> list[tuple[float, float]]:
+    # Projecao equiretangular local: suficiente para as distancias de um trajeto de OS.
+    lat0 = math.radians(sum(p[1] for p in points) / len(points))
+    scale = math.cos(lat0)
+    return [(math.radians(lng) * scale * EARTH_RADIUS_M, math.radians(lat) * EARTH_RADIUS_M) for _, lat, lng in points]
+
+
+def _farthest(xy: list[tuple[float, float]], start: int, end: int) -> tuple[float, int]:
+    (x1, y1), (x2, y2) = xy[start], xy[end]
+    dx, dy = x2 - x1, y2 - y1
+    length = math.hypot(dx, dy)
+    best, best_idx = -1.0, start
+    for idx in range(start + 1, end):
+        x, y = xy[idx]
+        if length:
+            distance = abs(dy * x - dx * y + x2 * y1 - y2 * x1) / length
+        else:
+            distance = math.hypot(x - x1, y - y1)
+        if distance > best:
+            best, best_idx = distance, idx
+    return best, best_idx
+
+
+def simplify_track(points: Sequence[tuple[datetime, float, float]], max_points: int) -> list[tuple[datetime, float, float]]:
+    """Douglas-Peucker ate `max_points`: refina sempre o segmento com o ponto mais distante."""
+    if len(points) <= max_points:
+        return list(points)
+    if max_points < 2:
+        return [points[0], points[-1]][:max_points]
+    xy = _project(points)
+    kept = {0, len(points) - 1}
+    heap: list[tuple[float, int, int, int]] = []
+
+    def _push(start: int, end: int) -> None:
+        if end - start > 1:
+            distance, idx = _farthest(xy, start, end)
+            heapq.heappush(heap, (-distance, idx, start, end))
+
+    _push(0, len(points) - 1)
+    while heap and len(kept) < max_points:
+        _, idx, start, end = heapq.heappop(heap)
+        kept.add(idx)
+        _push(start, idx)
+        _push(idx, end)
+    return [points[idx] for idx in sorted(kept)]
+
+
+def _deltas(values: list[int]) -> list[int]:
+    return [value - previous for previous, value in zip([0] + values[:-1], values)]
+
+
+def encode_track(points: Sequence[tuple[datetime, float, float]], total: int) -> dict:
+    factor = 10**TRACK_PRECISION
+    start = points[0][0] if points else None
+    return {
+        "precision": TRACK_PRECISION,
+        "total": total,
+        "count": len(points),
+        "start": start.isoformat() if start else None,
+        "t": _deltas([int((p[0] - start).total_seconds()) for p in points]) if points else [],
+        "lat": _deltas([round(p[1] * factor) for p in points]),
+        "lng": _deltas([round(p[2] * factor) for p in points]),
+    }
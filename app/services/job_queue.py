@@ -0,0 +1,227 @@
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+logger = logging.getLogger("eagl.job_queue")
+
+TaskHandler = Callable[[Session, dict], None]
+TASKS: Dict[str, TaskHandler] = {}
+
+
+def register_task(name: str) -> Callable[[TaskHandler], TaskHandler]:
+    def _register(handler: TaskHandler) -> TaskHandler:
+        TASKS[name] = handler
+        return handler
+
+    return _register
+
+
+def _queue_setting(queue: str, name: str, default: str) -> int:
+    value = os.getenv(f"JOB_QUEUE_{queue.upper()}_{name}") or os.getenv(f"JOB_QUEUE_{name}", default)
+    return max(1, int(value))
+
+
+def queue_concurrency(queue: str) -> int:
+    return _queue_setting(queue, "CONCURRENCY", "2")
+
+
+def visibility_seconds(queue: str) -> int:
+    return _queue_setting(queue, "VISIBILITY_SECONDS", "900")
+
+
+def max_attempts(queue: str) -> int:
+    return _queue_setting(queue, "MAX_ATTEMPTS", "5")
+
+
+def retry_delay(attempts: int) -> timedelta:
+    base = int(os.getenv("JOB_QUEUE_RETRY_BASE_SECONDS", "30"))
+    cap = int(os.getenv("JOB_QUEUE_RETRY_MAX_SECONDS", "3600"))
+    return timedelta(seconds=min(cap, base * 2 ** max(0, attempts - 1)))
+
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _jobs():
+    return models.QueueJob.__table__
+
+
+def enqueue(db: Session, queue: str, task: str, payload: dict, delay_seconds: int = 0) -> models.QueueJob:
+    """Adiciona o job na sessao; o commit fica com o chamador, junto com o registro que o originou."""
+    job = models.QueueJob(
+        queue=queue,
+        task=task,
+        payload_json=payload,
+        status="queued",
+        attempts=0,
+        max_attempts=max_attempts(queue),
+        available_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+    )
+    db.add(job)
+    return job
+
+
+def _claimable(table, queue: str, now: datetime):
+    # Job em execucao cujo prazo de visibilidade venceu e de um worker morto: volta a ser elegivel.
+    return and_(
+        table.c.queue == queue,
+        table.c.attempts < table.c.max_attempts,
+        or_(
+            and_(table.c.status == "queued", table.c.available_at <= now),
+            and_(table.c.status == "running", table.c.locked_until < now),
+        ),
+    )
+
+
+def _running(table, queue: str, now: datetime):
+    return and_(table.c.queue == queue, table.c.status == "running", table.c.locked_until >= now)
+
+
+def _fail_expired(db: Session, queue: str, now: datetime) -> None:
+    table = _jobs()
+    db.execute(
+        update(table)
+        .where(
+            table.c.queue == queue,
+            table.c.status == "running",
+            table.c.locked_until < now,
+            table.c.attempts >= table.c.max_attempts,
+        )
+        .values(status="failed", locked_by=None, locked_until=None, finished_at=now, last_error="Prazo de visibilidade expirado")
+    )
+
+
+def _claim_postgres(db: Session, queue: str, worker_id: str, now: datetime, limit: int) -> Optional[str]:
+    table = _jobs()
+    # O lock consultivo serializa os claims da fila para que o limite de concorrencia valha entre workers.
+    db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"queue_jobs:{queue}"))))
+    running = db.execute(select(func.count()).select_from(table).where(_running(table, queue, now))).scalar_one()
+    if running >= limit:
+        return None
+    job_id = db.execute(
+        select(table.c.id)
+        .where(_claimable(table, queue, now))
+        .order_by(table.c.available_at, table.c.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).scalar()
+    if not job_id:
+        return None
+    db.execute(
+        update(table)
+        .where(table.c.id == job_id)
+        .values(
+            status="running",
+            attempts=table.c.attempts + 1,
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=visibility_seconds(queue)),
+        )
+    )
+    return job_id
+
+
+def _claim_single_statement(db: Session, queue: str, worker_id: str, now: datetime, limit: int) -> Optional[str]:
+    """SQLite nao tem SKIP LOCKED, mas serializa escritas: escolher o job e conferir o limite
+    dentro do proprio UPDATE torna o claim atomico."""
+    table = _jobs()
+    candidate = table.alias("candidate")
+    busy = table.alias("busy")
+    next_id = (
+        select(candidate.c.id)
+        .where(_claimable(candidate, queue, now))
+        .order_by(candidate.c.available_at, candidate.c.created_at)
+        .limit(1)
+        .scalar_subquery()
+    )
+    running = select(func.count()).select_from(busy).where(_running(busy, queue, now)).scalar_subquery()
+    return db.execute(
+        update(table)
+        .where(table.c.id == next_id, running < limit)
+        .values(
+            status="running",
+            attempts=table.c.attempts + 1,
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=visibility_seconds(queue)),
+        )
+        .returning(table.c.id)
+    ).scalar()
+
+
+def claim(db: Session, queue: str, worker_id: str) -> Optional[models.QueueJob]:
+    now = datetime.utcnow()
+    limit = queue_concurrency(queue)
+    try:
+        _fail_expired(db, queue, now)
+        if db.get_bind().dialect.name == "postgresql":
+            job_id = _claim_postgres(db, queue, worker_id, now, limit)
+        else:
+            job_id = _claim_single_statement(db, queue, worker_id, now, limit)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    if not job_id:
+        return None
+    return db.get(models.QueueJob, job_id, populate_existing=True)
+
+
+def extend(db: Session, job_id: str, worker_id: str, queue: str) -> bool:
+    """Heartbeat: empurra o prazo de visibilidade enquanto o worker ainda processa o job."""
+    table = _jobs()
+    result = db.execute(
+        update(table)
+        .where(table.c.id == job_id, table.c.locked_by == worker_id, table.c.status == "running")
+        .values(locked_until=datetime.utcnow() + timedelta(seconds=visibility_seconds(queue)))
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def complete(db: Session, job: models.QueueJob, worker_id: str) -> None:
+    table = _jobs()
+    db.execute(
+        update(table)
+        .where(table.c.id == job.id, table.c.locked_by == worker_id)
+        .values(status="completed", locked_by=None, locked_until=None, finished_at=datetime.utcnow())
+    )
+    db.commit()
+
+
+def fail(db: Session, job: models.QueueJob, worker_id: str, error: str) -> str:
+    """Reagenda com backoff exponencial ou encerra como `failed` ao esgotar as tentativas."""
+    table = _jobs()
+    now = datetime.utcnow()
+    if job.attempts < job.max_attempts:
+        values = {"status": "queued", "available_at": now + retry_delay(job.attempts)}
+    else:
+        values = {"status": "failed", "finished_at": now}
+    db.execute(
+        update(table)
+        .where(table.c.id == job.id, table.c.locked_by == worker_id)
+        .values(locked_by=None, locked_until=None, last_error=error[:2000], **values)
+    )
+    db.commit()
+    return values["status"]
+
+
+def run_claimed(db: Session, job: models.QueueJob, worker_id: str) -> str:
+    handler = TASKS.get(job.task)
+    try:
+        if handler is None:
+            raise LookupError(f"Task desconhecida: {job.task}")
+        handler(db, job.payload_json or {})
+    except Exception as exc:
+        db.rollback()
+        logger.exception("Falha no job queue=%s task=%s id=%s tentativa=%s", job.queue, job.task, job.id, job.attempts)
+        return fail(db, job, worker_id, f"{type(exc).__name__}: {exc}")
+    complete(db, job, worker_id)
+    return "completed"
@@ -1,6 +1,10 @@
 from jinja2 import Template
-from weasyprint import HTML
+from weasyprint import HTML, default_url_fetcher
 
+from app.services.pdf_images import collect_image_urls, make_url_fetcher, prefetch_images
+
+
+TEMPLATE_VERSION = "1"
 
 _TEMPLATE = Template(
     """
@@ -354,5 +358,6 @@ _TEMPLATE = Template(
 
 def render_os_pdf(payload: dict) -> bytes:
     html = _TEMPLATE.render(**payload)
-    pdf = HTML(string=html).write_pdf()
+    images = prefetch_images(collect_image_urls(payload))
+    pdf = HTML(string=html, url_fetcher=make_url_fetcher(images, default_url_fetcher)).write_pdf()
     return pdf
@@ -0,0 +1,115 @@
+import hashlib
+import logging
+import os
+import pathlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from PIL import Image
+
+logger = logging.getLogger("eagl.pdf_images")
+
+PHOTO_MAX_PX = 480
+SIGNATURE_MAX_PX = 600
+
+
+def _cache_dir() -> pathlib.Path:
+    path = pathlib.Path(os.getenv("PDF_IMAGE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "eagl-pdf-images")))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _cache_key(url: str, max_px: int) -> str:
+    parts = urlsplit(url)
+    return hashlib.sha256(f"{parts.netloc}{parts.path}:{max_px}".encode("utf-8")).hexdigest()
+
+
+def collect_image_urls(payload: dict) -> dict[str, int]:
+    urls: dict[str, int] = {}
+
+    def _add(url: Optional[str], max_px: int) -> None:
+        if url and url.startswith(("http://", "https://")):
+            urls[url] = max(urls.get(url, 0), max_px)
+
+    for section in ("checkin", "checkout"):
+        for url in (payload.get(section) or {}).get("photos") or []:
+            _add(url, PHOTO_MAX_PX)
+    for group in (payload.get("answers") or []) + (payload.get("evidence") or []):
+        for url in group.get("photos") or []:
+            _add(url, PHOTO_MAX_PX)
+    for signature in (payload.get("signatures") or {}).values():
+        _add((signature or {}).get("image_url"), SIGNATURE_MAX_PX)
+    _add(payload.get("logo_url"), SIGNATURE_MAX_PX)
+    return urls
+
+
+def downscale_image(data: bytes, max_px: int) -> tuple[bytes, str]:
+    image = Image.open(BytesIO(data))
+    if image.format == "JPEG":
+        image.draft("RGB", (max_px, max_px))
+    image.thumbnail((max_px, max_px))
+    out = BytesIO()
+    if image.mode in {"RGBA", "LA", "P"}:
+        image.save(out, format="PNG", optimize=True)
+        return out.getvalue(), "image/png"
+    image.convert("RGB").save(out, format="JPEG", quality=82)
+    return out.getvalue(), "image/jpeg"
+
+
+def _fetch_one(client: httpx.Client, url: str, max_px: int) -> Optional[tuple[bytes, str]]:
+    cache_path = _cache_dir() / _cache_key(url, max_px)
+    if cache_path.exists():
+        data = cache_path.read_bytes()
+        os.utime(cache_path)
+        mime = "image/png" if data.startswith(b"\x89PNG") else "image/jpeg"
+        return data, mime
+    try:
+        response = client.get(url)
+        if response.status_code >= 400:
+            return None
+        data, mime = downscale_image(response.content, max_px)
+    except Exception:
+        logger.warning("pdf image prefetch failed url=%s", urlsplit(url).path)
+        return None
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, cache_path)
+    return data, mime
+
+
+def prefetch_images(urls: dict[str, int], workers: Optional[int] = None, timeout: float = 15.0) -> dict[str, tuple[bytes, str]]:
+    if not urls:
+        return {}
+    workers = workers or int(os.getenv("PDF_IMAGE_PREFETCH_WORKERS", "8"))
+    with httpx.Client(timeout=timeout, follow_redirects=True) as client:
+        with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as pool:
+            results = list(pool.map(lambda entry: (entry[0], _fetch_one(client, *entry)), urls.items()))
+    _prune_cache(int(os.getenv("PDF_IMAGE_CACHE_MAX_FILES", "2000")))
+    return {url: result for url, result in results if result}
+
+
+def _prune_cache(max_files: int) -> None:
+    files = [path for path in _cache_dir().iterdir() if path.is_file()]
+    if len(files) <= max_files:
+        return
+    files.sort(key=lambda path: path.stat().st_mtime)
+    for path in files[: len(files) - max_files]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def make_url_fetcher(images: dict[str, tuple[bytes, str]], fallback: Callable) -> Callable:
+    def _fetcher(url: str, *args, **kwargs) -> dict:
+        cached = images.get(url)
+        if cached:
+            data, mime = cached
+            return {"string": data, "mime_type": mime, "redirected_url": url}
+        return fallback(url, *args, **kwargs)
+
+    return _fetcher
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable
+
+from app.db import models
+from app.services.os_pdf import TEMPLATE_VERSION, render_os_pdf
+
+logger = logging.getLogger("eagl.pdf_jobs")
+
+RUNNER_MODES = {"process", "thread", "inline"}
+
+
+def compute_pdf_digest(work_order: models.WorkOrder, attachment_ids: list[str]) -> str:
+    state = {
+        "template_version": TEMPLATE_VERSION,
+        "logo_url": os.getenv("OS_PDF_LOGO_URL"),
+        "work_order": {
+            "id": work_order.id,
+            "updated_at": work_order.updated_at,
+            "status": work_order.status,
+            "client_id": work_order.client_id,
+            "site_id": work_order.site_id,
+            "asset_id": work_order.asset_id,
+            "checkin": work_order.checkin_data,
+            "checkout": work_order.checkout_data,
+            "signatures": work_order.signatures,
+        },
+        "items": sorted(
+            (
+                item.id,
+                item.order_index,
+                item.question_text,
+                item.answer_value,
+                item.answer_numeric,
+                item.note,
+            )
+            for item in work_order.items
+        ),
+        "activities": sorted(
+            (
+                activity.id,
+                activity.name,
+                activity.status,
+                activity.duration_ms_server,
+                activity.duration_ms_client,
+            )
+            for activity in work_order.activities
+        ),
+        "attachments": sorted(attachment_ids),
+    }
+    encoded = json.dumps(state, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class PdfJobRunner:
+    def __init__(self, mode: str = "process", max_workers: int = 2, max_per_tenant: int = 1) -> None:
+        if mode not in RUNNER_MODES:
+            raise ValueError(f"PDF_JOB_RUNNER invalido: {mode}")
+        self.mode = mode
+        self.max_workers = max(1, max_workers)
+        self.max_per_tenant = max(1, max_per_tenant)
+        self._lock = threading.Lock()
+        self._running: dict[str, int] = defaultdict(int)
+        self._pending: dict[str, deque] = defaultdict(deque)
+        self._threads = (
+            ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pdf-job")
+            if mode != "inline"
+            else None
+        )
+        self._processes: ProcessPoolExecutor | None = None
+
+    def render(self, payload: dict) -> bytes:
+        if self.mode != "process":
+            return render_os_pdf(payload)
+        with self._lock:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            processes = self._processes
+        return processes.submit(render_os_pdf, payload).result()
+
+    def submit(self, tenant_id: str, fn: Callable, *args) -> None:
+        if self._threads is None:
+            fn(*args)
+            return
+        with self._lock:
+            if self._running[tenant_id] >= self.max_per_tenant:
+                self._pending[tenant_id].append((fn, args))
+                return
+            self._running[tenant_id] += 1
+        self._threads.submit(self._drain, tenant_id, fn, args)
+
+    def pending_count(self, tenant_id: str) -> int:
+        with self._lock:
+            return len(self._pending.get(tenant_id, ()))
+
+    def _drain(self, tenant_id: str, fn: Callable, args: tuple) -> None:
+        while True:
+            try:
+                fn(*args)
+            except Exception:
+                logger.exception("pdf job failed tenant=%s", tenant_id)
+            with self._lock:
+                pending = self._pending.get(tenant_id)
+                if not pending:
+                    self._running[tenant_id] -= 1
+                    if self._running[tenant_id] <= 0:
+                        self._running.pop(tenant_id, None)
+                        self._pending.pop(tenant_id, None)
+                    return
+                fn, args = pending.popleft()
+
+    def shutdown(self) -> None:
+        if self._threads is not None:
+            self._threads.shutdown(wait=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=True)
+
+
+@lru_cache(maxsize=1)
+def get_pdf_job_runner() -> PdfJobRunner:
+    return PdfJobRunner(
+        mode=os.getenv("PDF_JOB_RUNNER", "process").lower(),
+        max_workers=int(os.getenv("PDF_JOB_WORKERS", "2")),
+        max_per_tenant=int(os.getenv("PDF_JOB_MAX_PER_TENANT", "1")),
+    )
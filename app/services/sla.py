@@ -0,0 +1,145 @@
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import insert, or_, select, text, update
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.services.sync_log import record_changes
+
+logger = logging.getLogger("eagl.sla")
+
+CLOSED_STATUSES = ("concluida", "fechada", "cancelada")
+SLA_PENDING = text("work_orders.sla_breached IS NOT TRUE")
+SLA_BREACH_EVENT = "SLA_BREACH"
+
+_scheduler_stop = threading.Event()
+
+
+def _batch_size() -> int:
+    return max(1, int(os.getenv("SLA_BATCH_SIZE", "1000")))
+
+
+def _pending_filter(tenant_id: str, now: datetime):
+    table = models.WorkOrder.__table__
+    return (
+        table.c.tenant_id == tenant_id,
+        table.c.sla_due_at < now,
+        SLA_PENDING,
+        or_(table.c.status.is_(None), table.c.status.notin_(CLOSED_STATUSES)),
+    )
+
+
+def _breach_batch(db: Session, tenant_id: str, now: datetime, batch_size: int) -> list:
+    table = models.WorkOrder.__table__
+    candidates = (
+        select(table.c.id)
+        .where(*_pending_filter(tenant_id, now))
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    # O filtro externo repete SLA_PENDING para que execucoes concorrentes nao marquem a mesma OS duas vezes.
+    return db.execute(
+        update(table)
+        .where(table.c.id.in_(candidates.scalar_subquery()), SLA_PENDING)
+        .values(sla_breached=True, updated_at=now)
+        .returning(table.c.id, table.c.client_id, table.c.assigned_user_id, table.c.sla_due_at)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+
+def evaluate_tenant_sla(db: Session, tenant_id: str, now: datetime, batch_size: Optional[int] = None) -> int:
+    batch_size = batch_size or _batch_size()
+    breached = 0
+    while True:
+        rows = _breach_batch(db, tenant_id, now, batch_size)
+        if not rows:
+            break
+        connection = db.connection()
+        connection.execute(
+            insert(models.WorkOrderEvent.__table__),
+            [
+                {
+                    "id": str(uuid.uuid4()),
+                    "tenant_id": tenant_id,
+                    "work_order_id": row.id,
+                    "type": SLA_BREACH_EVENT,
+                    "server_received_at": now,
+                    "created_at": now,
+                    "payload_resumo": {"sla_due_at": row.sla_due_at.isoformat()},
+                }
+                for row in rows
+            ],
+        )
+        record_changes(
+            connection,
+            tenant_id,
+            [
+                {
+                    "entity": "work_order",
+                    "entity_id": row.id,
+                    "work_order_id": row.id,
+                    "op": "upsert",
+                    "client_id": row.client_id,
+                    "assigned_user_id": row.assigned_user_id,
+                }
+                for row in rows
+            ],
+        )
+        db.commit()
+        breached += len(rows)
+        if len(rows) < batch_size:
+            break
+    return breached
+
+
+def evaluate_sla(db: Session, now: Optional[datetime] = None, batch_size: Optional[int] = None) -> dict:
+    now = now or datetime.utcnow()
+    tenant_ids = [row[0] for row in db.execute(select(models.Tenant.id)).all()]
+    db.commit()
+    tenants: dict[str, int] = {}
+    for tenant_id in tenant_ids:
+        try:
+            breached = evaluate_tenant_sla(db, tenant_id, now, batch_size)
+        except Exception:
+            db.rollback()
+            logger.exception("Falha ao avaliar SLA tenant=%s", tenant_id)
+            continue
+        if breached:
+            tenants[tenant_id] = breached
+    total = sum(tenants.values())
+    if total:
+        logger.info("SLA avaliado breached=%s tenants=%s", total, len(tenants))
+    return {"evaluated_at": now, "breached": total, "tenants": tenants}
+
+
+def _scheduler_loop(session_factory: Callable[[], Session], interval: int) -> None:
+    while not _scheduler_stop.wait(interval):
+        try:
+            with session_factory() as db:
+                evaluate_sla(db)
+        except Exception:
+            logger.exception("Falha no agendador de SLA")
+
+
+def start_sla_scheduler(session_factory: Callable[[], Session]) -> Optional[threading.Thread]:
+    if os.getenv("SLA_SCHEDULER_ENABLED", "0") != "1":
+        return None
+    interval = max(5, int(os.getenv("SLA_SCHEDULER_INTERVAL_SECONDS", "60")))
+    _scheduler_stop.clear()
+    thread = threading.Thread(
+        target=_scheduler_loop,
+        args=(session_factory, interval),
+        name="sla-scheduler",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def stop_sla_scheduler() -> None:
+    _scheduler_stop.set()
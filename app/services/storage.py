@@ -1,11 +1,21 @@
+import hashlib
 import os
-from datetime import timedelta
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from functools import lru_cache
-from typing import Optional
+from typing import BinaryIO, Iterable, Optional
 
 from google.cloud import storage
 
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class StorageError(Exception):
+    pass
+
+
 @lru_cache(maxsize=1)
 def get_storage_client() -> storage.Client:
     return storage.Client()
@@ -42,15 +52,144 @@ def upload_file(
     return object_name
 
 
-def delete_object(object_name: str) -> None:
+def upload_stream(
+    file_obj: BinaryIO,
+    object_name: str,
+    content_type: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+) -> tuple[str, int, str]:
     client = get_storage_client()
     bucket = client.bucket(get_bucket_name())
     blob = bucket.blob(object_name)
-    blob.delete()
+    hasher = hashlib.sha256()
+    total = 0
+    try:
+        with blob.open("wb", chunk_size=UPLOAD_CHUNK_SIZE, content_type=content_type) as handle:
+            while True:
+                chunk = file_obj.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if max_bytes and total > max_bytes:
+                    raise StorageError("Arquivo excede o tamanho maximo permitido.")
+                hasher.update(chunk)
+                handle.write(chunk)
+    except StorageError:
+        try:
+            blob.delete()
+        except Exception:
+            pass
+        raise
+    return object_name, total, hasher.hexdigest()
 
 
-def generate_signed_url(object_name: str, expires_minutes: int = 30) -> str:
+def generate_upload_url(object_name: str, content_type: str, expires_minutes: int = 15) -> str:
+    client = get_storage_client()
+    bucket = client.bucket(get_bucket_name())
+    blob = bucket.blob(object_name)
+    return blob.generate_signed_url(
+        version="v4",
+        expiration=timedelta(minutes=expires_minutes),
+        method="PUT",
+        content_type=content_type,
+    )
+
+
+def open_object(object_name: str) -> BinaryIO:
+    client = get_storage_client()
+    bucket = client.bucket(get_bucket_name())
+    return bucket.blob(object_name).open("rb", chunk_size=UPLOAD_CHUNK_SIZE)
+
+
+def object_exists(object_name: str) -> bool:
+    client = get_storage_client()
+    bucket = client.bucket(get_bucket_name())
+    return bucket.blob(object_name).exists()
+
+
+def move_object(source_name: str, dest_name: str) -> str:
+    client = get_storage_client()
+    bucket = client.bucket(get_bucket_name())
+    source = bucket.blob(source_name)
+    bucket.copy_blob(source, bucket, dest_name)
+    source.delete()
+    return dest_name
+
+
+def delete_object(object_name: str) -> None:
     client = get_storage_client()
     bucket = client.bucket(get_bucket_name())
     blob = bucket.blob(object_name)
-    return blob.generate_signed_url(expiration=timedelta(minutes=expires_minutes), method="GET")
+    blob.delete()
+
+
+_signed_url_cache: "OrderedDict[tuple[str, int], tuple[str, datetime]]" = OrderedDict()
+_signed_url_lock = threading.Lock()
+
+
+def _signed_url_cache_size() -> int:
+    return int(os.getenv("SIGNED_URL_CACHE_SIZE", "20000"))
+
+
+def _signed_url_min_remaining(expires_minutes: int) -> timedelta:
+    minutes = int(os.getenv("SIGNED_URL_MIN_REMAINING_MINUTES", "10"))
+    return timedelta(minutes=min(minutes, expires_minutes // 2))
+
+
+def signed_url_epoch(expires_minutes: int = 30) -> int:
+    # Respostas com URLs assinadas so podem ser revalidadas enquanto as URLs em cache ainda valem.
+    window = max(60, int(_signed_url_min_remaining(expires_minutes).total_seconds()))
+    return int(datetime.utcnow().timestamp()) // window
+
+
+def _get_cached_signed_url(key: tuple[str, int], now: datetime) -> Optional[str]:
+    with _signed_url_lock:
+        cached = _signed_url_cache.get(key)
+        if not cached:
+            return None
+        url, expires_at = cached
+        if expires_at - now <= _signed_url_min_remaining(key[1]):
+            _signed_url_cache.pop(key, None)
+            return None
+        _signed_url_cache.move_to_end(key)
+        return url
+
+
+def _store_signed_url(key: tuple[str, int], url: str, expires_at: datetime) -> None:
+    with _signed_url_lock:
+        _signed_url_cache[key] = (url, expires_at)
+        _signed_url_cache.move_to_end(key)
+        while len(_signed_url_cache) > _signed_url_cache_size():
+            _signed_url_cache.popitem(last=False)
+
+
+def clear_signed_url_cache() -> None:
+    with _signed_url_lock:
+        _signed_url_cache.clear()
+
+
+def generate_signed_urls(object_names: Iterable[Optional[str]], expires_minutes: int = 30) -> dict[str, str]:
+    now = datetime.utcnow()
+    urls: dict[str, str] = {}
+    missing: list[str] = []
+    for object_name in dict.fromkeys(name for name in object_names if name):
+        cached = _get_cached_signed_url((object_name, expires_minutes), now)
+        if cached:
+            urls[object_name] = cached
+        else:
+            missing.append(object_name)
+    if not missing:
+        return urls
+
+    bucket = get_storage_client().bucket(get_bucket_name())
+    expiration = timedelta(minutes=expires_minutes)
+    expires_at = now + expiration
+    for object_name in missing:
+        url = bucket.blob(object_name).generate_signed_url(expiration=expiration, method="GET")
+        _store_signed_url((object_name, expires_minutes), url, expires_at)
+        urls[object_name] = url
+    return urls
+
+
+def generate_signed_url(object_name: str, expires_minutes: int = 30) -> str:
+    return generate_signed_urls([object_name], expires_minutes)[object_name]
@@ -0,0 +1,188 @@
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event, insert, inspect, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+SYNC_ENTITIES = {
+    models.WorkOrder: "work_order",
+    models.WorkOrderItem: "item",
+    models.WorkOrderActivity: "activity",
+    models.WorkOrderAttachment: "attachment",
+}
+SCOPE_ATTRS = ("client_id", "assigned_user_id")
+SEQ_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+PENDING_KEY = "sync_changes"
+
+
+def _history_old(obj, attr: str):
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, attr)
+
+
+def _child_changes(connection, work_order_id: str) -> list[tuple[str, str]]:
+    children = []
+    for model, entity in (
+        (models.WorkOrderItem, "item"),
+        (models.WorkOrderActivity, "activity"),
+        (models.WorkOrderAttachment, "attachment"),
+    ):
+        rows = connection.execute(select(model.id).where(model.work_order_id == work_order_id))
+        children.extend((entity, row[0]) for row in rows)
+    return children
+
+
+@event.listens_for(Session, "after_flush")
+def _record_sync_changes(session: Session, flush_context) -> None:
+    touched: list[tuple[object, str]] = []
+    for obj in session.new:
+        if type(obj) in SYNC_ENTITIES:
+            touched.append((obj, "upsert"))
+    for obj in session.dirty:
+        if type(obj) in SYNC_ENTITIES and session.is_modified(obj, include_collections=False):
+            touched.append((obj, "upsert"))
+    for obj in session.deleted:
+        if type(obj) in SYNC_ENTITIES:
+            touched.append((obj, "delete"))
+    if not touched:
+        return
+    # OS primeiro: deletes do escopo antigo precisam vir antes dos upserts dos filhos.
+    touched.sort(key=lambda entry: not isinstance(entry[0], models.WorkOrder))
+
+    connection = session.connection()
+    parents: dict[str, tuple] = {}
+    for obj, _ in touched:
+        if isinstance(obj, models.WorkOrder):
+            parents[obj.id] = (obj.tenant_id, obj.client_id, obj.assigned_user_id)
+    missing = {obj.work_order_id for obj, _ in touched if not isinstance(obj, models.WorkOrder)} - set(parents)
+    if missing:
+        rows = connection.execute(
+            select(
+                models.WorkOrder.id,
+                models.WorkOrder.tenant_id,
+                models.WorkOrder.client_id,
+                models.WorkOrder.assigned_user_id,
+            ).where(models.WorkOrder.id.in_(missing))
+        )
+        for row in rows:
+            parents[row[0]] = tuple(row[1:])
+
+    changes: dict[str, list[dict]] = defaultdict(list)
+    seen: set[tuple[str, str, str]] = set()
+
+    def _add(entity: str, entity_id: str, work_order_id: str, op: str, scope: tuple) -> None:
+        key = (entity, entity_id, op)
+        if key in seen:
+            return
+        seen.add(key)
+        tenant_id, client_id, assigned_user_id = scope
+        changes[tenant_id].append(
+            {
+                "entity": entity,
+                "entity_id": entity_id,
+                "work_order_id": work_order_id,
+                "op": op,
+                "client_id": client_id,
+                "assigned_user_id": assigned_user_id,
+            }
+        )
+
+    for obj, op in touched:
+        if isinstance(obj, models.WorkOrder):
+            if op == "upsert" and obj not in session.new:
+                old_scope = tuple(_history_old(obj, attr) for attr in SCOPE_ATTRS)
+                if old_scope != (obj.client_id, obj.assigned_user_id):
+                    _add("work_order", obj.id, obj.id, "delete", (obj.tenant_id, *old_scope))
+                    children = _child_changes(connection, obj.id)
+                    for entity, child_id in children:
+                        _add(entity, child_id, obj.id, "delete", (obj.tenant_id, *old_scope))
+                    for entity, child_id in children:
+                        _add(entity, child_id, obj.id, "upsert", parents[obj.id])
+            _add("work_order", obj.id, obj.id, op, parents[obj.id])
+            continue
+        scope = parents.get(obj.work_order_id)
+        if scope:
+            _add(SYNC_ENTITIES[type(obj)], obj.id, obj.work_order_id, op, scope)
+
+    pending = session.info.setdefault(PENDING_KEY, defaultdict(list))
+    for tenant_id, rows in changes.items():
+        pending[tenant_id].extend(rows)
+
+
+@event.listens_for(Session, "before_commit")
+def _write_sync_changes(session: Session) -> None:
+    """A sequencia do tenant so e tomada no fim da transacao, segurando o lock da linha pelo menor tempo."""
+    session.flush()
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending:
+        return
+    connection = session.connection()
+    for tenant_id, rows in pending.items():
+        record_changes(connection, tenant_id, rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_sync_changes(session: Session) -> None:
+    session.info.pop(PENDING_KEY, None)
+
+
+def record_changes(connection, tenant_id: str, rows: list[dict]) -> None:
+    if not rows:
+        return
+    table = models.TenantChangeSeq.__table__
+    stmt = SEQ_DIALECTS[connection.dialect.name](table).values(tenant_id=tenant_id, seq=len(rows))
+    head = connection.execute(
+        stmt.on_conflict_do_update(index_elements=[table.c.tenant_id], set_={"seq": table.c.seq + len(rows)})
+        .returning(table.c.seq)
+    ).scalar_one()
+    first = head - len(rows) + 1
+    now = datetime.utcnow()
+    connection.execute(
+        insert(models.SyncChange.__table__),
+        [
+            {**row, "id": str(uuid.uuid4()), "tenant_id": tenant_id, "seq": first + idx, "created_at": now}
+            for idx, row in enumerate(rows)
+        ],
+    )
+
+
+def current_seq(db: Session, tenant_id: str) -> int:
+    head = (
+        db.query(models.TenantChangeSeq.seq)
+        .filter(models.TenantChangeSeq.tenant_id == tenant_id)
+        .scalar()
+    )
+    return head or 0
+
+
+def fetch_changes(
+    db: Session,
+    tenant_id: str,
+    cursor: int,
+    head: int,
+    limit: int,
+    client_ids: Optional[list[str]] = None,
+    assigned_user_id: Optional[str] = None,
+) -> list[models.SyncChange]:
+    query = db.query(models.SyncChange).filter(
+        models.SyncChange.tenant_id == tenant_id,
+        models.SyncChange.seq > cursor,
+        models.SyncChange.seq <= head,
+    )
+    if client_ids:
+        query = query.filter(models.SyncChange.client_id.in_(client_ids))
+    if assigned_user_id:
+        query = query.filter(
+            or_(
+                models.SyncChange.assigned_user_id.is_(None),
+                models.SyncChange.assigned_user_id == assigned_user_id,
+            )
+        )
+    return query.order_by(models.SyncChange.seq.asc()).limit(limit).all()
@@ -0,0 +1,31 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from typing import BinaryIO
+
+from PIL import Image
+
+THUMBNAIL_MAX_PX = 600
+
+
+@lru_cache(maxsize=1)
+def get_thumbnail_executor() -> ThreadPoolExecutor:
+    workers = int(os.getenv("THUMBNAIL_WORKERS", "2"))
+    return ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="thumbnail")
+
+
+def make_thumbnail(file_obj: BinaryIO, max_px: int = THUMBNAIL_MAX_PX) -> bytes:
+    file_obj.seek(0)
+    with Image.open(file_obj) as image:
+        if image.format == "JPEG":
+            image.draft("RGB", (max_px, max_px))
+        image.thumbnail((max_px, max_px))
+        thumb = image.convert("RGB")
+    out = BytesIO()
+    thumb.save(out, format="JPEG", quality=82)
+    return out.getvalue()
+
+
+def render_thumbnail(file_obj: BinaryIO, max_px: int = THUMBNAIL_MAX_PX) -> bytes:
+    return get_thumbnail_executor().submit(make_thumbnail, file_obj, max_px).result()
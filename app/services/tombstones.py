@@ -0,0 +1,35 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+TOMBSTONE_ENTITIES = {
+    models.Client: "clients",
+    models.Site: "sites",
+    models.Asset: "assets",
+}
+
+
+@event.listens_for(Session, "after_flush")
+def _record_deletions(session: Session, flush_context) -> None:
+    rows = [
+        {"tenant_id": obj.tenant_id, "entity": TOMBSTONE_ENTITIES[type(obj)], "record_id": obj.id}
+        for obj in session.deleted
+        if type(obj) in TOMBSTONE_ENTITIES
+    ]
+    if rows:
+        record_tombstones(session.connection(), rows)
+
+
+def record_tombstones(connection, rows: list[dict]) -> None:
+    """Para exclusoes em Core, que nao passam pelo after_flush."""
+    if not rows:
+        return
+    now = datetime.utcnow()
+    connection.execute(
+        insert(models.Tombstone.__table__),
+        [{**row, "id": str(uuid.uuid4()), "deleted_at": now} for row in rows],
+    )
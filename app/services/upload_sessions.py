@@ -0,0 +1,191 @@
+import hashlib
+import logging
+import os
+import pathlib
+import uuid
+from typing import AsyncIterator, BinaryIO, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.db import models
+from app.services.attachment_blobs import blob_object_names
+from app.services.storage import (
+    UPLOAD_CHUNK_SIZE,
+    delete_object,
+    generate_upload_url,
+    move_object,
+    object_exists,
+    open_object,
+    upload_bytes,
+    upload_stream,
+)
+from app.services.thumbnails import get_thumbnail_executor, make_thumbnail
+
+logger = logging.getLogger("eagl.upload_sessions")
+
+MIME_SIGNATURES = {
+    "image/jpeg": (b"\xff\xd8\xff",),
+    "image/png": (b"\x89PNG\r\n\x1a\n",),
+    "image/webp": (b"RIFF",),
+    "application/pdf": (b"%PDF-",),
+}
+
+
+class UploadVerificationError(Exception):
+    pass
+
+
+class UploadMissingError(UploadVerificationError):
+    pass
+
+
+def session_ttl_minutes() -> int:
+    return int(os.getenv("UPLOAD_SESSION_TTL_MINUTES", "15"))
+
+
+def sniff_mime(head: bytes) -> Optional[str]:
+    for mime, prefixes in MIME_SIGNATURES.items():
+        if any(head.startswith(prefix) for prefix in prefixes):
+            if mime == "image/webp" and head[8:12] != b"WEBP":
+                continue
+            return mime
+    return None
+
+
+def verify_upload(file_obj: BinaryIO, expected_size: int, expected_sha256: str, mime: str) -> None:
+    hasher = hashlib.sha256()
+    total = 0
+    head = b""
+    while True:
+        chunk = file_obj.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if not head:
+            head = chunk[:16]
+        total += len(chunk)
+        if total > expected_size:
+            raise UploadVerificationError("Tamanho do arquivo difere do informado.")
+        hasher.update(chunk)
+    if total != expected_size:
+        raise UploadVerificationError("Tamanho do arquivo difere do informado.")
+    if hasher.hexdigest() != expected_sha256:
+        raise UploadVerificationError("Hash do arquivo difere do informado.")
+    if sniff_mime(head) != mime:
+        raise UploadVerificationError("Tipo do arquivo difere do informado.")
+
+
+class GcsUploadBackend:
+    is_local = False
+
+    def staging_name(self, session: models.UploadSession) -> str:
+        return f"uploads/{session.tenant_id}/{session.id}"
+
+    def upload_url(self, session: models.UploadSession, token: str, base_url: str) -> str:
+        return generate_upload_url(session.staging_object, session.mime, session_ttl_minutes())
+
+    def open(self, session: models.UploadSession) -> BinaryIO:
+        # O leitor do GCS so busca o objeto na primeira leitura; sem esta checagem o NotFound escaparia.
+        if not object_exists(session.staging_object):
+            raise UploadMissingError("Arquivo nao enviado.")
+        return open_object(session.staging_object)
+
+    def publish(self, session: models.UploadSession, object_name: str) -> None:
+        move_object(session.staging_object, object_name)
+
+    def discard(self, session: models.UploadSession) -> None:
+        try:
+            delete_object(session.staging_object)
+        except Exception:
+            logger.warning("upload session staging delete failed session=%s", session.id)
+
+
+class LocalUploadBackend:
+    is_local = True
+
+    def __init__(self) -> None:
+        self.base_dir = pathlib.Path(os.getenv("LOCAL_STORAGE_DIR", "storage")).resolve() / "upload_sessions"
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+
+    def staging_name(self, session: models.UploadSession) -> str:
+        return session.id
+
+    def _path(self, session: models.UploadSession) -> pathlib.Path:
+        return self.base_dir / session.staging_object
+
+    def upload_url(self, session: models.UploadSession, token: str, base_url: str) -> str:
+        return f"{base_url.rstrip('/')}/api/upload-sessions/{session.id}/content?token={token}"
+
+    async def write(self, session: models.UploadSession, chunks: AsyncIterator[bytes]) -> int:
+        """Cada PUT grava no seu proprio `.part`, fora do event loop; o ultimo a terminar substitui o staging."""
+        total = 0
+        path = self._path(session)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.part")
+        handle = await run_in_threadpool(open, tmp_path, "wb")
+        try:
+            async for chunk in chunks:
+                total += len(chunk)
+                if total > session.expected_size:
+                    raise UploadVerificationError("Tamanho do arquivo difere do informado.")
+                await run_in_threadpool(handle.write, chunk)
+            await run_in_threadpool(handle.close)
+            await run_in_threadpool(os.replace, tmp_path, path)
+        except BaseException:
+            handle.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return total
+
+    def open(self, session: models.UploadSession) -> BinaryIO:
+        path = self._path(session)
+        if not path.exists():
+            raise UploadMissingError("Arquivo nao enviado.")
+        return open(path, "rb")
+
+    def publish(self, session: models.UploadSession, object_name: str) -> None:
+        with open(self._path(session), "rb") as handle:
+            upload_stream(handle, object_name, content_type=session.mime)
+        self.discard(session)
+
+    def discard(self, session: models.UploadSession) -> None:
+        self._path(session).unlink(missing_ok=True)
+
+
+def get_upload_backend():
+    if os.getenv("LOCAL_STORAGE", "0") == "1":
+        return LocalUploadBackend()
+    return GcsUploadBackend()
+
+
+def build_blob_thumbnail(blob_id: str) -> None:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        blob = db.query(models.AttachmentBlob).filter(models.AttachmentBlob.id == blob_id).first()
+        if not blob or blob.thumb_object_name:
+            return
+        with open_object(blob.object_name) as handle:
+            thumb_data = make_thumbnail(handle)
+        _, thumb_name = blob_object_names(blob.tenant_id, blob.sha256)
+        upload_bytes(thumb_data, thumb_name, content_type="image/jpeg")
+        blob.thumb_object_name = thumb_name
+        attachments = (
+            db.query(models.WorkOrderAttachment)
+            .filter(
+                models.WorkOrderAttachment.url == blob.object_name,
+                models.WorkOrderAttachment.thumb_url.is_(None),
+            )
+            .all()
+        )
+        for attachment in attachments:
+            attachment.thumb_url = thumb_name
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("thumbnail generation failed blob=%s", blob_id)
+    finally:
+        db.close()
+
+
+def schedule_thumbnail(blob_id: str) -> None:
+    get_thumbnail_executor().submit(build_blob_thumbnail, blob_id)
@@ -0,0 +1,140 @@
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.services.sync_log import record_changes
+from app.services.work_order_search import refresh_search_documents
+
+logger = logging.getLogger("eagl.work_order_bulk")
+
+ORDER_FIELDS = (
+    "client_id",
+    "contract_id",
+    "site_id",
+    "asset_id",
+    "responsible_user_id",
+    "assigned_user_id",
+    "code_human",
+    "title",
+    "description",
+    "type",
+    "priority",
+    "scheduled_start",
+    "scheduled_end",
+    "sla_due_at",
+)
+
+
+def _chunk_size() -> int:
+    return max(1, int(os.getenv("WORK_ORDER_BULK_CHUNK_SIZE", "200")))
+
+
+def _existing_ids(db: Session, model, tenant_id: str, ids: set[str]) -> set[str]:
+    found: set[str] = set()
+    ids = list(ids)
+    for start in range(0, len(ids), 500):
+        rows = db.query(model.id).filter(model.tenant_id == tenant_id, model.id.in_(ids[start : start + 500]))
+        found.update(row[0] for row in rows)
+    return found
+
+
+def checklist_template(questionnaire: models.Questionnaire) -> list[dict]:
+    return [
+        {
+            "question_text": item.question_text,
+            "answer_type": item.answer_type,
+            "required": bool(item.required),
+            "order_index": item.order_index,
+        }
+        for item in sorted(questionnaire.items, key=lambda item: (item.order_index, item.created_at))
+    ]
+
+
+def validate_rows(
+    db: Session,
+    tenant_id: str,
+    rows: list[dict],
+    allowed_client_ids: Optional[list[str]] = None,
+) -> dict[int, str]:
+    references = {
+        "client_id": (models.Client, "Cliente nao encontrado"),
+        "site_id": (models.Site, "Unidade nao encontrada"),
+        "asset_id": (models.Asset, "Ativo nao encontrado"),
+    }
+    known = {
+        field: _existing_ids(db, model, tenant_id, {row[field] for row in rows if row.get(field)})
+        for field, (model, _) in references.items()
+    }
+    errors: dict[int, str] = {}
+    for idx, row in enumerate(rows):
+        if not row.get("title"):
+            errors[idx] = "Titulo obrigatorio"
+        elif allowed_client_ids and row.get("client_id") not in allowed_client_ids:
+            errors[idx] = "Cliente fora do escopo"
+        elif row.get("scheduled_start") and row.get("scheduled_end") and row["scheduled_end"] < row["scheduled_start"]:
+            errors[idx] = "Fim agendado anterior ao inicio"
+        else:
+            for field, (_, message) in references.items():
+                if row.get(field) and row[field] not in known[field]:
+                    errors[idx] = message
+                    break
+    return errors
+
+
+def create_work_orders_bulk(
+    db: Session,
+    tenant_id: str,
+    rows: list[dict],
+    checklist: list[dict],
+    errors: dict[int, str],
+) -> list[dict]:
+    created: list[dict] = []
+    valid = [(idx, row) for idx, row in enumerate(rows) if idx not in errors]
+    chunk_size = _chunk_size()
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start : start + chunk_size]
+        now = datetime.utcnow()
+        orders, items, changes = [], [], []
+        for idx, row in chunk:
+            order_id = str(uuid.uuid4())
+            orders.append(
+                {
+                    **{field: row.get(field) for field in ORDER_FIELDS},
+                    "id": order_id,
+                    "tenant_id": tenant_id,
+                    "status": row.get("status") or "aberta",
+                    "sla_breached": False,
+                    "completion_percent": 0,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+            scope = {"client_id": row.get("client_id"), "assigned_user_id": row.get("assigned_user_id")}
+            changes.append({"entity": "work_order", "entity_id": order_id, "work_order_id": order_id, "op": "upsert", **scope})
+            for template in checklist:
+                item_id = str(uuid.uuid4())
+                items.append({**template, "id": item_id, "work_order_id": order_id, "created_at": now})
+                changes.append({"entity": "item", "entity_id": item_id, "work_order_id": order_id, "op": "upsert", **scope})
+        try:
+            connection = db.connection()
+            connection.execute(insert(models.WorkOrder.__table__), orders)
+            if items:
+                connection.execute(insert(models.WorkOrderItem.__table__), items)
+            record_changes(connection, tenant_id, changes)
+            refresh_search_documents(connection, [order["id"] for order in orders])
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            logger.exception("Falha ao gravar lote de OS tenant=%s", tenant_id)
+            for idx, _ in chunk:
+                errors[idx] = "Falha ao gravar lote"
+            continue
+        created.extend({"row": idx, "id": order["id"]} for (idx, _), order in zip(chunk, orders))
+    return created
@@ -0,0 +1,165 @@
+import base64
+import json
+import re
+from typing import Optional
+
+from sqlalchemy import bindparam, delete, event, insert, inspect, select, text
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+SEARCH_FIELDS = ("code_human", "title", "description", "materials", "conclusion")
+ITEM_FIELDS = ("answer_value", "note")
+TS_CONFIG = "portuguese"
+
+SQLITE_SCHEMA = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS work_order_fts USING fts5("
+    "document, content='work_order_search', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS work_order_search_ai AFTER INSERT ON work_order_search BEGIN "
+    "INSERT INTO work_order_fts(rowid, document) VALUES (new.id, new.document); END",
+    "CREATE TRIGGER IF NOT EXISTS work_order_search_ad AFTER DELETE ON work_order_search BEGIN "
+    "INSERT INTO work_order_fts(work_order_fts, rowid, document) VALUES ('delete', old.id, old.document); END",
+    "CREATE TRIGGER IF NOT EXISTS work_order_search_au AFTER UPDATE ON work_order_search BEGIN "
+    "INSERT INTO work_order_fts(work_order_fts, rowid, document) VALUES ('delete', old.id, old.document); "
+    "INSERT INTO work_order_fts(rowid, document) VALUES (new.id, new.document); END",
+]
+POSTGRES_SCHEMA = [
+    "ALTER TABLE work_order_search ADD COLUMN IF NOT EXISTS document_tsv tsvector "
+    f"GENERATED ALWAYS AS (to_tsvector('{TS_CONFIG}', coalesce(document, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_work_order_search_document_tsv ON work_order_search USING GIN (document_tsv)",
+]
+
+
+def ensure_search_schema(engine) -> None:
+    statements = {"sqlite": SQLITE_SCHEMA, "postgresql": POSTGRES_SCHEMA}.get(engine.dialect.name)
+    if not statements:
+        return
+    with engine.begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+        indexed = connection.execute(select(models.WorkOrderSearch.id).limit(1)).first()
+        if not indexed:
+            rows = connection.execute(select(models.WorkOrder.id)).all()
+            refresh_search_documents(connection, [row[0] for row in rows])
+
+
+def refresh_search_documents(connection, work_order_ids) -> None:
+    ids = list(dict.fromkeys(work_order_ids))
+    if not ids:
+        return
+    table = models.WorkOrderSearch.__table__
+    for start in range(0, len(ids), 500):
+        chunk = ids[start : start + 500]
+        answers: dict[str, list[str]] = {}
+        item_rows = connection.execute(
+            select(models.WorkOrderItem.work_order_id, *(getattr(models.WorkOrderItem, f) for f in ITEM_FIELDS))
+            .where(models.WorkOrderItem.work_order_id.in_(chunk))
+            .order_by(models.WorkOrderItem.order_index)
+        )
+        for work_order_id, *values in item_rows:
+            answers.setdefault(work_order_id, []).extend(value for value in values if value)
+        documents = []
+        work_orders = connection.execute(
+            select(
+                models.WorkOrder.id,
+                models.WorkOrder.tenant_id,
+                models.WorkOrder.client_id,
+                *(getattr(models.WorkOrder, f) for f in SEARCH_FIELDS),
+            ).where(models.WorkOrder.id.in_(chunk))
+        )
+        for work_order_id, tenant_id, client_id, *values in work_orders:
+            parts = [value for value in values if value] + answers.get(work_order_id, [])
+            documents.append(
+                {
+                    "work_order_id": work_order_id,
+                    "tenant_id": tenant_id,
+                    "client_id": client_id,
+                    "document": " ".join(parts),
+                }
+            )
+        connection.execute(delete(table).where(table.c.work_order_id.in_(chunk)))
+        if documents:
+            connection.execute(insert(table), documents)
+
+
+def _changed(obj, fields) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_search_index(session: Session, flush_context) -> None:
+    touched: set[str] = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.WorkOrder):
+            if obj in session.new or obj in session.deleted or _changed(obj, SEARCH_FIELDS + ("client_id",)):
+                touched.add(obj.id)
+        elif isinstance(obj, models.WorkOrderItem):
+            if obj in session.new or obj in session.deleted or _changed(obj, ITEM_FIELDS):
+                touched.add(obj.work_order_id)
+    touched.discard(None)
+    if touched:
+        refresh_search_documents(session.connection(), touched)
+
+
+def _encode_cursor(rank: float, row_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([rank, row_id]).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        rank, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return float(rank), int(row_id)
+    except Exception as exc:
+        raise ValueError("Cursor invalido") from exc
+
+
+def search_tokens(query: str) -> list[str]:
+    return re.findall(r"\w+", query.lower())[:12]
+
+
+def search_work_orders(
+    db: Session,
+    tenant_id: str,
+    query: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    client_ids: Optional[list[str]] = None,
+) -> tuple[list[str], Optional[str]]:
+    tokens = search_tokens(query)
+    if not tokens:
+        return [], None
+    dialect = db.get_bind().dialect.name
+    params: dict = {"tenant_id": tenant_id, "limit": limit + 1}
+    filters = ["s.tenant_id = :tenant_id"]
+    if client_ids:
+        filters.append("s.client_id IN :client_ids")
+        params["client_ids"] = list(client_ids)
+    if dialect == "postgresql":
+        rank_expr = "-ts_rank_cd(s.document_tsv, to_tsquery(:ts_config, :match))"
+        source = "work_order_search s"
+        filters.append("s.document_tsv @@ to_tsquery(:ts_config, :match)")
+        params["match"] = " & ".join(f"{token}:*" for token in tokens)
+        params["ts_config"] = TS_CONFIG
+    else:
+        rank_expr = "bm25(work_order_fts)"
+        source = "work_order_fts JOIN work_order_search s ON s.id = work_order_fts.rowid"
+        filters.append("work_order_fts MATCH :match")
+        params["match"] = " ".join(f'"{token}"*' for token in tokens)
+    if cursor:
+        params["cursor_rank"], params["cursor_id"] = _decode_cursor(cursor)
+        filters.append(
+            f"({rank_expr} > :cursor_rank OR ({rank_expr} = :cursor_rank AND s.id > :cursor_id))"
+        )
+    statement = text(
+        f"SELECT s.work_order_id, {rank_expr} AS rank, s.id FROM {source} "
+        f"WHERE {' AND '.join(filters)} ORDER BY rank, s.id LIMIT :limit"
+    )
+    if client_ids:
+        statement = statement.bindparams(bindparam("client_ids", expanding=True))
+    rows = db.execute(statement, params).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1][1], rows[-1][2])
+    return [row[0] for row in rows], next_cursor
@@ -0,0 +1,125 @@
+import argparse
+import importlib
+import logging
+import os
+import signal
+import threading
+from typing import Callable, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.services import job_queue
+
+logger = logging.getLogger("eagl.worker")
+
+# Modulos que registram tasks com `register_task`; novas filas (PDF, geocodificacao) entram aqui.
+TASK_MODULES = ("app.bulk.tasks",)
+
+
+def load_tasks() -> None:
+    for module in TASK_MODULES:
+        importlib.import_module(module)
+
+
+def _heartbeat(session_factory: Callable[[], Session], job_id: str, queue: str, worker_id: str, done: threading.Event) -> None:
+    interval = max(1, job_queue.visibility_seconds(queue) // 3)
+    while not done.wait(interval):
+        try:
+            with session_factory() as db:
+                if not job_queue.extend(db, job_id, worker_id, queue):
+                    return
+        except Exception:
+            logger.exception("Falha no heartbeat do job %s", job_id)
+
+
+def work_once(session_factory: Callable[[], Session], queues: Sequence[str], worker_id: str) -> bool:
+    """Atende um job da primeira fila com vaga; False quando nenhuma fila tem trabalho."""
+    with session_factory() as db:
+        for queue in queues:
+            job = job_queue.claim(db, queue, worker_id)
+            if not job:
+                continue
+            job_id, task = job.id, job.task
+            done = threading.Event()
+            heartbeat = threading.Thread(
+                target=_heartbeat,
+                args=(session_factory, job_id, queue, worker_id, done),
+                name=f"job-heartbeat-{job_id[:8]}",
+                daemon=True,
+            )
+            heartbeat.start()
+            try:
+                status = job_queue.run_claimed(db, job, worker_id)
+            finally:
+                done.set()
+            logger.info("Job queue=%s task=%s id=%s status=%s", queue, task, job_id, status)
+            return True
+    return False
+
+
+def _loop(
+    session_factory: Callable[[], Session],
+    queues: Sequence[str],
+    stop: threading.Event,
+    poll_seconds: float,
+    burst: bool,
+) -> None:
+    worker_id = job_queue.new_worker_id()
+    while not stop.is_set():
+        try:
+            worked = work_once(session_factory, queues, worker_id)
+        except Exception:
+            logger.exception("Falha no worker %s", worker_id)
+            worked = False
+        if not worked:
+            if burst:
+                return
+            stop.wait(poll_seconds)
+
+
+def run_worker(
+    session_factory: Callable[[], Session],
+    queues: Sequence[str],
+    threads: int = 1,
+    poll_seconds: float = 2.0,
+    burst: bool = False,
+    stop: Optional[threading.Event] = None,
+) -> None:
+    load_tasks()
+    stop = stop or threading.Event()
+    workers: List[threading.Thread] = [
+        threading.Thread(
+            target=_loop,
+            args=(session_factory, queues, stop, poll_seconds, burst),
+            name=f"job-worker-{index}",
+        )
+        for index in range(max(1, threads))
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Worker da fila de jobs no banco")
+    parser.add_argument("--queues", default=os.getenv("JOB_WORKER_QUEUES", "bulk"), help="filas separadas por virgula")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("JOB_WORKER_THREADS", "1")))
+    parser.add_argument("--poll-seconds", type=float, default=float(os.getenv("JOB_WORKER_POLL_SECONDS", "2")))
+    parser.add_argument("--burst", action="store_true", help="encerra quando as filas esvaziarem")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    from app.db.session import SessionLocal
+
+    stop = threading.Event()
+    # Jobs em andamento terminam; o proximo claim nao acontece.
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    queues = [queue.strip() for queue in args.queues.split(",") if queue.strip()]
+    logger.info("Worker iniciado filas=%s threads=%s", queues, args.threads)
+    run_worker(SessionLocal, queues, args.threads, args.poll_seconds, args.burst, stop)
+
+
+if __name__ == "__main__":
+    main()
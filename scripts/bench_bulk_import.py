@@ -0,0 +1,114 @@
+import csv
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+ROWS = int(os.getenv("BENCH_ROWS", "100000"))
+CLIENTS = int(os.getenv("BENCH_CLIENTS", "1000"))
+SITES = int(os.getenv("BENCH_SITES", "5000"))
+EXISTING = int(os.getenv("BENCH_EXISTING_ASSETS", "20000"))
+FORMAT = os.getenv("BENCH_FORMAT", "csv")
+
+
+def main() -> None:
+    workdir = tempfile.mkdtemp(prefix="bench-bulk-import-")
+    os.environ["LOCAL_STORAGE"] = "1"
+    os.environ["LOCAL_STORAGE_DIR"] = os.path.join(workdir, "storage")
+
+    from sqlalchemy import create_engine, event, insert
+    from sqlalchemy.orm import sessionmaker
+
+    from app.bulk.importer import run_job, validate_job
+    from app.bulk.storage import StorageClient
+    from app.db import models
+
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    models.Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    tenant = models.Tenant(name="Bench", status="ATIVO", tenant_type="MSP", timezone="America/Sao_Paulo")
+    db.add(tenant)
+    db.commit()
+
+    clients = [
+        {"id": str(uuid.uuid4()), "tenant_id": tenant.id, "name": f"Cliente {i}", "document": f"{i:014d}", "status": "active"}
+        for i in range(CLIENTS)
+    ]
+    sites = [
+        {"id": str(uuid.uuid4()), "tenant_id": tenant.id, "code": f"S{i:05d}", "name": f"Site {i}", "status": "ATIVO"}
+        for i in range(SITES)
+    ]
+    assets = [
+        {"id": str(uuid.uuid4()), "tenant_id": tenant.id, "tag": f"TAG{i:07d}", "name": f"Ativo {i}"}
+        for i in range(EXISTING)
+    ]
+    with engine.begin() as connection:
+        connection.execute(insert(models.Client.__table__), clients)
+        connection.execute(insert(models.Site.__table__), sites)
+        connection.execute(insert(models.Asset.__table__), assets)
+
+    header = ["Tag", "Nome", "Tipo", "CNPJ do cliente", "Codigo do site"]
+    rows = ([f"TAG{i:07d}", f"Ativo {i}", "HVAC", f"{i % CLIENTS:014d}", f"S{i % SITES:05d}"] for i in range(ROWS))
+    path = os.path.join(workdir, f"assets.{FORMAT}")
+    if FORMAT == "xlsx":
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(header)
+        for row in rows:
+            ws.append(row)
+        wb.save(path)
+        content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    else:
+        with open(path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(header)
+            writer.writerows(rows)
+        content_type = "text/csv"
+    with open(path, "rb") as handle:
+        file_url = StorageClient().upload_bytes(handle.read(), f"bench/assets.{FORMAT}", content_type)
+
+    job = models.ImportJob(
+        tenant_id=tenant.id,
+        entity="assets",
+        mode="upsert",
+        status="queued",
+        file_url=file_url,
+        file_name=f"assets.{FORMAT}",
+        file_size=os.path.getsize(path),
+        file_hash=uuid.uuid4().hex,
+        template_version="v1",
+    )
+    db.add(job)
+    db.commit()
+
+    queries = [0]
+    event.listen(engine, "before_cursor_execute", lambda *args: queries.__setitem__(0, queries[0] + 1))
+
+    start = time.perf_counter()
+    preview = validate_job(db, job)
+    validate_s = time.perf_counter() - start
+    validate_queries = queries[0]
+    print(
+        f"validate rows={ROWS} seconds={validate_s:.2f} rows_per_s={ROWS / validate_s:,.0f} "
+        f"queries={validate_queries} created={preview['created']} updated={preview['updated']} errors={preview['errors']}"
+    )
+
+    job.status = "queued"
+    db.commit()
+    queries[0] = 0
+    start = time.perf_counter()
+    summary = run_job(db, job)
+    run_s = time.perf_counter() - start
+    print(
+        f"apply rows={ROWS} seconds={run_s:.2f} rows_per_s={ROWS / run_s:,.0f} "
+        f"queries={queries[0]} created={summary['created']} updated={summary['updated']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import httpx
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+PHOTOS = int(os.getenv("BENCH_PHOTOS", "100"))
+LATENCY_MS = int(os.getenv("BENCH_LATENCY_MS", "60"))
+
+
+def _make_photo() -> bytes:
+    image = Image.effect_noise((4000, 3000), 64).convert("RGB")
+    out = BytesIO()
+    image.save(out, format="JPEG", quality=90)
+    return out.getvalue()
+
+
+def _serve(photo: bytes) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(LATENCY_MS / 1000)
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(photo)))
+            self.end_headers()
+            self.wfile.write(photo)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    os.environ["PDF_IMAGE_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench-pdf-images-")
+    from app.services.pdf_images import collect_image_urls, prefetch_images
+
+    photo = _make_photo()
+    server = _serve(photo)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    payload = {
+        "answers": [
+            {"photos": [f"{base}/work_orders/os/QUESTION/{idx}.jpg?X-Goog-Signature={idx}"]} for idx in range(PHOTOS)
+        ]
+    }
+    urls = collect_image_urls(payload)
+    print(f"{PHOTOS} fotos de {len(photo) / 1024 / 1024:.1f} MB, latencia {LATENCY_MS} ms")
+
+    start = time.perf_counter()
+    with httpx.Client() as client:
+        for url in urls:
+            Image.open(BytesIO(client.get(url).content)).load()
+    serial = time.perf_counter() - start
+    print(f"serial (resolucao cheia): {serial:.2f}s")
+
+    start = time.perf_counter()
+    cold = prefetch_images(urls)
+    cold_time = time.perf_counter() - start
+    size = sum(len(data) for data, _ in cold.values())
+    print(f"prefetch (cache frio):    {cold_time:.2f}s  {size / 1024 / 1024:.1f} MB entregues ao WeasyPrint")
+
+    start = time.perf_counter()
+    prefetch_images(urls)
+    print(f"prefetch (cache quente):  {time.perf_counter() - start:.2f}s")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import uuid
 
 import pytest
 from sqlalchemy import create_engine
@@ -19,3 +20,30 @@ def db_session(tmp_path, monkeypatch):
     db.close()
     os.environ.pop("LOCAL_STORAGE", None)
     os.environ.pop("LOCAL_STORAGE_DIR", None)
+
+
+@pytest.fixture()
+def tenant_admin(db_session):
+    tenant = models.Tenant(name="Tenant", status="ATIVO", tenant_type="MSP", timezone="America/Sao_Paulo")
+    db_session.add(tenant)
+    db_session.commit()
+    admin = models.User(
+        tenant_id=tenant.id,
+        name="Admin",
+        login="admin",
+        email="admin@example.com",
+        password_hash="x",
+        role="TENANT_ADMIN",
+        status="active",
+    )
+    db_session.add(admin)
+    db_session.commit()
+    return admin
+
+
+@pytest.fixture()
+def work_order(db_session, tenant_admin):
+    os = models.WorkOrder(id=str(uuid.uuid4()), tenant_id=tenant_admin.tenant_id, title="Corretiva", status="aberta")
+    db_session.add(os)
+    db_session.commit()
+    return os
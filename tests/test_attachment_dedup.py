@@ -0,0 +1,106 @@
+import hashlib
+from io import BytesIO
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+from starlette.datastructures import Headers
+
+from app.api.v1 import work_orders
+from app.db import models
+
+
+def _photo() -> bytes:
+    out = BytesIO()
+    Image.new("RGB", (800, 600), (0, 90, 200)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+def _upload(data: bytes) -> UploadFile:
+    return UploadFile(file=BytesIO(data), filename="foto.jpg", headers=Headers({"content-type": "image/jpeg"}))
+
+
+def test_duplicate_upload_reuses_blob(db_session, tenant_admin, work_order, monkeypatch):
+    uploads, deleted = [], []
+
+    def _upload_stream(file_obj, name, content_type=None, max_bytes=None):
+        data = file_obj.read()
+        uploads.append(name)
+        return name, len(data), hashlib.sha256(data).hexdigest()
+
+    monkeypatch.setattr(work_orders, "upload_stream", _upload_stream)
+    monkeypatch.setattr(work_orders, "upload_bytes", lambda data, name, content_type=None: uploads.append(name))
+    monkeypatch.setattr(work_orders, "delete_object", deleted.append)
+    monkeypatch.setattr(work_orders, "generate_signed_urls", lambda names, expires_minutes=30: {})
+
+    photo = _photo()
+    digest = hashlib.sha256(photo).hexdigest()
+    assert work_orders.check_attachment_hashes(
+        work_orders.AttachmentHashCheck(hashes=[digest]), current_user=tenant_admin, db=db_session
+    ) == {"existing": []}
+
+    first = work_orders.upload_work_order_attachment(
+        work_order.id,
+        _upload(photo),
+        scope="checkin",
+        question_id=None,
+        item_id=None,
+        current_user=tenant_admin,
+        db=db_session,
+    )
+    assert len(uploads) == 2
+    second = work_orders.upload_work_order_attachment(
+        work_order.id,
+        _upload(photo),
+        scope="checkout",
+        question_id=None,
+        item_id=None,
+        current_user=tenant_admin,
+        db=db_session,
+    )
+    assert len(uploads) == 2
+    assert first["sha256"] == second["sha256"] == digest
+
+    assert work_orders.check_attachment_hashes(
+        work_orders.AttachmentHashCheck(hashes=[digest, "0" * 64]), current_user=tenant_admin, db=db_session
+    ) == {"existing": [digest]}
+    third = work_orders.create_attachment_from_hash(
+        work_order.id,
+        work_orders.AttachmentFromHash(sha256=digest, scope="CHECKIN", file_name="retry.jpg"),
+        current_user=tenant_admin,
+        db=db_session,
+    )
+    assert third["file_name"] == "retry.jpg"
+    blob = db_session.query(models.AttachmentBlob).one()
+    assert blob.ref_count == 3
+
+    with pytest.raises(HTTPException):
+        work_orders.create_attachment_from_hash(
+            work_order.id,
+            work_orders.AttachmentFromHash(sha256="0" * 64, scope="CHECKIN"),
+            current_user=tenant_admin,
+            db=db_session,
+        )
+
+    for payload in (first, second):
+        work_orders.delete_attachment(payload["id"], current_user=tenant_admin, db=db_session)
+    assert deleted == []
+    work_orders.delete_attachment(third["id"], current_user=tenant_admin, db=db_session)
+    assert sorted(deleted) == sorted(uploads)
+    assert db_session.query(models.AttachmentBlob).count() == 0
+
+    deleted.clear()
+    for scope in ("checkin", "checkout"):
+        work_orders.upload_work_order_attachment(
+            work_order.id,
+            _upload(photo),
+            scope=scope,
+            question_id=None,
+            item_id=None,
+            current_user=tenant_admin,
+            db=db_session,
+        )
+    assert db_session.query(models.AttachmentBlob).one().ref_count == 2
+    work_orders.delete_work_order(work_order.id, current_user=tenant_admin, db=db_session)
+    assert db_session.query(models.AttachmentBlob).count() == 0
+    assert len(deleted) == 2
@@ -0,0 +1,72 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from app.services import storage
+from app.services.thumbnails import make_thumbnail, render_thumbnail
+
+
+class _Blob:
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+
+    def open(self, mode, chunk_size=None, content_type=None):
+        blob = self
+
+        class _Writer(BytesIO):
+            def close(self):
+                blob.store[blob.name] = self.getvalue()
+                super().close()
+
+        return _Writer()
+
+    def delete(self):
+        self.store.pop(self.name, None)
+
+
+class _Bucket:
+    def __init__(self, store):
+        self.store = store
+
+    def blob(self, name):
+        return _Blob(self.store, name)
+
+
+class _Client:
+    def __init__(self):
+        self.store = {}
+
+    def bucket(self, name):
+        return _Bucket(self.store)
+
+
+def test_upload_stream_hashes_and_enforces_cap(monkeypatch):
+    client = _Client()
+    monkeypatch.setenv("GCS_BUCKET_OS_ASSETS", "bucket")
+    monkeypatch.setattr(storage, "get_storage_client", lambda: client)
+    data = b"x" * (storage.UPLOAD_CHUNK_SIZE * 2 + 10)
+
+    name, size, digest = storage.upload_stream(BytesIO(data), "a/b.bin")
+    assert name == "a/b.bin"
+    assert size == len(data)
+    assert client.store["a/b.bin"] == data
+    assert len(digest) == 64
+
+    with pytest.raises(storage.StorageError):
+        storage.upload_stream(BytesIO(data), "a/c.bin", max_bytes=storage.UPLOAD_CHUNK_SIZE)
+    assert "a/c.bin" not in client.store
+
+
+def test_thumbnail_from_file_object():
+    source = BytesIO()
+    Image.new("RGB", (4000, 3000), (10, 200, 10)).save(source, format="JPEG")
+
+    thumb = Image.open(BytesIO(make_thumbnail(source)))
+    assert thumb.format == "JPEG"
+    assert max(thumb.size) == 600
+
+    png = BytesIO()
+    Image.new("RGBA", (800, 200)).save(png, format="PNG")
+    assert max(Image.open(BytesIO(render_thumbnail(png, 100))).size) == 100
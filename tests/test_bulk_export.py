@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from openpyxl import load_workbook
+
+from app.bulk.exporter import run_export_job
+from app.bulk.incremental import export_changes
+from app.bulk.templates import export_exceeds
+from app.db import models
+from app.services import tombstones  # noqa: F401
+
+
+def test_export_streams_rows_and_counts(db_session):
+    tenant = models.Tenant(name="Tenant", status="ATIVO", tenant_type="MSP", timezone="America/Sao_Paulo")
+    db_session.add(tenant)
+    db_session.commit()
+    client = models.Client(tenant_id=tenant.id, name="Cliente", document="12345678000199", status="active")
+    site = models.Site(tenant_id=tenant.id, code="S1", name="Site", status="ATIVO")
+    db_session.add_all([client, site])
+    db_session.flush()
+    db_session.add_all(
+        [
+            models.Asset(tenant_id=tenant.id, tag=f"TAG-{idx}", name=f"Ativo {idx}", client_id=client.id, site_id=site.id)
+            for idx in range(25)
+        ]
+    )
+    job = models.ExportJob(tenant_id=tenant.id, entity="assets", status="queued")
+    db_session.add(job)
+    db_session.commit()
+
+    assert export_exceeds(db_session, tenant.id, "assets", 24)
+    assert not export_exceeds(db_session, tenant.id, "assets", 25)
+
+    summary = run_export_job(db_session, job)
+
+    assert summary == {"exported": 25}
+    assert job.status == "completed" and job.file_size > 0 and job.file_hash
+    ws = load_workbook(url2pathname(urlparse(job.file_url).path), read_only=True)["EXPORT"]
+    rows = list(ws.iter_rows(values_only=True))
+    assert rows[0][0] == "Tag"
+    assert len(rows) == 26
+    assert {row[0] for row in rows[1:]} == {f"TAG-{idx}" for idx in range(25)}
+    assert rows[1][4:7] == ("12345678000199", None, "S1")
+
+
+def test_incremental_export_returns_changes_and_tombstones(db_session, monkeypatch):
+    monkeypatch.setenv("BULK_EXPORT_CURSOR_LAG_SECONDS", "0")
+    tenant = models.Tenant(name="Tenant", status="ATIVO", tenant_type="MSP", timezone="America/Sao_Paulo")
+    db_session.add(tenant)
+    db_session.commit()
+    base = datetime.utcnow() - timedelta(minutes=10)
+    sites = [
+        models.Site(tenant_id=tenant.id, code=f"S{idx}", name=f"Site {idx}", created_at=base, updated_at=base + timedelta(seconds=idx % 2))
+        for idx in range(5)
+    ]
+    db_session.add_all(sites)
+    db_session.commit()
+
+    first = export_changes(db_session, tenant.id, "sites", "", 3)
+    second = export_changes(db_session, tenant.id, "sites", first["cursor"], 3)
+    assert first["has_more"] and not second["has_more"]
+    pages = first["rows"] + second["rows"]
+    assert [row["id"] for row in pages] == [site.id for site in sorted(sites, key=lambda site: (site.updated_at, site.id))]
+    assert export_changes(db_session, tenant.id, "sites", second["cursor"], 3)["rows"] == []
+
+    sites[0].name = "Renomeado"
+    db_session.delete(sites[1])
+    db_session.commit()
+    delta = export_changes(db_session, tenant.id, "sites", second["cursor"], 3)
+    assert [(row["id"], row["name"]) for row in delta["rows"]] == [(sites[0].id, "Renomeado")]
+    assert [row["id"] for row in delta["deleted"]] == [sites[1].id]
+    assert export_changes(db_session, tenant.id, "sites", delta["cursor"], 3)["deleted"] == []
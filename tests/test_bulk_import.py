@@ -1,8 +1,10 @@
+import json
 from datetime import datetime
 from io import BytesIO
 
 import pytest
 from openpyxl import Workbook
+from sqlalchemy import event
 
 from app.bulk.importer import ImportValidationError, run_job, validate_job
 from app.bulk.storage import StorageClient
@@ -122,3 +124,364 @@ def test_upsert_client(db_session):
 
     updated = db_session.query(models.Client).filter(models.Client.id == existing.id).first()
     assert updated.name == "Cliente Novo"
+
+
+def test_asset_import_uses_preloaded_lookups(db_session):
+    tenant, user = _seed_tenant_user(db_session)
+    client = models.Client(tenant_id=tenant.id, name="Cliente", document="12345678000199", status="active")
+    site = models.Site(tenant_id=tenant.id, code="SITE01", name="Site", status="ATIVO")
+    db_session.add_all([client, site, models.Asset(tenant_id=tenant.id, tag="TAG-0", name="Antigo")])
+    db_session.commit()
+
+    statements = []
+    engine = db_session.get_bind()
+    listener = lambda *args: statements.append(args[2])
+
+    def _validate(count):
+        rows = [[f"TAG-{idx}", f"Ativo {idx}", "12345678000199", "SITE01"] for idx in range(count)]
+        content = _make_xlsx(["Tag", "Nome", "CNPJ do cliente", "Codigo do site"], rows)
+        job = _create_job(db_session, tenant.id, user.id, "assets", content)
+        job.file_hash = f"hash-{count}"
+        db_session.commit()
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            preview = validate_job(db_session, job)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        return job, preview, len(statements)
+
+    _, small_preview, small_queries = _validate(3)
+    job, preview, queries = _validate(60)
+    assert (small_preview["created"], small_preview["updated"]) == (2, 1)
+    assert (preview["created"], preview["updated"], preview["errors"]) == (59, 1, 0)
+    assert queries == small_queries
+
+    job.status = "queued"
+    db_session.commit()
+    summary = run_job(db_session, job)
+    assert (summary["created"], summary["updated"]) == (59, 1)
+    asset = db_session.query(models.Asset).filter(models.Asset.tag == "TAG-5").one()
+    assert (asset.client_id, asset.site_id) == (client.id, site.id)
+
+
+def test_validate_attributes_errors_per_row(db_session):
+    tenant, user = _seed_tenant_user(db_session)
+    rows = []
+    for i in range(300):
+        if i % 3 == 0:
+            rows.append([f"Cliente {i}", "", str(i + 100)])
+        elif i % 3 == 1:
+            rows.append([f"Cliente {i}", "", ""])
+        else:
+            rows.append([f"Cliente {i}", f"C{i:04d}", ""])
+    content = _make_xlsx(["Nome", "Codigo do cliente", "CNPJ"], rows)
+    job = _create_job(db_session, tenant.id, user.id, "clients", content)
+    preview = validate_job(db_session, job)
+
+    assert preview["created"] == 100
+    assert preview["errors"] == 300
+    errors = db_session.query(models.ImportRowError).filter(models.ImportRowError.import_job_id == job.id).all()
+    by_row = {}
+    for error in errors:
+        by_row.setdefault(error.row_number, []).append(error.message)
+    assert by_row[3] == ["CNPJ invalido"]
+    assert sorted(by_row[4]) == ["Chave unica nao encontrada", "Informe CNPJ ou Codigo do cliente"]
+    assert 5 not in by_row
+
+
+@pytest.mark.parametrize(
+    "mode, expected",
+    [("upsert", (1, 1, 0)), ("create_only", (1, 0, 1)), ("update_only", (0, 1, 1))],
+)
+def test_site_import_native_upsert_modes(db_session, mode, expected):
+    tenant, user = _seed_tenant_user(db_session)
+    account = models.CustomerAccount(tenant_id=tenant.id, name="Conta", cnpj="12345678000199")
+    db_session.add(account)
+    db_session.commit()
+    existing = models.Site(tenant_id=tenant.id, code="S1", name="Antigo", status="INATIVO", address="Rua A")
+    db_session.add(existing)
+    db_session.commit()
+
+    content = _make_xlsx(
+        ["Codigo do site", "Nome", "CNPJ do cliente"],
+        [["S1", "Novo", "12345678000199"], ["S2", "Site 2", "12345678000199"]],
+    )
+    job = _create_job(db_session, tenant.id, user.id, "sites", content)
+    job.mode = mode
+    db_session.commit()
+    summary = run_job(db_session, job)
+    assert (summary["created"], summary["updated"], summary["skipped"]) == expected
+
+    db_session.expire_all()
+    site = db_session.get(models.Site, existing.id)
+    if mode == "create_only":
+        assert site.name == "Antigo"
+    else:
+        assert (site.name, site.status, site.address, site.customer_account_id) == ("Novo", "INATIVO", "Rua A", account.id)
+    created = db_session.query(models.Site).filter(models.Site.code == "S2").one_or_none()
+    assert (created is not None) == (mode != "update_only")
+    if created:
+        assert created.status == "ATIVO"
+
+
+def test_import_parses_file_once(db_session, monkeypatch):
+    from app.bulk import spool
+
+    tenant, user = _seed_tenant_user(db_session)
+    content = _make_xlsx(
+        ["Nome", "CNPJ"],
+        [["Cliente A", "12.345.678/0001-99"], ["Cliente B", "123"]],
+    )
+    job = _create_job(db_session, tenant.id, user.id, "clients", content)
+    calls = []
+    original = spool.iter_rows
+    monkeypatch.setattr(spool, "iter_rows", lambda path: calls.append(path) or original(path))
+
+    preview = validate_job(db_session, job)
+    assert preview["errors"] == 1 and job.error_report_url
+    job.status = "queued"
+    db_session.commit()
+    run_job(db_session, job)
+
+    assert len(calls) == 1
+    client = db_session.query(models.Client).filter(models.Client.name == "Cliente A").one()
+    assert client.document == "12345678000199"
+
+
+def test_parallel_validation_matches_serial(db_session, monkeypatch):
+    from app.bulk import importer
+
+    tenant, user = _seed_tenant_user(db_session)
+    reported = []
+    monkeypatch.setattr(importer, "generate_error_report", lambda storage, job, pipeline, errors: reported.append(errors) or "")
+    rows = []
+    for i in range(120):
+        document = "" if i % 4 == 1 else str(i) if i % 4 == 0 else f"{i % 30:014d}"
+        rows.append([f"Cliente {i}", "", document])
+    content = _make_xlsx(["Nome", "Codigo do cliente", "CNPJ"], rows)
+
+    def _errors(workers, file_hash):
+        monkeypatch.setenv("BULK_VALIDATION_WORKERS", str(workers))
+        monkeypatch.setenv("BULK_VALIDATION_CHUNK_SIZE", "7")
+        job = _create_job(db_session, tenant.id, user.id, "clients", content)
+        job.file_hash = file_hash
+        db_session.commit()
+        preview = validate_job(db_session, job)
+        return preview, [(e["row_number"], e["field"], e["message"]) for e in reported.pop()]
+
+    serial = _errors(1, "serial")
+    parallel = _errors(2, "parallel")
+    assert serial[1] and serial == parallel
+
+
+def test_progress_tracker_throttles_writes(monkeypatch):
+    from app.bulk.progress import ProgressTracker
+
+    monkeypatch.setenv("BULK_PROGRESS_ROWS", "100")
+    monkeypatch.setenv("BULK_PROGRESS_INTERVAL_SECONDS", "5")
+    now = [0.0]
+    commits = []
+
+    class _Db:
+        def commit(self):
+            commits.append(dict(job.progress_json))
+
+    job = models.ImportJob()
+    tracker = ProgressTracker(_Db(), job, clock=lambda: now[0])
+    tracker.start("applying", total=1000)
+    for _ in range(250):
+        now[0] += 0.01
+        tracker.advance()
+    now[0] += 5
+    tracker.advance()
+
+    assert [c["rows_processed"] for c in commits] == [0, 100, 200, 251]
+    assert commits[-1]["rows_per_second"] == round(251 / now[0], 1)
+    assert commits[-1]["eta_seconds"] == round((1000 - 251) / (251 / now[0]))
+
+
+def test_import_progress_is_exposed(db_session, monkeypatch):
+    import asyncio
+
+    from fastapi import Request
+    from sqlalchemy.orm import sessionmaker
+
+    from app.api.v1 import bulk as bulk_api
+    from app.db import session as db_module
+
+    tenant, user = _seed_tenant_user(db_session)
+    content = _make_xlsx(["Nome", "CNPJ"], [[f"Cliente {i}", f"{i:014d}"] for i in range(30)])
+    job = _create_job(db_session, tenant.id, user.id, "clients", content)
+    validate_job(db_session, job)
+    job.status = "queued"
+    db_session.commit()
+    run_job(db_session, job)
+    assert job.progress_json["phase"] == "applying"
+    assert job.progress_json["rows_processed"] == job.progress_json["rows_total"] == 30
+
+    monkeypatch.setattr(db_module, "SessionLocal", sessionmaker(bind=db_session.get_bind()))
+
+    async def _inline(func, *args):
+        return func(*args)
+
+    # SQLite em memoria: cada thread teria sua propria base.
+    monkeypatch.setattr(bulk_api, "run_in_threadpool", _inline)
+
+    async def _collect():
+        response = await bulk_api.stream_import_progress(job.id, Request({"type": "http"}), current_user=user)
+        return [chunk async for chunk in response.body_iterator]
+
+    events = asyncio.run(_collect())
+    assert len(events) == 1 and events[0].startswith("event: progress\ndata: ")
+    payload = json.loads(events[0].split("data: ", 1)[1])
+    assert payload["status"] == "completed" and payload["progress"]["rows_total"] == 30
+
+
+def test_run_job_resumes_from_checkpoint(db_session, monkeypatch):
+    from datetime import timedelta
+
+    from app.bulk import importer
+    from app.bulk.lease import ImportLeaseError, acquire_lease
+
+    tenant, user = _seed_tenant_user(db_session)
+    content = _make_xlsx(["Nome", "CNPJ"], [[f"Cliente {i}", f"{i:014d}"] for i in range(10)])
+    job = _create_job(db_session, tenant.id, user.id, "clients", content)
+    validate_job(db_session, job)
+    job.status = "queued"
+    db_session.commit()
+
+    monkeypatch.setattr(importer, "CHUNK_SIZE", 4)
+    applied = []
+    crash = [True]
+    original = importer._apply_chunk
+
+    def _apply(db, job, rows, lookups):
+        if crash[0] and len(applied) == 1:
+            raise RuntimeError("worker morreu")
+        applied.append([row["name"] for row in rows])
+        return original(db, job, rows, lookups)
+
+    monkeypatch.setattr(importer, "_apply_chunk", _apply)
+    with pytest.raises(RuntimeError):
+        run_job(db_session, job)
+    assert job.status == "running" and job.lease_owner is None
+    assert job.checkpoint_json == {"row_number": 6, "created": 4, "updated": 0, "skipped": 0}
+    assert db_session.query(models.Client).filter(models.Client.tenant_id == tenant.id).count() == 4
+
+    assert acquire_lease(db_session, job, "outro-worker")
+    with pytest.raises(ImportLeaseError):
+        run_job(db_session, job)
+    job.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db_session.commit()
+
+    crash[0] = False
+    summary = run_job(db_session, job)
+    assert applied[1:] == [[f"Cliente {i}" for i in range(4, 8)], ["Cliente 8", "Cliente 9"]]
+    assert summary["created"] == 10 and job.status == "completed" and job.lease_owner is None
+    assert db_session.query(models.Client).filter(models.Client.tenant_id == tenant.id).count() == 10
+
+
+def test_expired_lease_is_not_renewed(db_session, monkeypatch):
+    from datetime import timedelta
+
+    from app.bulk import incremental
+    from app.bulk.lease import ImportLeaseError, acquire_lease, renew_lease
+
+    tenant, user = _seed_tenant_user(db_session)
+    job = _create_job(db_session, tenant.id, user.id, "clients", _make_xlsx(["Nome", "CNPJ"], []))
+    assert acquire_lease(db_session, job, "w1")
+    renew_lease(db_session, job, "w1")
+    db_session.commit()
+
+    job.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db_session.commit()
+    with pytest.raises(ImportLeaseError):
+        renew_lease(db_session, job, "w1")
+
+    monkeypatch.setenv("BULK_IMPORT_LEASE_SECONDS", "120")
+    monkeypatch.delenv("BULK_EXPORT_CURSOR_LAG_SECONDS", raising=False)
+    assert incremental._lag_seconds() == 120
+
+
+def test_import_loads_lookups_per_chunk(db_session, monkeypatch):
+    from app.bulk import importer
+
+    tenant, user = _seed_tenant_user(db_session)
+    rows = [[f"Cliente {i}", f"{i:014d}"] for i in range(9)] + [["Repetido", f"{1:014d}"]]
+    job = _create_job(db_session, tenant.id, user.id, "clients", _make_xlsx(["Nome", "CNPJ"], rows))
+    monkeypatch.setattr(importer, "VALIDATE_CHUNK_SIZE", 4)
+    monkeypatch.setattr(importer, "CHUNK_SIZE", 4)
+    sizes = []
+    original = importer.load_lookups
+
+    def _load(db, entity, tenant_id, chunk):
+        sizes.append(len(chunk))
+        return original(db, entity, tenant_id, chunk)
+
+    monkeypatch.setattr(importer, "load_lookups", _load)
+    preview = validate_job(db_session, job)
+    assert sizes == [4, 4, 2]
+    assert (preview["created"], preview["errors"]) == (9, 1)
+
+    job.status = "queued"
+    db_session.commit()
+    sizes.clear()
+    summary = run_job(db_session, job)
+    assert sizes == [4, 4, 2]
+    assert (summary["created"], summary["updated"]) == (9, 1)
+    repeated = db_session.query(models.Client).filter(models.Client.document == f"{1:014d}").one()
+    assert repeated.name == "Repetido"
+
+
+def test_confirm_import_runs_through_db_queue(db_session, monkeypatch):
+    from sqlalchemy.orm import sessionmaker
+
+    from app import worker
+    from app.api.v1 import bulk as bulk_api
+    from app.bulk import tasks
+
+    monkeypatch.setattr(tasks, "cloud_tasks_configured", lambda: False)
+    tenant, user = _seed_tenant_user(db_session)
+    content = _make_xlsx(["Nome", "CNPJ"], [[f"Cliente {i}", f"{i:014d}"] for i in range(3)])
+    job = _create_job(db_session, tenant.id, user.id, "clients", content)
+    validate_job(db_session, job)
+
+    assert bulk_api.confirm_import(job.id, db=db_session, current_user=user) == {"status": "queued"}
+    queued = db_session.query(models.QueueJob).one()
+    assert (queued.queue, queued.task, queued.payload_json) == ("bulk", "bulk.import", {"job_id": job.id})
+
+    session_factory = sessionmaker(bind=db_session.get_bind())
+    assert worker.work_once(session_factory, ["bulk"], "w1") is True
+    assert worker.work_once(session_factory, ["bulk"], "w1") is False
+    db_session.refresh(job)
+    db_session.refresh(queued)
+    assert job.status == "completed" and queued.status == "completed"
+    assert db_session.query(models.Client).filter(models.Client.tenant_id == tenant.id).count() == 3
+
+
+def test_site_api_rejects_duplicate_code(db_session):
+    from fastapi import HTTPException
+
+    from app.api.v1 import sites as sites_api
+
+    tenant, user = _seed_tenant_user(db_session)
+    account = models.CustomerAccount(tenant_id=tenant.id, name="Conta")
+    db_session.add(account)
+    db_session.commit()
+
+    def _create(nome, code):
+        payload = sites_api.SiteCreate(nome=nome, code=code, customer_account_id=account.id)
+        return sites_api.create_site(payload, current_user=user, db=db_session)
+
+    first = _create("A", "S1")
+    other = _create("B", "  ")
+    assert other.code is None
+    with pytest.raises(HTTPException) as exc:
+        _create("C", "S1")
+    assert exc.value.status_code == 409
+    with pytest.raises(HTTPException) as exc:
+        sites_api.update_site(other.id, sites_api.SiteUpdate(code="S1"), current_user=user, db=db_session)
+    assert exc.value.status_code == 409
+    same = sites_api.update_site(first.id, sites_api.SiteUpdate(code="S1", nome="A2"), current_user=user, db=db_session)
+    assert same.nome == "A2"
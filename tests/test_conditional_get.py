@@ -0,0 +1,84 @@
+import uuid
+
+from fastapi import Request, Response
+
+from app.api.v1 import os_types, questionnaires, work_orders
+from app.db import models
+
+
+def _request(etag=None):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_work_order_detail_revalidates(db_session, tenant_admin, monkeypatch):
+    monkeypatch.setattr(work_orders, "generate_signed_urls", lambda names, expires_minutes=30: {})
+    os = models.WorkOrder(id=str(uuid.uuid4()), tenant_id=tenant_admin.tenant_id, title="OS")
+    db_session.add(os)
+    db_session.commit()
+
+    def _get(etag=None):
+        response = Response()
+        result = work_orders.get_work_order(
+            os.id, current_user=tenant_admin, db=db_session, request=_request(etag), response=response
+        )
+        return result, response
+
+    body, response = _get()
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"') and body["os"].id == os.id
+    not_modified, _ = _get(etag)
+    assert not_modified.status_code == 304
+
+    db_session.add(
+        models.WorkOrderItem(id=str(uuid.uuid4()), work_order_id=os.id, question_text="Q", answer_type="text")
+    )
+    db_session.commit()
+    changed, response = _get(etag)
+    assert isinstance(changed, dict)
+    assert response.headers["etag"] != etag
+
+    client = models.Client(id=str(uuid.uuid4()), tenant_id=tenant_admin.tenant_id, name="Cliente")
+    db_session.add(client)
+    db_session.commit()
+    os.client_id = client.id
+    db_session.commit()
+    _, response = _get()
+    etag = response.headers["etag"]
+    client.name = "Renomeado"
+    db_session.commit()
+    renamed, response = _get(etag)
+    assert renamed["os"].clienteNome == "Renomeado"
+    assert response.headers["etag"] != etag
+
+
+def test_reference_lists_use_collection_versions(db_session, tenant_admin):
+    response = Response()
+    os_types.list_os_types(client_id=None, current_user=tenant_admin, db=db_session, request=_request(), response=response)
+    etag = response.headers["etag"]
+    cached = os_types.list_os_types(client_id=None, current_user=tenant_admin, db=db_session, request=_request(etag))
+    assert cached.status_code == 304
+
+    db_session.add(models.Questionnaire(id=str(uuid.uuid4()), tenant_id=tenant_admin.tenant_id, title="Checklist"))
+    db_session.commit()
+    cached = os_types.list_os_types(client_id=None, current_user=tenant_admin, db=db_session, request=_request(etag))
+    assert cached.status_code == 304
+
+    db_session.add(models.OSType(id=str(uuid.uuid4()), tenant_id=tenant_admin.tenant_id, name="Preventiva"))
+    db_session.commit()
+    fresh = os_types.list_os_types(client_id=None, current_user=tenant_admin, db=db_session, request=_request(etag))
+    assert len(fresh["items"]) == 1
+
+    response = Response()
+    listed = questionnaires.list_questionnaires(current_user=tenant_admin, db=db_session, response=response)
+    assert len(listed["items"]) == 1
+    assert response.headers["etag"] != etag
+
+
+def test_bump_collection_versions_upserts_missing_key(db_session):
+    from app.services.collection_versions import bump_collection_versions, collection_versions
+
+    connection = db_session.connection()
+    bump_collection_versions(connection, {("tenant-x", "clients")})
+    bump_collection_versions(connection, {("tenant-x", "clients")})
+    assert collection_versions(db_session, "tenant-x", "clients") == (2,)
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+from app.db import models
+from app.services import job_queue
+
+
+def test_claim_limits_concurrency_and_retries_with_backoff(db_session, monkeypatch):
+    monkeypatch.setenv("JOB_QUEUE_TESTE_CONCURRENCY", "1")
+    monkeypatch.setenv("JOB_QUEUE_TESTE_MAX_ATTEMPTS", "2")
+    calls = []
+
+    def _flaky(db, payload):
+        calls.append(payload["n"])
+        raise RuntimeError("falhou")
+
+    monkeypatch.setitem(job_queue.TASKS, "teste.flaky", _flaky)
+    first = job_queue.enqueue(db_session, "teste", "teste.flaky", {"n": 1})
+    db_session.commit()
+    first.available_at = datetime.utcnow() - timedelta(seconds=5)
+    second = job_queue.enqueue(db_session, "teste", "teste.flaky", {"n": 2})
+    db_session.commit()
+
+    claimed = job_queue.claim(db_session, "teste", "w1")
+    assert claimed.id == first.id and claimed.attempts == 1 and claimed.locked_by == "w1"
+    assert job_queue.claim(db_session, "teste", "w2") is None
+
+    assert job_queue.run_claimed(db_session, claimed, "w1") == "queued"
+    db_session.refresh(first)
+    assert calls == [1] and first.locked_by is None and "falhou" in first.last_error
+    assert first.available_at > datetime.utcnow() + timedelta(seconds=20)
+
+    # O primeiro esta em backoff; o segundo sai, e um worker morto perde o job quando a visibilidade vence.
+    claimed = job_queue.claim(db_session, "teste", "w2")
+    assert claimed.id == second.id
+    claimed.locked_until = datetime.utcnow() - timedelta(seconds=1)
+    db_session.commit()
+    reclaimed = job_queue.claim(db_session, "teste", "w3")
+    assert reclaimed.id == second.id and reclaimed.attempts == 2 and reclaimed.locked_by == "w3"
+    job_queue.run_claimed(db_session, reclaimed, "w2")
+    db_session.refresh(second)
+    assert second.status == "running" and second.locked_by == "w3"
+    assert job_queue.run_claimed(db_session, reclaimed, "w3") == "failed"
+    db_session.refresh(second)
+    assert second.status == "failed" and second.finished_at is not None
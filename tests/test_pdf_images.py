@@ -0,0 +1,62 @@
+from io import BytesIO
+
+from PIL import Image
+
+from app.services import pdf_images
+
+
+def _jpeg(size):
+    out = BytesIO()
+    Image.new("RGB", size, (200, 10, 10)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+def test_collect_image_urls_dedupes_and_skips_data_urls():
+    payload = {
+        "logo_url": None,
+        "checkin": {"photos": ["https://x/a.jpg"]},
+        "checkout": {"photos": []},
+        "answers": [{"photos": ["https://x/a.jpg", "https://x/b.jpg"]}],
+        "evidence": [{"photos": ["https://x/c.jpg"]}],
+        "signatures": {"tecnico": {"image_url": "https://x/sig.png"}, "cliente": {}},
+        "qr_data_url": "data:image/png;base64,AAAA",
+    }
+    urls = pdf_images.collect_image_urls(payload)
+    assert set(urls) == {"https://x/a.jpg", "https://x/b.jpg", "https://x/c.jpg", "https://x/sig.png"}
+    assert urls["https://x/sig.png"] == pdf_images.SIGNATURE_MAX_PX
+
+
+def test_downscale_and_fetcher(tmp_path, monkeypatch):
+    monkeypatch.setenv("PDF_IMAGE_CACHE_DIR", str(tmp_path))
+    data, mime = pdf_images.downscale_image(_jpeg((3000, 2000)), pdf_images.PHOTO_MAX_PX)
+    assert mime == "image/jpeg"
+    assert max(Image.open(BytesIO(data)).size) == pdf_images.PHOTO_MAX_PX
+
+    fallback_calls = []
+    fetcher = pdf_images.make_url_fetcher(
+        {"https://x/a.jpg?sig=1": (data, mime)},
+        lambda url, *args, **kwargs: fallback_calls.append(url) or {"string": b""},
+    )
+    assert fetcher("https://x/a.jpg?sig=1")["string"] == data
+    fetcher("https://x/other.jpg")
+    assert fallback_calls == ["https://x/other.jpg"]
+
+
+def test_prefetch_uses_disk_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("PDF_IMAGE_CACHE_DIR", str(tmp_path))
+    calls = []
+
+    class _Response:
+        status_code = 200
+        content = _jpeg((1200, 900))
+
+    def _get(self, url):
+        calls.append(url)
+        return _Response()
+
+    monkeypatch.setattr(pdf_images.httpx.Client, "get", _get)
+    urls = {"https://x/a.jpg?sig=1": pdf_images.PHOTO_MAX_PX}
+    first = pdf_images.prefetch_images(urls)
+    second = pdf_images.prefetch_images({"https://x/a.jpg?sig=2": pdf_images.PHOTO_MAX_PX})
+    assert len(calls) == 1
+    assert first["https://x/a.jpg?sig=1"] == second["https://x/a.jpg?sig=2"]
@@ -0,0 +1,88 @@
+from datetime import datetime
+import threading
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1 import work_orders
+from app.db import models
+from app.services.pdf_jobs import PdfJobRunner
+
+
+def test_generate_pdf_inline_runner(db_session, tenant_admin, work_order, monkeypatch):
+    uploads = {}
+    runner = PdfJobRunner(mode="inline")
+    monkeypatch.setattr(runner, "render", lambda payload: b"%PDF-" + payload["os"]["id"].encode())
+    monkeypatch.setattr(work_orders, "get_pdf_job_runner", lambda: runner)
+    monkeypatch.setattr(work_orders, "upload_bytes", lambda data, name, content_type=None: uploads.update({name: data}))
+    monkeypatch.setattr(work_orders, "generate_signed_url", lambda name: f"https://signed/{name}")
+    monkeypatch.setattr(
+        "app.db.session.SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=db_session.get_bind())
+    )
+
+    job = work_orders.generate_pdf(work_order.id, current_user=tenant_admin, db=db_session)
+    assert job["status"] == "completed"
+
+    status_payload = work_orders.get_pdf_job_status(work_order.id, job["job_id"], current_user=tenant_admin, db=db_session)
+    assert status_payload["status"] == "completed"
+    result = work_orders.get_pdf_job_result(work_order.id, job["job_id"], current_user=tenant_admin, db=db_session)
+    assert uploads[result["object"]] == b"%PDF-" + work_order.id.encode()
+    assert result["url"] == f"https://signed/{result['object']}"
+
+    with pytest.raises(HTTPException):
+        work_orders.get_pdf_job_status(work_order.id, "missing", current_user=tenant_admin, db=db_session)
+
+    again = work_orders.generate_pdf(work_order.id, current_user=tenant_admin, db=db_session)
+    assert again["cached"] is True
+    assert again["job_id"] == job["job_id"]
+    assert db_session.query(models.PublicLink).count() == 1
+
+    forced = work_orders.generate_pdf(work_order.id, force=True, current_user=tenant_admin, db=db_session)
+    assert forced["cached"] is False
+    assert forced["job_id"] != job["job_id"]
+    assert db_session.query(models.PublicLink).count() == 1
+
+    monkeypatch.setattr(runner, "render", lambda payload: (_ for _ in ()).throw(RuntimeError("falhou")))
+    db_session.query(models.PublicLink).update({"revoked_at": datetime.utcnow()})
+    db_session.commit()
+    failed = work_orders.generate_pdf(work_order.id, force=True, current_user=tenant_admin, db=db_session)
+    status_payload = work_orders.get_pdf_job_status(work_order.id, failed["job_id"], current_user=tenant_admin, db=db_session)
+    assert status_payload["status"] == "failed"
+    assert db_session.query(models.PublicLink).count() == 1
+    monkeypatch.setattr(runner, "render", lambda payload: b"%PDF-" + payload["os"]["id"].encode())
+
+    item = models.WorkOrderItem(work_order_id=work_order.id, question_text="Nova", answer_type="text", order_index=1)
+    db_session.add(item)
+    db_session.commit()
+    changed = work_orders.generate_pdf(work_order.id, current_user=tenant_admin, db=db_session)
+    assert changed["cached"] is False
+    assert changed["content_digest"] != job["content_digest"]
+
+
+def test_runner_limits_concurrency_per_tenant():
+    runner = PdfJobRunner(mode="thread", max_workers=4, max_per_tenant=1)
+    release = threading.Event()
+    lock = threading.Lock()
+    running = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+    done = []
+
+    def _job(tenant_id):
+        with lock:
+            running[tenant_id] += 1
+            peak[tenant_id] = max(peak[tenant_id], running[tenant_id])
+        release.wait(timeout=5)
+        with lock:
+            running[tenant_id] -= 1
+            done.append(tenant_id)
+
+    for _ in range(3):
+        runner.submit("a", _job, "a")
+    runner.submit("b", _job, "b")
+    assert runner.pending_count("a") == 2
+    release.set()
+    runner.shutdown()
+
+    assert sorted(done) == ["a", "a", "a", "b"]
+    assert peak["a"] == 1
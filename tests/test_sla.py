@@ -0,0 +1,64 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.api.v1 import sla as sla_api
+from app.db import models
+from app.services import sla, sync_log
+
+
+def test_evaluate_sla_flags_overdue_work_orders_once(db_session):
+    tenant = models.Tenant(name="Tenant", status="ATIVO", tenant_type="MSP", timezone="America/Sao_Paulo")
+    db_session.add(tenant)
+    db_session.commit()
+    now = datetime(2026, 10, 18, 12, 0)
+
+    def _os(due, status="aberta", breached=False):
+        os = models.WorkOrder(
+            id=str(uuid.uuid4()), tenant_id=tenant.id, title="OS", status=status, sla_due_at=due, sla_breached=breached
+        )
+        db_session.add(os)
+        return os
+
+    overdue = [_os(now - timedelta(hours=hours)) for hours in (1, 2, 3)]
+    legacy_null = _os(now - timedelta(minutes=5), breached=None)
+    on_time = _os(now + timedelta(hours=1))
+    closed = _os(now - timedelta(hours=1), status="concluida")
+    no_sla = _os(None)
+    db_session.commit()
+    head = sync_log.current_seq(db_session, tenant.id)
+
+    result = sla.evaluate_sla(db_session, now=now, batch_size=2)
+    assert result["breached"] == 4
+    assert result["tenants"] == {tenant.id: 4}
+
+    db_session.expire_all()
+    assert all(os.sla_breached for os in overdue + [legacy_null])
+    assert not any(os.sla_breached for os in (on_time, closed, no_sla))
+    events = db_session.query(models.WorkOrderEvent).filter(models.WorkOrderEvent.type == "SLA_BREACH").all()
+    assert sorted(event.work_order_id for event in events) == sorted(os.id for os in overdue + [legacy_null])
+    changes = sync_log.fetch_changes(db_session, tenant.id, head, sync_log.current_seq(db_session, tenant.id), 100)
+    assert len(changes) == 4
+
+    assert sla.evaluate_sla(db_session, now=now)["breached"] == 0
+    assert db_session.query(models.WorkOrderEvent).count() == 4
+
+
+def test_evaluate_endpoint_requires_scheduler_secret(db_session, monkeypatch):
+    def _request(secret=None):
+        headers = [(b"x-scheduler-secret", secret.encode())] if secret else []
+        return Request({"type": "http", "headers": headers})
+
+    monkeypatch.delenv("SLA_SCHEDULER_SECRET", raising=False)
+    with pytest.raises(HTTPException) as exc:
+        sla_api.evaluate_sla_endpoint(_request(), db=db_session)
+    assert exc.value.status_code == 503
+
+    monkeypatch.setenv("SLA_SCHEDULER_SECRET", "s3cr3t")
+    with pytest.raises(HTTPException) as exc:
+        sla_api.evaluate_sla_endpoint(_request("errado"), db=db_session)
+    assert exc.value.status_code == 403
+    assert sla_api.evaluate_sla_endpoint(_request("s3cr3t"), db=db_session)["breached"] == 0
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+from app.services import storage
+
+
+class _FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+
+    def generate_signed_url(self, expiration, method):
+        self.bucket.signed.append(self.name)
+        return f"https://signed/{self.name}?n={len(self.bucket.signed)}"
+
+
+class _FakeBucket:
+    def __init__(self):
+        self.signed = []
+
+    def blob(self, name):
+        return _FakeBlob(self, name)
+
+
+class _FakeClient:
+    def __init__(self):
+        self.bucket_obj = _FakeBucket()
+        self.bucket_calls = 0
+
+    def bucket(self, name):
+        self.bucket_calls += 1
+        return self.bucket_obj
+
+
+def _setup(monkeypatch):
+    client = _FakeClient()
+    monkeypatch.setenv("GCS_BUCKET_OS_ASSETS", "bucket")
+    monkeypatch.setattr(storage, "get_storage_client", lambda: client)
+    storage.clear_signed_url_cache()
+    return client
+
+
+def test_batch_signing_reuses_bucket_and_cache(monkeypatch):
+    client = _setup(monkeypatch)
+    urls = storage.generate_signed_urls(["a.jpg", "b.jpg", None, "a.jpg"])
+    assert set(urls) == {"a.jpg", "b.jpg"}
+    assert client.bucket_calls == 1
+    assert client.bucket_obj.signed == ["a.jpg", "b.jpg"]
+
+    again = storage.generate_signed_urls(["a.jpg", "b.jpg"])
+    assert again == urls
+    assert client.bucket_calls == 1
+    assert storage.generate_signed_url("a.jpg") == urls["a.jpg"]
+
+
+def test_signed_url_cache_expires_before_url(monkeypatch):
+    client = _setup(monkeypatch)
+    monkeypatch.setenv("SIGNED_URL_MIN_REMAINING_MINUTES", "10")
+    first = storage.generate_signed_url("a.jpg", expires_minutes=30)
+    key = ("a.jpg", 30)
+    url, _ = storage._signed_url_cache[key]
+    storage._signed_url_cache[key] = (url, datetime.utcnow() + timedelta(minutes=5))
+
+    second = storage.generate_signed_url("a.jpg", expires_minutes=30)
+    assert second != first
+    assert client.bucket_obj.signed == ["a.jpg", "a.jpg"]
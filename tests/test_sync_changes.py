@@ -0,0 +1,83 @@
+import uuid
+
+from sqlalchemy import event
+
+from app.api.v1 import work_orders
+from app.db import models
+
+
+def _scoped_tech(db, tenant_id):
+    tech = models.User(
+        tenant_id=tenant_id,
+        name="tech",
+        login="tech",
+        email="tech@example.com",
+        password_hash="x",
+        role="TECNICO",
+        status="active",
+    )
+    client = models.Client(id=str(uuid.uuid4()), tenant_id=tenant_id, name="Cliente")
+    db.add_all([tech, client, models.Role(tenant_id=tenant_id, nome="TECNICO")])
+    db.commit()
+    db.add(models.UserScope(user_id=tech.id, scope_type="CLIENT", scope_id=client.id))
+    db.commit()
+    return tech, client
+
+
+def _pull(db, user, cursor=0, limit=200):
+    return work_orders.sync_changes(cursor=cursor, limit=limit, current_user=user, db=db)
+
+
+def test_sync_changes_feed(db_session, tenant_admin, monkeypatch):
+    monkeypatch.setattr(work_orders, "generate_signed_urls", lambda names, expires_minutes=30: {})
+    tech, client = _scoped_tech(db_session, tenant_admin.tenant_id)
+    mine = models.WorkOrder(
+        id=str(uuid.uuid4()), tenant_id=tenant_admin.tenant_id, client_id=client.id, title="Minha", assigned_user_id=tech.id
+    )
+    other = models.WorkOrder(
+        id=str(uuid.uuid4()), tenant_id=tenant_admin.tenant_id, client_id=client.id, title="Outra", assigned_user_id=tenant_admin.id
+    )
+    db_session.add_all([mine, other])
+    db_session.flush()
+    item = models.WorkOrderItem(id=str(uuid.uuid4()), work_order_id=mine.id, question_text="Q", answer_type="text")
+    db_session.add(item)
+    db_session.commit()
+
+    full = _pull(db_session, tenant_admin)
+    assert {(c["entity"], c["id"]) for c in full["changes"]} == {
+        ("work_order", mine.id),
+        ("work_order", other.id),
+        ("item", item.id),
+    }
+    assert full["has_more"] is False
+
+    tech_feed = _pull(db_session, tech)
+    assert {c["id"] for c in tech_feed["changes"]} == {mine.id, item.id}
+    assert tech_feed["cursor"] == full["cursor"]
+
+    statements = []
+    engine = db_session.get_bind()
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        idle = _pull(db_session, tech, cursor=tech_feed["cursor"])
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert idle["changes"] == []
+    assert len(statements) == 1
+
+    item.answer_value = "ok"
+    mine.assigned_user_id = tenant_admin.id
+    db_session.commit()
+    delta = _pull(db_session, tech, cursor=tech_feed["cursor"])
+    assert [(c["entity"], c["op"]) for c in delta["changes"]] == [("work_order", "delete"), ("item", "delete")]
+
+    db_session.delete(other)
+    db_session.commit()
+    admin_delta = _pull(db_session, tenant_admin, cursor=full["cursor"], limit=2)
+    assert admin_delta["has_more"] is True
+    rest = _pull(db_session, tenant_admin, cursor=admin_delta["cursor"])
+    ops = {(c["id"], c["op"]) for c in admin_delta["changes"] + rest["changes"]}
+    assert (other.id, "delete") in ops
+    assert (item.id, "upsert") in ops
+    assert _pull(db_session, tenant_admin, cursor=rest["cursor"] + 10)["reset"] is True
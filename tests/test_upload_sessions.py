@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+from starlette.requests import Request
+
+from app.api.v1 import work_orders
+from app.db import models
+from app.services import upload_sessions
+
+
+def _request():
+    return Request({"type": "http", "scheme": "http", "server": ("testserver", 80), "path": "/", "headers": []})
+
+
+class _Body:
+    def __init__(self, data):
+        self.data = data
+
+    async def stream(self):
+        for idx in range(0, len(self.data), 1000):
+            yield self.data[idx : idx + 1000]
+
+
+def _photo() -> bytes:
+    out = BytesIO()
+    Image.new("RGB", (640, 480), (200, 120, 0)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+def _create(user, os, db, data, **overrides):
+    payload = {
+        "target": "attachment",
+        "file_name": "foto.jpg",
+        "mime": "image/jpeg",
+        "size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "scope": "CHECKIN",
+    }
+    payload.update(overrides)
+    return work_orders.create_upload_session(
+        os.id, work_orders.UploadSessionCreate(**payload), _request(), current_user=user, db=db
+    )
+
+
+def _put(session, data, db):
+    token = parse_qs(urlsplit(session["upload_url"]).query)["token"][0]
+    return asyncio.run(work_orders.put_upload_session_content(session["session_id"], token, _Body(data), db=db))
+
+
+def test_upload_session_local_flow(db_session, tenant_admin, work_order, monkeypatch):
+    published, thumbnails = {}, []
+
+    def _upload_stream(file_obj, name, content_type=None, max_bytes=None):
+        published[name] = file_obj.read()
+        return name, len(published[name]), ""
+
+    monkeypatch.setattr(upload_sessions, "upload_stream", _upload_stream)
+    monkeypatch.setattr(work_orders, "schedule_thumbnail", thumbnails.append)
+    monkeypatch.setattr(work_orders, "generate_signed_urls", lambda names, expires_minutes=30: {})
+
+    photo = _photo()
+    session = _create(tenant_admin, work_order, db_session, photo)
+    assert session["skip_upload"] is False
+    assert session["upload_url"].startswith("http://testserver/api/upload-sessions/")
+    assert _put(session, photo, db_session)["size"] == len(photo)
+
+    attachment = work_orders.finalize_upload_session(session["session_id"], current_user=tenant_admin, db=db_session)
+    assert attachment["sha256"] == hashlib.sha256(photo).hexdigest()
+    assert list(published.values()) == [photo]
+    blob = db_session.query(models.AttachmentBlob).one()
+    assert thumbnails == [blob.id]
+    again = work_orders.finalize_upload_session(session["session_id"], current_user=tenant_admin, db=db_session)
+    assert again["id"] == attachment["id"]
+
+    duplicate = _create(tenant_admin, work_order, db_session, photo, scope="CHECKOUT")
+    assert duplicate["skip_upload"] is True
+    assert duplicate["upload_url"] is None
+    work_orders.finalize_upload_session(duplicate["session_id"], current_user=tenant_admin, db=db_session)
+    db_session.refresh(blob)
+    assert blob.ref_count == 2
+    assert len(published) == 1
+
+    # Blob removido entre a criacao da sessao e o finalize: o cliente precisa enviar os bytes.
+    vanished = _create(tenant_admin, work_order, db_session, photo, scope="CHECKOUT")
+    assert vanished["skip_upload"] is True
+    db_session.delete(blob)
+    db_session.commit()
+    with pytest.raises(HTTPException) as exc:
+        work_orders.finalize_upload_session(vanished["session_id"], current_user=tenant_admin, db=db_session)
+    assert exc.value.status_code == 409
+    assert db_session.get(models.UploadSession, vanished["session_id"]).status == "failed"
+
+
+def test_upload_session_rejects_mismatch(db_session, tenant_admin, work_order, monkeypatch):
+    photo = _photo()
+    session = _create(tenant_admin, work_order, db_session, photo, sha256="0" * 64)
+    _put(session, photo, db_session)
+    with pytest.raises(HTTPException) as exc:
+        work_orders.finalize_upload_session(session["session_id"], current_user=tenant_admin, db=db_session)
+    assert exc.value.status_code == 422
+    stored = db_session.query(models.UploadSession).one()
+    assert stored.status == "failed"
+
+    with pytest.raises(HTTPException) as exc:
+        _create(tenant_admin, work_order, db_session, photo, mime="text/plain")
+    assert exc.value.status_code == 422
+
+
+def test_concurrent_puts_do_not_interleave(db_session, tenant_admin, work_order):
+    photo = _photo()
+    other = bytes(reversed(photo))
+    session = _create(tenant_admin, work_order, db_session, photo)
+    token = parse_qs(urlsplit(session["upload_url"]).query)["token"][0]
+
+    async def _both():
+        return await asyncio.gather(
+            work_orders.put_upload_session_content(session["session_id"], token, _Body(photo), db=db_session),
+            work_orders.put_upload_session_content(session["session_id"], token, _Body(other), db=db_session),
+        )
+
+    asyncio.run(_both())
+    base_dir = upload_sessions.LocalUploadBackend().base_dir
+    assert (base_dir / session["session_id"]).read_bytes() in (photo, other)
+    assert not list(base_dir.glob("*.part"))
+
+
+def test_sniff_mime():
+    assert upload_sessions.sniff_mime(_photo()[:16]) == "image/jpeg"
+    assert upload_sessions.sniff_mime(b"%PDF-1.7") == "application/pdf"
+    assert upload_sessions.sniff_mime(b"RIFF\x00\x00\x00\x00AVI ") is None
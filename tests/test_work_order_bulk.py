@@ -0,0 +1,64 @@
+import uuid
+from datetime import datetime
+
+from app.api.v1 import work_orders
+from app.db import models
+from app.services import sync_log
+
+
+def test_bulk_create_expands_checklist_and_reports_row_errors(db_session, monkeypatch):
+    monkeypatch.setenv("WORK_ORDER_BULK_CHUNK_SIZE", "2")
+    tenant = models.Tenant(name="Tenant", status="ATIVO", tenant_type="MSP", timezone="America/Sao_Paulo")
+    db_session.add(tenant)
+    db_session.commit()
+    admin = models.User(
+        tenant_id=tenant.id,
+        name="Admin",
+        login="admin",
+        email="admin@example.com",
+        password_hash="x",
+        role="TENANT_ADMIN",
+        status="active",
+    )
+    client = models.Client(id=str(uuid.uuid4()), tenant_id=tenant.id, name="Cliente")
+    questionnaire = models.Questionnaire(id=str(uuid.uuid4()), tenant_id=tenant.id, title="Preventiva mensal")
+    db_session.add_all([admin, client, questionnaire])
+    db_session.flush()
+    for idx, text in enumerate(["Filtro limpo?", "Pressao", "Ruido"]):
+        db_session.add(
+            models.QuestionnaireItem(
+                id=str(uuid.uuid4()),
+                questionnaire_id=questionnaire.id,
+                question_text=text,
+                answer_type="text",
+                order_index=idx,
+            )
+        )
+    db_session.commit()
+
+    rows = [work_orders.WorkOrderBulkRow(client_id=client.id, scheduled_start=datetime(2026, 11, day, 8)) for day in (1, 2, 3)]
+    rows.insert(1, work_orders.WorkOrderBulkRow(client_id=client.id, asset_id="missing"))
+    rows.append(
+        work_orders.WorkOrderBulkRow(
+            client_id=client.id, scheduled_start=datetime(2026, 11, 2), scheduled_end=datetime(2026, 11, 1)
+        )
+    )
+    payload = work_orders.WorkOrderBulkCreate(questionnaire_id=questionnaire.id, priority="media", rows=rows)
+    result = work_orders.create_work_orders_bulk_endpoint(payload, current_user=admin, db=db_session)
+
+    assert [entry["row"] for entry in result["created"]] == [0, 2, 3]
+    assert result["errors"] == [
+        {"row": 1, "error": "Ativo nao encontrado"},
+        {"row": 4, "error": "Fim agendado anterior ao inicio"},
+    ]
+    created_ids = [entry["id"] for entry in result["created"]]
+    created = db_session.query(models.WorkOrder).filter(models.WorkOrder.id.in_(created_ids)).all()
+    assert {os.title for os in created} == {"Preventiva mensal"}
+    assert {os.priority for os in created} == {"media"}
+    items = db_session.query(models.WorkOrderItem).filter(models.WorkOrderItem.work_order_id == created_ids[0]).all()
+    assert sorted((item.order_index, item.question_text) for item in items) == [
+        (0, "Filtro limpo?"),
+        (1, "Pressao"),
+        (2, "Ruido"),
+    ]
+    assert sync_log.current_seq(db_session, tenant.id) == 12
@@ -0,0 +1,47 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1 import work_orders
+from app.db import models
+
+
+def test_list_work_orders_facets(db_session):
+    tenant = models.Tenant(name="Tenant", status="ATIVO", tenant_type="MSP", timezone="America/Sao_Paulo")
+    db_session.add(tenant)
+    db_session.commit()
+    admin = models.User(
+        tenant_id=tenant.id,
+        name="Admin",
+        login="admin",
+        email="admin@example.com",
+        password_hash="x",
+        role="TENANT_ADMIN",
+        status="active",
+    )
+    db_session.add(admin)
+    for status, priority in [("aberta", "alta"), ("aberta", "baixa"), ("fechada", "alta"), ("aberta", None)]:
+        db_session.add(
+            models.WorkOrder(id=str(uuid.uuid4()), tenant_id=tenant.id, title="OS", status=status, priority=priority)
+        )
+    db_session.commit()
+
+    def _list(**kwargs):
+        params = {"status_filter": None, "type": None, "priority": None, "client_id": None, "page": 1, "page_size": 2}
+        params.update(kwargs)
+        return work_orders.list_work_orders(current_user=admin, db=db_session, **params)
+
+    result = _list(facets="status,priority")
+    assert result["total"] == 4
+    assert len(result["items"]) == 2
+    assert result["facets"]["status"] == [{"value": "aberta", "count": 3}, {"value": "fechada", "count": 1}]
+    assert {"value": None, "count": 1} in result["facets"]["priority"]
+
+    filtered = _list(priority="alta", facets="status")
+    assert filtered["total"] == 2
+    assert filtered["facets"]["status"] == [{"value": "aberta", "count": 1}, {"value": "fechada", "count": 1}]
+    assert "facets" not in _list()
+
+    with pytest.raises(HTTPException):
+        _list(facets="title")
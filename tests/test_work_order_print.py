@@ -0,0 +1,111 @@
+import uuid
+
+from sqlalchemy import event
+
+from app.api.v1 import work_orders
+from app.db import models
+
+
+def _seed_work_order(db, item_count):
+    tenant = models.Tenant(name="Tenant", status="ATIVO", tenant_type="MSP", timezone="America/Sao_Paulo")
+    db.add(tenant)
+    db.commit()
+    user = models.User(
+        tenant_id=tenant.id,
+        name="User",
+        login=f"user-{item_count}",
+        email="user@example.com",
+        password_hash="x",
+        role="TENANT_ADMIN",
+        status="active",
+    )
+    client = models.Client(tenant_id=tenant.id, name="Cliente", document="12345678000199")
+    site = models.Site(tenant_id=tenant.id, name="Site", code="S1")
+    db.add_all([user, client, site])
+    db.commit()
+    os = models.WorkOrder(
+        id=str(uuid.uuid4()),
+        tenant_id=tenant.id,
+        client_id=client.id,
+        site_id=site.id,
+        title="Preventiva",
+        status="aberta",
+    )
+    db.add(os)
+    for idx in range(item_count):
+        item = models.WorkOrderItem(
+            id=str(uuid.uuid4()),
+            work_order_id=os.id,
+            question_text=f"Pergunta {idx}",
+            answer_type="text",
+            order_index=idx,
+            answer_value="ok",
+        )
+        db.add(item)
+        db.add(
+            models.WorkOrderAttachment(
+                work_order_id=os.id,
+                item_id=item.id,
+                scope="QUESTION",
+                file_name=f"foto-{idx}.jpg",
+                url=f"work_orders/{os.id}/QUESTION/foto-{idx}.jpg",
+            )
+        )
+    db.add(
+        models.WorkOrderActivity(tenant_id=tenant.id, work_order_id=os.id, name="Inspecao", status="FINALIZADA")
+    )
+    db.add(
+        models.WorkOrderAttachment(
+            work_order_id=os.id,
+            scope="CHECKIN",
+            file_name="checkin.jpg",
+            url=f"work_orders/{os.id}/CHECKIN/checkin.jpg",
+        )
+    )
+    db.commit()
+    return user, os.id
+
+
+def _count_print_queries(db, user, work_order_id):
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    db.expire_all()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        data = work_orders.get_print_data(work_order_id, current_user=user, db=db)
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    return data, statements
+
+
+def test_print_data_query_count_is_constant(db_session, monkeypatch):
+    signed = []
+
+    def _fake_sign(object_names, expires_minutes=30):
+        names = [name for name in object_names if name]
+        signed.extend(names)
+        return {name: f"https://signed/{name}" for name in names}
+
+    monkeypatch.setattr(work_orders, "generate_signed_urls", _fake_sign)
+
+    small_user, small_id = _seed_work_order(db_session, 1)
+    _, small_statements = _count_print_queries(db_session, small_user, small_id)
+
+    user, work_order_id = _seed_work_order(db_session, 200)
+    signed.clear()
+    data, statements = _count_print_queries(db_session, user, work_order_id)
+
+    assert len(statements) == len(small_statements)
+    assert len(statements) <= 12
+    assert len(data["answers"]) == 200
+    assert len(data["os"]["items"]) == 200
+    assert all(len(item["attachments"]) == 1 for item in data["os"]["items"])
+    assert all(len(answer["photos"]) == 1 for answer in data["answers"])
+    assert len(data["checkin_photos"]) == 1
+    assert data["client"]["name"] == "Cliente"
+    assert data["site"]["code"] == "S1"
+    assert len(signed) == len(set(signed)) == 201
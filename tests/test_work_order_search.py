@@ -0,0 +1,52 @@
+import uuid
+
+from app.api.v1 import work_orders
+from app.db import models
+from app.services.work_order_search import ensure_search_schema
+
+
+def _work_order(db, user, title, **fields):
+    os = models.WorkOrder(id=str(uuid.uuid4()), tenant_id=user.tenant_id, title=title, **fields)
+    db.add(os)
+    db.flush()
+    return os
+
+
+def _search(db, user, q, **kwargs):
+    return work_orders.search_work_orders_endpoint(q=q, current_user=user, db=db, **{"cursor": None, "limit": 20, **kwargs})
+
+
+def test_search_ranks_scopes_and_tracks_writes(db_session, tenant_admin):
+    ensure_search_schema(db_session.get_bind())
+    strong = _work_order(db_session, tenant_admin, "Troca do compressor", description="Compressor travado, compressor novo")
+    weak = _work_order(db_session, tenant_admin, "Manutenção preventiva", materials="filtro")
+    other_tenant = models.Tenant(name="Outro", status="ATIVO", tenant_type="MSP", timezone="America/Sao_Paulo")
+    db_session.add(other_tenant)
+    db_session.flush()
+    db_session.add(models.WorkOrder(id=str(uuid.uuid4()), tenant_id=other_tenant.id, title="compressor"))
+    item = models.WorkOrderItem(
+        id=str(uuid.uuid4()), work_order_id=weak.id, question_text="Estado", answer_type="text", answer_value="ok"
+    )
+    db_session.add(item)
+    db_session.commit()
+
+    result = _search(db_session, tenant_admin, "compressor")
+    assert [row.id for row in result["items"]] == [strong.id]
+    assert [row.id for row in _search(db_session, tenant_admin, "manutencao")["items"]] == [weak.id]
+
+    item.answer_value = "compressor com ruido"
+    db_session.commit()
+    result = _search(db_session, tenant_admin, "compress")
+    assert [row.id for row in result["items"]] == [strong.id, weak.id]
+
+    first = _search(db_session, tenant_admin, "compressor", limit=1)
+    assert [row.id for row in first["items"]] == [strong.id]
+    second = _search(db_session, tenant_admin, "compressor", limit=1, cursor=first["next_cursor"])
+    assert [row.id for row in second["items"]] == [weak.id]
+    assert second["next_cursor"] is None
+
+    db_session.delete(item)
+    db_session.delete(strong)
+    db_session.commit()
+    assert _search(db_session, tenant_admin, "compressor")["items"] == []
+    assert _search(db_session, tenant_admin, "!!")["items"] == []
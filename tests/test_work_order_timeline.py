@@ -0,0 +1,72 @@
+import uuid
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from app.api.v1 import work_orders
+from app.db import models
+from app.services.gps_track import parse_coordinate
+
+
+def test_timeline_downsamples_and_delta_encodes_track(db_session):
+    tenant = models.Tenant(name="Tenant", status="ATIVO", tenant_type="MSP", timezone="America/Sao_Paulo")
+    db_session.add(tenant)
+    db_session.commit()
+    admin = models.User(
+        tenant_id=tenant.id,
+        name="Admin",
+        login="admin",
+        email="admin@example.com",
+        password_hash="x",
+        role="TENANT_ADMIN",
+        status="active",
+    )
+    db_session.add(admin)
+    os = models.WorkOrder(id=str(uuid.uuid4()), tenant_id=tenant.id, title="OS")
+    db_session.add(os)
+    db_session.commit()
+
+    start = datetime(2026, 10, 18, 8, 0)
+    # Trajeto reto para leste com um desvio para o norte no ponto 5.
+    for idx in range(11):
+        lat = -23.5 + (0.01 if idx == 5 else 0.0)
+        db_session.add(
+            models.WorkOrderEvent(
+                id=str(uuid.uuid4()),
+                tenant_id=tenant.id,
+                work_order_id=os.id,
+                user_id=admin.id,
+                type="LOCATION",
+                client_timestamp=start + timedelta(minutes=idx),
+                latitude=lat,
+                longitude=-46.6 + idx * 0.001,
+            )
+        )
+    db_session.add(
+        models.WorkOrderEvent(
+            id=str(uuid.uuid4()),
+            tenant_id=tenant.id,
+            work_order_id=os.id,
+            user_id=admin.id,
+            type="CHECKIN",
+            client_timestamp=start,
+            latitude=-23.5,
+            longitude=-46.6,
+        )
+    )
+    db_session.commit()
+
+    timeline = work_orders.get_work_order_timeline(
+        os.id, max_points=3, user_id=None, current_user=admin, db=db_session
+    )
+    assert [event["type"] for event in timeline["events"]] == ["CHECKIN"]
+    track = timeline["track"]
+    assert track["total"] == 12
+    assert track["count"] == 3
+    lats = [value / 10 ** track["precision"] for value in accumulate(track["lat"])]
+    assert lats[1] == -23.49
+    assert list(accumulate(track["t"])) == [0, 300, 600]
+
+    full = work_orders.get_work_order_timeline(os.id, max_points=500, user_id=None, current_user=admin, db=db_session)
+    assert full["track"]["count"] == 12
+    assert parse_coordinate("abc") is None
+    assert parse_coordinate("-91", 90.0) is None